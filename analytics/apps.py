@@ -15,6 +15,7 @@ class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.AutoField'
     
     def ready(self):
+        from analytics import signals  # NOQA
         if not settings.TESTING:
             from analytics.utils.monthly_snapshot_saving import MonthlySnapshotSaving
             try:
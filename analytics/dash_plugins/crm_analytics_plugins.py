@@ -6,25 +6,23 @@ try:
 except Exception:
     class BaseDashboardPlugin:
         pass
+from django.core.cache import cache
 from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Count, Sum, Q
-from django.db.models.functions import TruncMonth, TruncWeek, TruncDay
-from datetime import timedelta
+from django.db.models.functions import TruncWeek, TruncDay
+from datetime import datetime, time, timedelta
 from django.utils import timezone
 from decimal import Decimal
-import io
-import base64
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from analytics.utils.forecasting import forecast_new_leads, forecast_new_clients_with_reach
+from analytics.utils.forecasting import get_forecast, SERIES_CLIENTS, SERIES_LEADS, SERIES_REVENUE
 from analytics.utils.funnel_forecasting import suggest_next_actions
 import json
-from analytics.utils.mpl import to_img, plot_forecast
+from analytics.utils.mpl import plot_forecast, pooled_figure, to_img
+from analytics.utils.dashboard_cache import make_dashboard_cache_key
 
 from crm.models import Deal, Lead, Contact, Request
 from analytics.models import IncomeStat, DealStat, LeadSourceStat
+from analytics.utils.bi_helpers import get_monthly_won_revenue
 # helper fallbacks if not available
 from datetime import date
 
@@ -45,7 +43,41 @@ def get_quarter_end(ref=None):
     return date(ref.year, end_month + 1, 1) - timedelta(days=1)
 
 
-class SalesOverviewPlugin(BaseDashboardPlugin):
+def datetime_range(start_date, end_date):
+    """Return aware datetimes covering `start_date`..`end_date` inclusive as a half-open range."""
+    start_dt = timezone.make_aware(datetime.combine(start_date, time.min))
+    end_dt = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    return start_dt, end_dt
+
+
+def render_svg(draw) -> str:
+    """Draw on the pooled axes of this thread with `draw(ax)` and return an SVG data URI."""
+    fig, ax = pooled_figure((6, 3))
+    draw(ax)
+    return to_img(fig)
+
+
+class CachedDashboardPlugin(BaseDashboardPlugin):
+    """
+    Caches the rendered plugin HTML per user and hour.
+    Subclasses implement `_process` instead of `process`.
+    """
+    cache_timeout = 300
+
+    def process(self, request, **kwargs):
+        key = make_dashboard_cache_key(
+            self.name,
+            getattr(request.user, 'id', None),
+            timezone.now().strftime('%Y%m%d%H'),
+        )
+        return cache.get_or_set(
+            key, lambda: self._process(request, **kwargs), self.cache_timeout
+        )
+
+    def _process(self, request, **kwargs):
+        raise NotImplementedError
+
+class SalesOverviewPlugin(CachedDashboardPlugin):
     """Sales Overview Dashboard Plugin"""
     
     name = 'sales_overview'
@@ -53,39 +85,45 @@ class SalesOverviewPlugin(BaseDashboardPlugin):
     description = _('Key sales metrics and KPIs')
     category = _('Analytics')
     
-    def process(self, request, **kwargs):
+    def _process(self, request, **kwargs):
         """Process the plugin data"""
         # Get date range (last 30 days by default)
-        end_date = timezone.now().date()
+        end_date = timezone.localdate()
         start_date = end_date - timedelta(days=30)
+        # Half-open datetime bounds keep the creation_date index usable
+        start_dt, end_dt = datetime_range(start_date, end_date)
         
         # Sales metrics
         deals_qs = Deal.objects.filter(
-            creation_date__date__range=[start_date, end_date]
+            creation_date__gte=start_dt,
+            creation_date__lt=end_dt
         )
         
-        total_deals = deals_qs.count()
-        won_deals = deals_qs.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True)).count()
-        lost_deals = deals_qs.filter(closing_reason__isnull=False, closing_reason__success_reason=False).count()
-        
-        total_revenue = deals_qs.filter(
-            Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True)
-        ).aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
+        won_q = Q(is_won=True)
+        deals_agg = deals_qs.aggregate(
+            total_deals=Count('id'),
+            won_deals=Count('id', filter=won_q),
+            lost_deals=Count('id', filter=Q(closing_reason__isnull=False, closing_reason__success_reason=False)),
+            total_revenue=Sum('amount', filter=won_q),
+        )
+        total_deals = deals_agg['total_deals']
+        won_deals = deals_agg['won_deals']
+        lost_deals = deals_agg['lost_deals']
+        total_revenue = deals_agg['total_revenue'] or Decimal('0')
         
         # Conversion rates
         win_rate = (won_deals / total_deals * 100) if total_deals > 0 else 0
         
         # Lead metrics
-        leads_count = Lead.objects.filter(
-            creation_date__date__range=[start_date, end_date]
-        ).count()
-        
-        converted_leads = Lead.objects.filter(
-            creation_date__date__range=[start_date, end_date],
-            contact__isnull=False
-        ).count()
+        leads_agg = Lead.objects.filter(
+            creation_date__gte=start_dt,
+            creation_date__lt=end_dt
+        ).aggregate(
+            leads_count=Count('id'),
+            converted_leads=Count('id', filter=Q(contact__isnull=False)),
+        )
+        leads_count = leads_agg['leads_count']
+        converted_leads = leads_agg['converted_leads']
         
         lead_conversion_rate = (converted_leads / leads_count * 100) if leads_count > 0 else 0
         
@@ -105,40 +143,28 @@ class SalesOverviewPlugin(BaseDashboardPlugin):
         return render_to_string('analytics/dash/sales_overview.html', context)
 
 
-class RevenueChartPlugin(BaseDashboardPlugin):
+class RevenueChartPlugin(CachedDashboardPlugin):
     name = 'revenue_chart'
     title = _('Revenue Chart')
     description = _('Monthly revenue trends')
     category = _('Analytics')
     
     def _plot(self, labels, values):
-        fig, ax = plt.subplots(figsize=(6, 3))
-        if labels and values:
-            ax.plot(labels, values, label='Revenue', color='#36A2EB', linestyle='-', marker='o')
-        ax.set_title('Revenue (last 12 months)')
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.legend(loc='lower center', ncol=2)
-        fig.tight_layout()
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', dpi=120)
-        plt.close(fig)
-        buf.seek(0)
-        return 'data:image/png;base64,' + base64.b64encode(buf.read()).decode('ascii')
+        def draw(ax):
+            if labels and values:
+                ax.plot(labels, values, label='Revenue', color='#36A2EB', linestyle='-', marker='o')
+            ax.set_title('Revenue (last 12 months)')
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.legend(loc='lower center', ncol=2)
+        return render_svg(draw)
 
-    def process(self, request, **kwargs):
-        end_date = timezone.now().date()
-        start_date = end_date.replace(day=1) - timedelta(days=365)
-        monthly_revenue = Deal.objects.filter(
-            creation_date__date__range=[start_date, end_date]
-        ).filter(
-            Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True)
-        ).annotate(
-            month=TruncMonth('creation_date')
-        ).values('month').annotate(
-            revenue=Sum('amount')
-        ).order_by('month')
-        labels = [item['month'].strftime('%b %Y') for item in monthly_revenue]
-        values = [float(item['revenue'] or 0) for item in monthly_revenue]
+    def _process(self, request, **kwargs):
+        end_date = timezone.localdate()
+        start_date = (end_date.replace(day=1) - timedelta(days=365)).replace(day=1)
+        # Summed from the daily activity rollups the dashboard reads
+        monthly_revenue = get_monthly_won_revenue(start_date)
+        labels = [month.strftime('%b %Y') for month, revenue in monthly_revenue]
+        values = [float(revenue or 0) for month, revenue in monthly_revenue]
         context = {
             'img': self._plot(labels, values) if labels else None,
         }
@@ -146,38 +172,39 @@ class RevenueChartPlugin(BaseDashboardPlugin):
     # Matplotlib version implemented above
 
 
-class LeadSourcesPlugin(BaseDashboardPlugin):
+class LeadSourcesPlugin(CachedDashboardPlugin):
     name = 'lead_sources'
     title = _('Lead Sources')
     description = _('Lead distribution by sources (Matplotlib)')
     category = _('Analytics')
 
     def _plot(self, labels, total, converted):
-        fig, ax = plt.subplots(figsize=(6, 3))
-        x = range(len(labels))
-        ax.bar(x, total, width=0.4, label='Total', color='#3b82f6')
-        ax.bar([i+0.4 for i in x], converted, width=0.4, label='Converted', color='#10b981')
-        ax.set_xticks([i+0.2 for i in x])
-        ax.set_xticklabels(labels, rotation=45, ha='right')
-        ax.set_title('Lead sources')
-        ax.legend(loc='lower center', ncol=2)
-        fig.tight_layout()
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', dpi=120)
-        plt.close(fig)
-        buf.seek(0)
-        return 'data:image/png;base64,' + base64.b64encode(buf.read()).decode('ascii')
+        def draw(ax):
+            x = range(len(labels))
+            ax.bar(x, total, width=0.4, label='Total', color='#3b82f6')
+            ax.bar([i+0.4 for i in x], converted, width=0.4, label='Converted', color='#10b981')
+            ax.set_xticks([i+0.2 for i in x])
+            ax.set_xticklabels(labels, rotation=45, ha='right')
+            ax.set_title('Lead sources')
+            ax.legend(loc='lower center', ncol=2)
+        return render_svg(draw)
 
-    def process(self, request, **kwargs):
-        lead_sources = Lead.objects.values('lead_source__name').annotate(
+    def _process(self, request, **kwargs):
+        converted_q = Q(contact__isnull=False)
+        lead_sources = list(Lead.objects.values('lead_source__name').annotate(
             count=Count('id'),
-            converted=Count('id', filter=Q(contact__isnull=False))
-        ).order_by('-count')[:10]
+            converted=Count('id', filter=converted_q)
+        ).order_by('-count')[:10])
         labels = [(s['lead_source__name'] or 'Unknown') for s in lead_sources]
         total = [s['count'] for s in lead_sources]
         converted = [s['converted'] for s in lead_sources]
-        total_leads = sum(total)
-        total_converted = sum(converted)
+        # Overall rates cover all sources, not only the top ten shown
+        totals = Lead.objects.aggregate(
+            total=Count('id'),
+            converted=Count('id', filter=converted_q)
+        )
+        total_leads = totals['total']
+        total_converted = totals['converted']
         conversion_rate = (total_converted / total_leads * 100) if total_leads > 0 else 0
         context = {
             'img': self._plot(labels, total, converted) if labels else None,
@@ -189,7 +216,7 @@ class LeadSourcesPlugin(BaseDashboardPlugin):
         return render_to_string('analytics/dash/lead_sources.html', context)
 
 
-class SalesFunnelPlugin(BaseDashboardPlugin):
+class SalesFunnelPlugin(CachedDashboardPlugin):
     """Sales Funnel Analysis Plugin"""
     
     name = 'sales_funnel'
@@ -197,23 +224,24 @@ class SalesFunnelPlugin(BaseDashboardPlugin):
     description = _('Deal progression through sales stages')
     category = _('Analytics')
     
-    def process(self, request, **kwargs):
+    def _process(self, request, **kwargs):
         """Process sales funnel data"""
         # Get deals by stage
-        funnel_data = Deal.objects.values(
-            'stage__title'
+        funnel_data = list(Deal.objects.values(
+            'stage__name'
         ).annotate(
             count=Count('id'),
             total_value=Sum('amount')
-        ).order_by('stage__index')
+        ).order_by('stage__index_number'))
         
-        # Calculate funnel metrics
-        total_deals = Deal.objects.count()
-        total_value = Deal.objects.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
+        # Every deal falls into exactly one stage group, so the funnel totals
+        # are the sums of the groups and need no queries of their own
+        total_deals = sum(stage['count'] for stage in funnel_data)
+        total_value = sum((stage['total_value'] or Decimal('0') for stage in funnel_data), Decimal('0'))
         
         funnel_stages = []
         for i, stage in enumerate(funnel_data):
-            stage_name = stage['stage__title'] or f'Stage {i+1}'
+            stage_name = stage['stage__name'] or f'Stage {i+1}'
             stage_count = stage['count']
             stage_value = stage['total_value'] or Decimal('0')
             
@@ -238,7 +266,7 @@ class SalesFunnelPlugin(BaseDashboardPlugin):
         return render_to_string('analytics/dash/sales_funnel.html', context)
 
 
-class TopPerformersPlugin(BaseDashboardPlugin):
+class TopPerformersPlugin(CachedDashboardPlugin):
     """Top Performers Plugin"""
     
     name = 'top_performers'
@@ -246,35 +274,25 @@ class TopPerformersPlugin(BaseDashboardPlugin):
     description = _('Top performing sales representatives')
     category = _('Analytics')
     
-    def process(self, request, **kwargs):
+    def _process(self, request, **kwargs):
         """Process top performers data"""
         # Get current month start
         now = timezone.now()
         month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
-        # Top performers by deals won
-        top_by_deals = Deal.objects.filter(
-            stage__title__icontains='won',
-            creation_date__gte=month_start
-        ).values(
-            'owner__first_name', 
-            'owner__last_name'
-        ).annotate(
-            deals_count=Count('id'),
-            total_revenue=Sum('amount')
-        ).order_by('-deals_count')[:5]
-        
-        # Top performers by revenue
-        top_by_revenue = Deal.objects.filter(
-            stage__title__icontains='won',
+        # One grouped query, ranked two ways in Python
+        rows = list(Deal.objects.filter(
+            is_won=True,
             creation_date__gte=month_start
         ).values(
-            'owner__first_name', 
+            'owner__first_name',
             'owner__last_name'
         ).annotate(
             deals_count=Count('id'),
             total_revenue=Sum('amount')
-        ).order_by('-total_revenue')[:5]
+        ))
+        top_by_deals = sorted(rows, key=lambda r: -r['deals_count'])[:5]
+        top_by_revenue = sorted(rows, key=lambda r: -(r['total_revenue'] or 0))[:5]
         
         context = {
             'top_by_deals': top_by_deals,
@@ -285,7 +303,7 @@ class TopPerformersPlugin(BaseDashboardPlugin):
         return render_to_string('analytics/dash/top_performers.html', context)
 
 
-class RecentActivityPlugin(BaseDashboardPlugin):
+class RecentActivityPlugin(CachedDashboardPlugin):
     """Recent Activity Plugin"""
     
     name = 'recent_activity'
@@ -293,22 +311,33 @@ class RecentActivityPlugin(BaseDashboardPlugin):
     description = _('Latest CRM activities')
     category = _('Analytics')
     
-    def process(self, request, **kwargs):
+    def _process(self, request, **kwargs):
         """Process recent activity data"""
+        # Load only the columns the template shows
+        owner_name = ('owner__first_name', 'owner__last_name')
+        contact_name = ('contact__first_name', 'contact__middle_name', 'contact__last_name')
+
         # Recent deals (last 10)
-        recent_deals = Deal.objects.select_related(
-            'owner', 'contact', 'company'
-        ).order_by('-creation_date')[:10]
+        recent_deals = list(Deal.objects.select_related(
+            'owner', 'contact', 'stage'
+        ).only(
+            'name', 'amount', 'creation_date', 'stage__name', *owner_name, *contact_name
+        ).order_by('-creation_date')[:10])
         
         # Recent leads (last 10)
-        recent_leads = Lead.objects.select_related(
+        recent_leads = list(Lead.objects.select_related(
             'owner', 'lead_source'
-        ).order_by('-creation_date')[:10]
+        ).only(
+            'first_name', 'middle_name', 'last_name', 'company_name', 'disqualified',
+            'was_in_touch', 'creation_date', 'lead_source__name', *owner_name
+        ).order_by('-creation_date')[:10])
         
         # Recent requests (last 10)
-        recent_requests = Request.objects.select_related(
+        recent_requests = list(Request.objects.select_related(
             'owner', 'contact'
-        ).order_by('-creation_date')[:10]
+        ).only(
+            'creation_date', *owner_name, *contact_name
+        ).order_by('-creation_date')[:10])
         
         context = {
             'recent_deals': recent_deals,
@@ -319,7 +348,7 @@ class RecentActivityPlugin(BaseDashboardPlugin):
         return render_to_string('analytics/dash/recent_activity.html', context)
 
 
-class ForecastsPlugin(BaseDashboardPlugin):
+class ForecastsPlugin(CachedDashboardPlugin):
     name = 'forecasts'
     title = _('Forecasts')
     description = _('Leads and clients forecasts with suggested actions')
@@ -327,9 +356,10 @@ class ForecastsPlugin(BaseDashboardPlugin):
 
     # plotting delegated to analytics.utils.mpl.plot_forecast
 
-    def process(self, request, **kwargs):
-        lf = forecast_new_leads() or None
-        cf = forecast_new_clients_with_reach() or None
+    def _process(self, request, **kwargs):
+        # Serve forecasts persisted by `recompute_forecasts`; fit live only if none are stored
+        lf = get_forecast(SERIES_LEADS)
+        cf = get_forecast(SERIES_CLIENTS)
         na = suggest_next_actions() or []
         lead_img = None
         client_img = None
@@ -345,53 +375,59 @@ class ForecastsPlugin(BaseDashboardPlugin):
         return render_to_string('analytics/dash/forecasts.html', context)
 
 
-class KPIMetricsPlugin(BaseDashboardPlugin):
+class KPIMetricsPlugin(CachedDashboardPlugin):
     name = 'kpi_metrics'
     title = _('KPI Metrics')
     description = _('Key Performance Indicators')
     category = _('Analytics')
 
-    def process(self, request, **kwargs):
-        from datetime import datetime
-        now = datetime.now()
+    def _process(self, request, **kwargs):
+        now = timezone.localtime()
         current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        if now.month == 1:
-            prev_month_start = now.replace(year=now.year-1, month=12, day=1)
-            prev_month_end = current_month_start - timedelta(days=1)
-        else:
-            prev_month_start = now.replace(month=now.month-1, day=1)
-            prev_month_end = current_month_start - timedelta(days=1)
-        current_deals = Deal.objects.filter(creation_date__gte=current_month_start)
-        current_won_deals = current_deals.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
-        current_revenue = current_won_deals.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-        current_leads = Lead.objects.filter(creation_date__gte=current_month_start).count()
-        prev_deals = Deal.objects.filter(creation_date__range=[prev_month_start, prev_month_end])
-        prev_won_deals = prev_deals.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
-        prev_revenue = prev_won_deals.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-        prev_leads = Lead.objects.filter(creation_date__range=[prev_month_start, prev_month_end]).count()
+        prev_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+        # Both months are counted in one pass over each table
+        current_period = Q(creation_date__gte=current_month_start)
+        prev_period = Q(creation_date__gte=prev_month_start, creation_date__lt=current_month_start)
+        won_q = Q(is_won=True)
+        kpi_deals = Deal.objects.filter(current_period | prev_period).aggregate(
+            current_won=Count('id', filter=current_period & won_q),
+            current_revenue=Sum('amount', filter=current_period & won_q),
+            prev_won=Count('id', filter=prev_period & won_q),
+            prev_revenue=Sum('amount', filter=prev_period & won_q),
+        )
+        kpi_leads = Lead.objects.filter(current_period | prev_period).aggregate(
+            current=Count('id', filter=current_period),
+            prev=Count('id', filter=prev_period),
+        )
+        current_won_count = kpi_deals['current_won']
+        current_revenue = kpi_deals['current_revenue'] or Decimal('0')
+        current_leads = kpi_leads['current']
+        prev_won_count = kpi_deals['prev_won']
+        prev_revenue = kpi_deals['prev_revenue'] or Decimal('0')
+        prev_leads = kpi_leads['prev']
         def change(cur, prev):
             if prev == 0:
                 return 100 if cur > 0 else 0
             return ((cur - prev) / prev) * 100
         context = {
             'current_revenue': current_revenue,
-            'current_deals': current_won_deals.count(),
+            'current_deals': current_won_count,
             'current_leads': current_leads,
             'revenue_change': round(change(float(current_revenue), float(prev_revenue)), 1),
-            'deals_change': round(change(current_won_deals.count(), prev_won_deals.count()), 1),
+            'deals_change': round(change(current_won_count, prev_won_count), 1),
             'leads_change': round(change(current_leads, prev_leads), 1),
             'current_month': now.strftime('%B %Y'),
             'previous_month': prev_month_start.strftime('%B %Y'),
         }
         return render_to_string('analytics/dash/kpi_metrics.html', context)
 
-class RevenueForecastPlugin(BaseDashboardPlugin):
+class RevenueForecastPlugin(CachedDashboardPlugin):
     name = 'revenue_forecast'
     title = _('Revenue Forecast')
     description = _('Revenue forecast for next 3 months (Matplotlib)')
     category = _('Forecasts')
 
-    def process(self, request, **kwargs):
+    def _process(self, request, **kwargs):
         from analytics.utils.bi_helpers import get_forecast_data
         # owner_filter could be enriched from request/user context if needed
         owner_filter = {}
@@ -400,25 +436,24 @@ class RevenueForecastPlugin(BaseDashboardPlugin):
         if data:
             labels = data.get('labels') or []
             values = data.get('data') or []
-            fig, ax = plt.subplots(figsize=(6, 3))
-            ax.plot(labels, values, label='Forecast', color='#10b981', linestyle='--', marker='o')
-            ax.set_title('Revenue forecast (3 months)')
-            ax.legend(loc='lower center', ncol=2)
-            ax.tick_params(axis='x', labelrotation=45)
-            img = to_img(fig)
+            def draw(ax):
+                ax.plot(labels, values, label='Forecast', color='#10b981', linestyle='--', marker='o')
+                ax.set_title('Revenue forecast (3 months)')
+                ax.legend(loc='lower center', ncol=2)
+                ax.tick_params(axis='x', labelrotation=45)
+            img = render_svg(draw)
         context = {'img': img}
         return render_to_string('analytics/dash/revenue_forecast.html', context)
 
-class DailyRevenueForecastPlugin(BaseDashboardPlugin):
+class DailyRevenueForecastPlugin(CachedDashboardPlugin):
     name = 'daily_revenue_forecast'
     title = _('Daily Revenue Forecast')
     description = _('Daily revenue forecast for next 60 days (Matplotlib)')
     category = _('Forecasts')
 
-    def process(self, request, **kwargs):
-        from analytics.utils.forecasting import forecast_daily_revenue
+    def _process(self, request, **kwargs):
         img = None
-        f = forecast_daily_revenue()
+        f = get_forecast(SERIES_REVENUE)
         if f:
             img = plot_forecast(f.history_labels or [], f.history_values or [], f.labels or [], f.yhat or [], f.yhat_lower, f.yhat_upper, '#10b981', 'Daily revenue forecast (60d)')
         context = {'img': img}
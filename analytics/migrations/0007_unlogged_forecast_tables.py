@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Forecast tables are fully re-derived by the `recompute_forecasts` command,
+# so on PostgreSQL they skip the write-ahead log. After a crash such tables
+# come back empty and are refilled by the next scheduled recompute.
+FORECAST_TABLES = (
+    'analytics_forecastpoint',
+    'analytics_nextactionforecast',
+    'analytics_clientnextactionforecast',
+)
+
+
+def set_persistence(persistence):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for table in FORECAST_TABLES:
+            schema_editor.execute(
+                f'ALTER TABLE {schema_editor.quote_name(table)} SET {persistence}'
+            )
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_dailyrevenuestat_forecastsstat_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_persistence('UNLOGGED'), set_persistence('LOGGED')),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_unlogged_forecast_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRevenueRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Monthly revenue rollup',
+                'verbose_name_plural': 'Monthly revenue rollups',
+            },
+        ),
+    ]
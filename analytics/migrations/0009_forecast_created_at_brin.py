@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# cleanup_old_forecasts_task purges forecast rows by created_at. Rows are
+# appended in creation order, so on PostgreSQL a BRIN index keeps that range
+# scan cheap at a fraction of the size of a B-tree.
+FORECAST_TABLES = (
+    'analytics_forecastpoint',
+    'analytics_nextactionforecast',
+    'analytics_clientnextactionforecast',
+)
+
+
+def index_name(table):
+    return f'{table[len("analytics_"):]}_created_brin'
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in FORECAST_TABLES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {schema_editor.quote_name(index_name(table))} '
+            f'ON {schema_editor.quote_name(table)} USING brin (created_at)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in FORECAST_TABLES:
+        schema_editor.execute(
+            f'DROP INDEX IF EXISTS {schema_editor.quote_name(index_name(table))}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_monthlyrevenuerollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
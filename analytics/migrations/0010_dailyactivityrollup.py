@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_forecast_created_at_brin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivityRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('owner_id', models.IntegerField(blank=True, null=True)),
+                ('department_id', models.IntegerField(blank=True, null=True)),
+                ('deals', models.PositiveIntegerField(default=0)),
+                ('won_deals', models.PositiveIntegerField(default=0)),
+                ('won_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('leads', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily activity rollup',
+                'verbose_name_plural': 'Daily activity rollups',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_dailyactivityrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='forecastpoint',
+            name='series_key',
+            field=models.CharField(max_length=64),
+        ),
+    ]
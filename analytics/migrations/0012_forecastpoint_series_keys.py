@@ -0,0 +1,29 @@
+from django.db import migrations
+
+# series keys the predict tasks used before they shared recompute_forecasts' keys
+OLD_SERIES_KEYS = {
+    'daily_revenue': 'revenue_daily',
+    'new_leads': 'leads_daily',
+    'new_clients': 'clients_daily',
+}
+
+
+def rename_series_keys(apps, schema_editor):
+    ForecastPoint = apps.get_model('analytics', 'ForecastPoint')
+    for old_key, new_key in OLD_SERIES_KEYS.items():
+        ForecastPoint.objects.filter(
+            series_key=old_key,
+            date__in=ForecastPoint.objects.filter(series_key=new_key).values('date')
+        ).delete()
+        ForecastPoint.objects.filter(series_key=old_key).update(series_key=new_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0011_forecastpoint_drop_series_key_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_series_keys, migrations.RunPython.noop),
+    ]
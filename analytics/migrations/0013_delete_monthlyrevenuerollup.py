@@ -0,0 +1,16 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:06
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0012_forecastpoint_series_keys'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='MonthlyRevenueRollup',
+        ),
+    ]
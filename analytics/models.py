@@ -77,7 +77,9 @@ class SalesFunnel(Deal):
         verbose_name_plural = _('Sales funnel')
         
 class ForecastPoint(models.Model):
-    series_key = models.CharField(max_length=64, db_index=True)
+    # (series_key, date) lookups and per-series scans in either date order
+    # use the unique (series_key, date) index
+    series_key = models.CharField(max_length=64)
     date = models.DateField(db_index=True)
     yhat = models.FloatField()
     yhat_lower = models.FloatField(null=True, blank=True)
@@ -117,6 +119,25 @@ class ClientNextActionForecast(models.Model):
         unique_together = (('company_id', 'suggested_action'),)
 
 
+class DailyActivityRollup(models.Model):
+    """
+    Deals, won deals and leads created per day, owner and department,
+    rebuilt by the `refresh_dashboard_rollups` task and, one day at a time,
+    when a deal or lead of that day changes.
+    """
+    day = models.DateField(db_index=True)
+    owner_id = models.IntegerField(null=True, blank=True)
+    department_id = models.IntegerField(null=True, blank=True)
+    deals = models.PositiveIntegerField(default=0)
+    won_deals = models.PositiveIntegerField(default=0)
+    won_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    leads = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('Daily activity rollup')
+        verbose_name_plural = _('Daily activity rollups')
+
+
 class ForecastsStat(Deal):
     class Meta:
         proxy = True
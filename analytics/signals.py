@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from analytics.utils.bi_helpers import refresh_daily_rollup
+from analytics.utils.dashboard_cache import bump_dashboard_cache_version
+from crm.models import Deal
+from crm.models import Lead
+from crm.models import Request
+
+
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+@receiver(post_save, sender=Lead)
+@receiver(post_delete, sender=Lead)
+@receiver(post_save, sender=Request)
+@receiver(post_delete, sender=Request)
+def dashboard_data_changed_handler(sender, **kwargs):
+    bump_dashboard_cache_version()
+
+
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+@receiver(post_save, sender=Lead)
+@receiver(post_delete, sender=Lead)
+def daily_activity_changed_handler(sender, instance, raw=False, **kwargs):
+    if not raw and instance.creation_date:
+        refresh_daily_rollup(timezone.localdate(instance.creation_date))
@@ -0,0 +1,59 @@
+from django.contrib.messages import get_messages
+from django.urls import path
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag
+
+from analytics.site.anlmodeladmin import AnlModelAdmin
+from analytics.views import get_dashboard_context
+from analytics.views import get_dashboard_etag
+
+
+class DashboardAdmin(AnlModelAdmin):
+    """Base for admins whose changelist shows the analytics dashboard data."""
+    list_display = ()
+    title = None
+
+    # -- ModelAdmin methods -- #
+
+    def changelist_view(self, request, extra_context=None):
+        etag = quote_etag(get_dashboard_etag(request))
+        # pending messages are shown once, so such a page is always rendered
+        if not get_messages(request):
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return response
+
+        filters, data = get_dashboard_context(request)
+        extra = {
+            'title': self.title,
+            **self.get_dashboard_extra_context(data),
+            **filters,
+        }
+        if extra_context:
+            extra_context.update(extra)
+        else:
+            extra_context = extra
+        response = super().changelist_view(request, extra_context=extra_context)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            # browsers keep the page but revalidate it on every visit
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_urls(self):
+        urls = super().get_urls()
+        name = '%s_%s_changelist' % (self.opts.app_label, self.opts.model_name)
+        index = next(i for i, v in enumerate(urls) if v.name == name)
+        # admin views are wrapped in never_cache, which would stop browsers
+        # from keeping the page they revalidate with the ETag
+        view = self.admin_site.admin_view(self.changelist_view, cacheable=True)
+        view.model_admin = self
+        urls[index] = path('', view, name=name)
+        return urls
+
+    # -- custom methods -- #
+
+    def get_dashboard_extra_context(self, data: dict) -> dict:
+        """Should be realized in child class."""
+        return {}
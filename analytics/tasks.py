@@ -1,6 +1,7 @@
 from __future__ import annotations
-from celery import shared_task
+from celery import chord, group, shared_task
 from django.core.management import call_command
+from django.db import connection, transaction
 from django.utils import timezone
 from datetime import timedelta
 import logging
@@ -39,8 +40,7 @@ def predict_revenue_task(horizon_days: int = 30):
     Args:
         horizon_days: Number of days to predict
     """
-    from analytics.utils.forecasting import forecast_daily_revenue
-    from analytics.models import ForecastPoint
+    from analytics.utils.forecasting import forecast_daily_revenue, save_forecast, SERIES_REVENUE
     
     logger.info(f"Starting revenue prediction for {horizon_days} days")
     
@@ -56,31 +56,18 @@ def predict_revenue_task(horizon_days: int = 30):
                 'points_saved': 0
             }
         
-        # Clear old forecasts for this series
-        ForecastPoint.objects.filter(series_key='daily_revenue').delete()
-        
-        # Save forecast points
-        points_created = 0
-        for i, (date, yhat, ylow, yhigh) in enumerate(zip(
-            forecast.dates, forecast.yhat, forecast.yhat_lower, forecast.yhat_upper
-        )):
-            ForecastPoint.objects.create(
-                series_key='daily_revenue',
-                date=date,
-                yhat=yhat,
-                yhat_lower=ylow,
-                yhat_upper=yhigh
-            )
-            points_created += 1
+        # Upsert forecasts for this series
+        points_created = save_forecast(SERIES_REVENUE, forecast)
+        date_range = f"{forecast.labels[0]} to {forecast.labels[-1]}" if forecast.labels else ''
         
         logger.info(f"Revenue prediction completed: {points_created} points saved")
         
         return {
             'success': True,
-            'series': 'daily_revenue',
+            'series': SERIES_REVENUE,
             'points_saved': points_created,
             'horizon_days': horizon_days,
-            'date_range': f"{forecast.dates[0]} to {forecast.dates[-1]}"
+            'date_range': date_range
         }
         
     except Exception as e:
@@ -100,8 +87,7 @@ def predict_leads_task(horizon_days: int = 30):
     Args:
         horizon_days: Number of days to predict
     """
-    from analytics.utils.forecasting import forecast_new_leads
-    from analytics.models import ForecastPoint
+    from analytics.utils.forecasting import forecast_new_leads, save_forecast, SERIES_LEADS
     
     logger.info(f"Starting leads prediction for {horizon_days} days")
     
@@ -116,28 +102,14 @@ def predict_leads_task(horizon_days: int = 30):
                 'points_saved': 0
             }
         
-        # Clear old forecasts
-        ForecastPoint.objects.filter(series_key='new_leads').delete()
-        
-        # Save forecast points
-        points_created = 0
-        for date, yhat, ylow, yhigh in zip(
-            forecast.dates, forecast.yhat, forecast.yhat_lower, forecast.yhat_upper
-        ):
-            ForecastPoint.objects.create(
-                series_key='new_leads',
-                date=date,
-                yhat=yhat,
-                yhat_lower=ylow,
-                yhat_upper=yhigh
-            )
-            points_created += 1
+        # Upsert forecasts for this series
+        points_created = save_forecast(SERIES_LEADS, forecast)
         
         logger.info(f"Leads prediction completed: {points_created} points saved")
         
         return {
             'success': True,
-            'series': 'new_leads',
+            'series': SERIES_LEADS,
             'points_saved': points_created,
             'horizon_days': horizon_days
         }
@@ -159,8 +131,7 @@ def predict_clients_task(horizon_days: int = 30):
     Args:
         horizon_days: Number of days to predict
     """
-    from analytics.utils.forecasting import forecast_new_clients_with_reach
-    from analytics.models import ForecastPoint
+    from analytics.utils.forecasting import forecast_new_clients_with_reach, save_forecast, SERIES_CLIENTS
     
     logger.info(f"Starting clients prediction for {horizon_days} days")
     
@@ -175,28 +146,14 @@ def predict_clients_task(horizon_days: int = 30):
                 'points_saved': 0
             }
         
-        # Clear old forecasts
-        ForecastPoint.objects.filter(series_key='new_clients').delete()
-        
-        # Save forecast points
-        points_created = 0
-        for date, yhat, ylow, yhigh in zip(
-            forecast.dates, forecast.yhat, forecast.yhat_lower, forecast.yhat_upper
-        ):
-            ForecastPoint.objects.create(
-                series_key='new_clients',
-                date=date,
-                yhat=yhat,
-                yhat_lower=ylow,
-                yhat_upper=yhigh
-            )
-            points_created += 1
+        # Upsert forecasts for this series
+        points_created = save_forecast(SERIES_CLIENTS, forecast)
         
         logger.info(f"Clients prediction completed: {points_created} points saved")
         
         return {
             'success': True,
-            'series': 'new_clients',
+            'series': SERIES_CLIENTS,
             'points_saved': points_created,
             'horizon_days': horizon_days
         }
@@ -227,18 +184,20 @@ def predict_next_actions_task(limit_per_stage: int = 5):
     try:
         suggestions = suggest_next_actions(limit_per_stage=limit_per_stage)
         
-        # Clear old predictions
-        NextActionForecast.objects.all().delete()
-        
-        # Save new predictions
-        forecasts_created = 0
-        for suggestion in suggestions:
-            NextActionForecast.objects.create(
-                deal_id=suggestion.deal_id,
-                suggested_action=suggestion.suggested_action,
-                probability=suggestion.probability
-            )
-            forecasts_created += 1
+        # Replace old predictions
+        with transaction.atomic():
+            NextActionForecast.objects.all().delete()
+            forecasts_created = len(NextActionForecast.objects.bulk_create(
+                [
+                    NextActionForecast(
+                        deal_id=suggestion.deal_id,
+                        suggested_action=suggestion.suggested_action,
+                        probability=suggestion.probability
+                    )
+                    for suggestion in suggestions
+                ],
+                batch_size=1000
+            ))
         
         logger.info(f"Next actions prediction completed: {forecasts_created} forecasts saved")
         
@@ -274,18 +233,20 @@ def predict_client_actions_task(limit: int = 200):
     try:
         suggestions = suggest_next_actions_for_clients(limit=limit)
         
-        # Clear old predictions
-        ClientNextActionForecast.objects.all().delete()
-        
-        # Save new predictions
-        forecasts_created = 0
-        for suggestion in suggestions:
-            ClientNextActionForecast.objects.create(
-                company_id=suggestion.company_id,
-                suggested_action=suggestion.suggested_action,
-                probability=suggestion.probability
-            )
-            forecasts_created += 1
+        # Replace old predictions
+        with transaction.atomic():
+            ClientNextActionForecast.objects.all().delete()
+            forecasts_created = len(ClientNextActionForecast.objects.bulk_create(
+                [
+                    ClientNextActionForecast(
+                        company_id=suggestion.company_id,
+                        suggested_action=suggestion.suggested_action,
+                        probability=suggestion.probability
+                    )
+                    for suggestion in suggestions
+                ],
+                batch_size=1000
+            ))
         
         logger.info(f"Client actions prediction completed: {forecasts_created} forecasts saved")
         
@@ -304,52 +265,27 @@ def predict_client_actions_task(limit: int = 200):
         }
 
 
-@shared_task(name='analytics.predict_all')
-def predict_all_task(horizon_days: int = 30):
+def _prediction_signatures(horizon_days: int) -> dict:
+    """Independent prediction tasks run by predict_all_task, by result name"""
+    return {
+        'revenue': predict_revenue_task.s(horizon_days),
+        'leads': predict_leads_task.s(horizon_days),
+        'clients': predict_clients_task.s(horizon_days),
+        'next_actions': predict_next_actions_task.s(),
+        'client_actions': predict_client_actions_task.s(),
+    }
+
+
+@shared_task(name='analytics.summarize_predictions')
+def summarize_predictions_task(results: list, names: list):
     """
-    Run all prediction tasks in sequence
+    Combine the results of the prediction tasks
     
     Args:
-        horizon_days: Forecast horizon for time-series predictions
+        results: Task results, in the order of names
+        names: Result names of the tasks
     """
-    logger.info("Starting comprehensive prediction run")
-    
-    results = {}
-    
-    # Revenue prediction
-    try:
-        results['revenue'] = predict_revenue_task(horizon_days)
-    except Exception as e:
-        logger.error(f"Revenue prediction failed: {str(e)}")
-        results['revenue'] = {'success': False, 'error': str(e)}
-    
-    # Leads prediction
-    try:
-        results['leads'] = predict_leads_task(horizon_days)
-    except Exception as e:
-        logger.error(f"Leads prediction failed: {str(e)}")
-        results['leads'] = {'success': False, 'error': str(e)}
-    
-    # Clients prediction
-    try:
-        results['clients'] = predict_clients_task(horizon_days)
-    except Exception as e:
-        logger.error(f"Clients prediction failed: {str(e)}")
-        results['clients'] = {'success': False, 'error': str(e)}
-    
-    # Next actions for deals
-    try:
-        results['next_actions'] = predict_next_actions_task()
-    except Exception as e:
-        logger.error(f"Next actions prediction failed: {str(e)}")
-        results['next_actions'] = {'success': False, 'error': str(e)}
-    
-    # Next actions for clients
-    try:
-        results['client_actions'] = predict_client_actions_task()
-    except Exception as e:
-        logger.error(f"Client actions prediction failed: {str(e)}")
-        results['client_actions'] = {'success': False, 'error': str(e)}
+    results = dict(zip(names, results))
     
     # Calculate summary
     total_success = sum(1 for r in results.values() if r.get('success'))
@@ -369,6 +305,50 @@ def predict_all_task(horizon_days: int = 30):
     }
 
 
+def start_predict_all(horizon_days: int = 30):
+    """
+    Start all prediction tasks in parallel as a Celery chord without waiting
+    for them. Returns the AsyncResult of the summarize callback, whose result
+    is the summary once every prediction has finished.
+    """
+    signatures = _prediction_signatures(horizon_days)
+    return chord(group(signatures.values()))(summarize_predictions_task.s(list(signatures)))
+
+
+@shared_task(name='analytics.predict_all', bind=True)
+def predict_all_task(self, horizon_days: int = 30):
+    """
+    Run all prediction tasks
+    
+    On a worker the tasks run in parallel as a Celery chord whose callback
+    summarizes them; called directly they run in sequence in this process.
+    
+    Args:
+        horizon_days: Forecast horizon for time-series predictions
+    """
+    logger.info("Starting comprehensive prediction run")
+    
+    if not self.request.called_directly:
+        result = start_predict_all(horizon_days)
+        return {
+            'success': True,
+            'status': 'started',
+            'chord_id': result.id
+        }
+    
+    signatures = _prediction_signatures(horizon_days)
+    names = list(signatures)
+    
+    results = []
+    for name, signature in signatures.items():
+        try:
+            results.append(signature())
+        except Exception as e:
+            logger.error(f"Prediction '{name}' failed: {str(e)}")
+            results.append({'success': False, 'error': str(e)})
+    return summarize_predictions_task(results, names)
+
+
 @shared_task(name='analytics.cleanup_old_forecasts')
 def cleanup_old_forecasts_task(days_to_keep: int = 90):
     """
@@ -383,15 +363,30 @@ def cleanup_old_forecasts_task(days_to_keep: int = 90):
     
     logger.info(f"Cleaning up forecasts older than {cutoff_date.date()}")
     
+    models = (ForecastPoint, NextActionForecast, ClientNextActionForecast)
+    postgresql = connection.vendor == 'postgresql'
+    
     try:
-        # Clean forecast points
-        fp_deleted = ForecastPoint.objects.filter(created_at__lt=cutoff_date).delete()[0]
-        
-        # Clean action forecasts
-        naf_deleted = NextActionForecast.objects.filter(created_at__lt=cutoff_date).delete()[0]
-        
-        # Clean client action forecasts
-        caf_deleted = ClientNextActionForecast.objects.filter(created_at__lt=cutoff_date).delete()[0]
+        if postgresql and days_to_keep <= 0:
+            # Everything goes: TRUNCATE frees the pages at once instead of
+            # leaving every row behind as a dead tuple
+            with transaction.atomic():
+                fp_deleted, naf_deleted, caf_deleted = (m.objects.count() for m in models)
+                tables = ', '.join(connection.ops.quote_name(m._meta.db_table) for m in models)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'TRUNCATE TABLE {tables} RESTART IDENTITY')
+        else:
+            fp_deleted, naf_deleted, caf_deleted = (
+                m.objects.filter(created_at__lt=cutoff_date).delete()[0] for m in models
+            )
+            # Reclaim the dead rows and refresh planner statistics now rather
+            # than whenever autovacuum gets to these tables. VACUUM cannot
+            # run inside a transaction block.
+            if postgresql and not connection.in_atomic_block:
+                with connection.cursor() as cursor:
+                    for m, count in zip(models, (fp_deleted, naf_deleted, caf_deleted)):
+                        if count:
+                            cursor.execute(f'VACUUM (ANALYZE) {connection.ops.quote_name(m._meta.db_table)}')
         
         total_deleted = fp_deleted + naf_deleted + caf_deleted
         
@@ -414,3 +409,26 @@ def cleanup_old_forecasts_task(days_to_keep: int = 90):
             'success': False,
             'error': str(e)
         }
+
+
+@shared_task(name='analytics.refresh_dashboard_rollups')
+def refresh_dashboard_rollups_task():
+    """
+    Rebuild the daily activity rollups read by the analytics dashboard
+    """
+    from analytics.utils.bi_helpers import refresh_daily_rollups
+    
+    try:
+        rows = refresh_daily_rollups()
+        logger.info(f"Dashboard rollups refreshed: {rows} rows")
+        return {
+            'success': True,
+            'rows': rows
+        }
+        
+    except Exception as e:
+        logger.error(f"Dashboard rollup refresh failed: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
@@ -1,12 +1,20 @@
-from collections import defaultdict
-from datetime import datetime
+import hashlib
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 
-from django.db.models import Sum, Q
-from django.db.models.functions import TruncMonth, TruncDay
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum, Q
+from django.db.models.functions import TruncDate, TruncMonth, TruncDay
+from django.utils import timezone
 
+from analytics.models import DailyActivityRollup
 from crm.models import Deal, Lead
 
+FORECAST_MODEL_CACHE_TIMEOUT = 3600
+FORECAST_CACHE_TIMEOUT = 3600
+
 
 def get_cohort_data(owner_filter: Dict) -> List[Dict]:
     """
@@ -14,63 +22,201 @@ def get_cohort_data(owner_filter: Dict) -> List[Dict]:
     Retention is approximated as conversion to Contact (contact is not null).
     NOTE: Without a separate conversion timestamp, we can only mark M0 conversions.
     """
-    qs = Lead.objects.filter(**owner_filter).annotate(cohort=TruncMonth('creation_date'))
-
-    by_cohort = defaultdict(lambda: {'size': 0, 'converted_m0': 0})
-    for row in qs.values('cohort', 'contact_id'):
-        c = row['cohort']
-        by_cohort[c]['size'] += 1
-        if row['contact_id']:
-            by_cohort[c]['converted_m0'] += 1
+    qs = (
+        Lead.objects.filter(**owner_filter)
+        .annotate(cohort=TruncMonth('creation_date'))
+        .values('cohort')
+        .annotate(size=Count('id'), converted_m0=Count('id', filter=Q(contact__isnull=False)))
+        .order_by('cohort')
+    )
 
     out = []
-    for cohort in sorted(by_cohort.keys()):
-        data = by_cohort[cohort]
-        size = data['size'] or 1
-        m0 = round(data['converted_m0'] / size * 100, 1)
+    for row in qs:
+        m0 = round(row['converted_m0'] / max(row['size'], 1) * 100, 1)
         out.append({
-            'cohort': cohort.strftime('%Y-%m'),
-            'size': data['size'],
+            'cohort': row['cohort'].strftime('%Y-%m'),
+            'size': row['size'],
             'retention': [m0, 0, 0, 0, 0, 0],
         })
     return out
 
 
+ACTIVITY_FIELDS = ('deals', 'won_deals', 'won_revenue', 'leads')
+ROLLUP_DAYS = 400
+
+
+def _aggregate_daily_activity(start: date, end: Optional[date] = None,
+                              group_by: Tuple[str, ...] = (), **filters) -> Dict[tuple, Dict]:
+    """
+    Count deals, won deals, won revenue and leads created per day from `start`
+    (and before `end`), grouped by day and the `group_by` fields.
+    """
+    # local midnights, so the indexed creation_date is compared as is
+    date_filter = {'creation_date__gte': timezone.make_aware(datetime.combine(start, time.min))}
+    if end is not None:
+        date_filter['creation_date__lt'] = timezone.make_aware(datetime.combine(end, time.min))
+    fields = ('day',) + group_by
+    out: Dict[tuple, Dict] = {}
+
+    def row_for(row):
+        key = tuple(row[f] for f in fields)
+        return out.setdefault(key, dict.fromkeys(ACTIVITY_FIELDS, 0))
+
+    deals = (
+        Deal.objects.filter(**date_filter, **filters)
+        .annotate(day=TruncDate('creation_date'))
+        .values(*fields)
+        .annotate(
+            deals=Count('id'),
+            won_deals=Count('id', filter=Q(is_won=True)),
+            won_revenue=Sum('amount', filter=Q(is_won=True)),
+        )
+        .order_by()
+    )
+    for row in deals:
+        row_for(row).update(
+            deals=row['deals'],
+            won_deals=row['won_deals'],
+            won_revenue=row['won_revenue'] or Decimal('0'),
+        )
+    leads = (
+        Lead.objects.filter(**date_filter, **filters)
+        .annotate(day=TruncDate('creation_date'))
+        .values(*fields)
+        .annotate(leads=Count('id'))
+        .order_by()
+    )
+    for row in leads:
+        row_for(row)['leads'] = row['leads']
+    return out
+
+
+def _write_daily_rollups(start: date, end: Optional[date] = None) -> int:
+    rows = _aggregate_daily_activity(start, end, group_by=('owner_id', 'department_id'))
+    stale = DailyActivityRollup.objects.filter(day__gte=start)
+    if end is not None:
+        stale = stale.filter(day__lt=end)
+    with transaction.atomic():
+        stale.delete()
+        DailyActivityRollup.objects.bulk_create(
+            (
+                DailyActivityRollup(day=day, owner_id=owner_id, department_id=department_id, **values)
+                for (day, owner_id, department_id), values in rows.items()
+            ),
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def refresh_daily_rollups(days: int = ROLLUP_DAYS) -> int:
+    """Rebuild the daily activity rollups of the last `days` days. Returns the rows written."""
+    return _write_daily_rollups(timezone.localdate() - timedelta(days=days))
+
+
+def refresh_daily_rollup(day: date) -> int:
+    """
+    Rebuild the rollups of one past day, after a deal or lead of that day
+    was saved or deleted. Today is counted live and is left alone, as is
+    everything while no rollups exist yet. Returns the rows written.
+    """
+    if day >= timezone.localdate() or not DailyActivityRollup.objects.exists():
+        return 0
+    return _write_daily_rollups(day, day + timedelta(days=1))
+
+
+def get_daily_activity(start: date, owner_filter: Dict) -> Dict[date, Dict]:
+    """
+    Deals, won deals, won revenue and leads per day since `start`.
+    Days before today come from the rollups, which are rebuilt per day when
+    a deal or lead is saved or deleted; queryset updates and deletes, which
+    send no signals, show up after the next full refresh. Today is always
+    counted live. Without any rollups
+    (refresh task not scheduled yet) every day is counted live.
+    """
+    today = timezone.localdate()
+    if not DailyActivityRollup.objects.exists():
+        return {key[0]: values for key, values in _aggregate_daily_activity(start, **owner_filter).items()}
+
+    rollups = (
+        DailyActivityRollup.objects.filter(day__gte=start, day__lt=today, **owner_filter)
+        .values('day')
+        .annotate(**{f: Sum(f) for f in ACTIVITY_FIELDS})
+        .order_by()
+    )
+    out = {row.pop('day'): row for row in rollups}
+    out.update(
+        (key[0], values)
+        for key, values in _aggregate_daily_activity(max(start, today), **owner_filter).items()
+    )
+    return out
+
+
+def get_monthly_won_revenue(start: date, owner_filter: Optional[Dict] = None) -> List[Tuple[date, Decimal]]:
+    """
+    Revenue of won deals per month since `start`, summed from the daily
+    activity. Returns (first day of month, revenue) pairs in month order.
+    """
+    months: Dict[date, Decimal] = {}
+    for day, values in get_daily_activity(start, owner_filter or {}).items():
+        if values['won_deals']:
+            month = day.replace(day=1)
+            months[month] = months.get(month, 0) + values['won_revenue']
+    return sorted(months.items())
+
+
 def get_forecast_data(owner_filter: Dict) -> Optional[Dict]:
     """
     Forecast next 3 months revenue using Prophet if available, else return None.
     """
     try:
         from prophet import Prophet
+        from prophet.serialize import model_from_json, model_to_json
         import pandas as pd  # type: ignore
     except Exception:
         return None
 
     # Build monthly revenue series (won or conditionally successful deals)
     qs = (
-        Deal.objects.filter(**owner_filter)
-        .filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
+        Deal.objects.won().filter(**owner_filter)
         .annotate(month=TruncMonth('creation_date'))
         .values('month')
         .annotate(revenue=Sum('amount'))
         .order_by('month')
+        .values_list('month', 'revenue')
     )
-    rows = list(qs)
-    if not rows:
-        return None
-
-    import pandas as pd  # type: ignore
-    df = pd.DataFrame([
-        {'ds': r['month'], 'y': float(r['revenue'] or 0)} for r in rows
-    ])
+    df = pd.DataFrame.from_records(qs, columns=['ds', 'y'])
     if len(df) < 3:
         return None
+    # Prophet rejects timezone-aware timestamps
+    df['ds'] = (
+        pd.to_datetime(df['ds'], utc=True)
+        .dt.tz_convert(timezone.get_current_timezone())
+        .dt.tz_localize(None)
+    )
+    df['y'] = df['y'].astype('float64').fillna(0.0)
+
+    # The forecast only depends on the history, so it is cached under a digest
+    # of the history: new or changed won deals produce a new key.
+    digest = hashlib.blake2b(
+        pd.util.hash_pandas_object(df, index=False).values.tobytes(), digest_size=16
+    ).hexdigest()
+
+    def predict():
+        # Fitting dominates the cost; the fitted model is kept as well, so a
+        # forecast evicted before the model does not refit
+        key = f'prophet:monthly_revenue:{digest}'
+        model_json = cache.get(key)
+        if model_json is not None:
+            m = model_from_json(model_json)
+        else:
+            m = Prophet(seasonality_mode='additive', weekly_seasonality=False, daily_seasonality=False)
+            m.fit(df)
+            cache.set(key, model_to_json(m), FORECAST_MODEL_CACHE_TIMEOUT)
+        future = m.make_future_dataframe(periods=3, freq='MS')
+        tail = m.predict(future).tail(3)
+        return {
+            'labels': [d.strftime('%b %Y') for d in tail['ds']],
+            'data': [round(float(v), 2) for v in tail['yhat']],
+        }
 
-    m = Prophet(seasonality_mode='additive', weekly_seasonality=False, daily_seasonality=False)
-    m.fit(df)
-    future = m.make_future_dataframe(periods=3, freq='MS')
-    forecast = m.predict(future)
-    tail = forecast.tail(3)
-    labels = [d.strftime('%b %Y') for d in tail['ds']]
-    data = [round(float(v), 2) for v in tail['yhat']]
-    return {'labels': labels, 'data': data}
+    return cache.get_or_set(f'prophet:monthly_revenue_forecast:{digest}', predict, FORECAST_CACHE_TIMEOUT)
@@ -0,0 +1,24 @@
+from django.core.cache import cache
+
+DASHBOARD_CACHE_PREFIX = 'dash'
+DASHBOARD_CACHE_VERSION_KEY = f'{DASHBOARD_CACHE_PREFIX}:version'
+
+
+def get_dashboard_cache_version() -> int:
+    return cache.get_or_set(DASHBOARD_CACHE_VERSION_KEY, 1, None)
+
+
+def bump_dashboard_cache_version() -> None:
+    """Invalidate all cached dashboard data at once."""
+    try:
+        cache.incr(DASHBOARD_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(DASHBOARD_CACHE_VERSION_KEY, 1, None)
+
+
+def make_dashboard_cache_key(*parts) -> str:
+    version = get_dashboard_cache_version()
+    return ':'.join(
+        [DASHBOARD_CACHE_PREFIX, str(version)]
+        + ['_' if p in (None, '') else str(p) for p in parts]
+    )
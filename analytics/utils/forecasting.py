@@ -1,77 +1,79 @@
 from __future__ import annotations
+import hashlib
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
-from django.db.models.functions import TruncDay, Coalesce
-from django.db.models import Count, Sum, Q, F
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import TruncDay, Coalesce, Greatest
+from django.db.models import Count, Sum, F, Value
 from django.utils import timezone
 
-try:
-    # Prophet was renamed to 'prophet' (formerly fbprophet)
-    from prophet import Prophet  # type: ignore
-except Exception:  # pragma: no cover - allows project to run without prophet
-    Prophet = None  # type: ignore
-
+import numpy as np
 import pandas as pd  # type: ignore
 
+from analytics.models import ForecastPoint
+from analytics.utils.helpers import bulk_upsert
 from crm.models import Lead, Company, Deal
 from marketing.models import CampaignRun
 
+SERIES_LEADS = 'leads_daily'
+SERIES_CLIENTS = 'clients_daily'
+SERIES_REVENUE = 'revenue_daily'
 
-def forecast_daily_revenue(horizon_days: int = 30) -> Optional[SeriesForecast]:
-    if not _ensure_prophet():
-        return None
+# Daily revenue falls back from Prophet to an AR(1) model below these sizes
+AR1_MAX_HISTORY = 180
+AR1_MAX_HORIZON = 7
+
+# Fitted Prophet models are reused until their history changes or this many seconds pass
+PROPHET_MODEL_CACHE_TIMEOUT = 3600
+
+# Series with fewer non-zero days than this get a flat forecast instead of a model fit
+FLAT_MIN_NONZERO_DAYS = 10
+
+
+def _daily_revenue_frame() -> pd.DataFrame:
     # Aggregate daily revenue of won deals (win or conditional success); sum amount
-    qs = (
-        Deal.objects
-        .filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
-        .annotate(day=TruncDay('win_closing_date'))
-        .values('day')
-        .annotate(revenue=Sum('amount'))
-        .order_by('day')
-    )
-    rows = [r for r in qs if r['day'] is not None]
-    if not rows:
-        # fallback to creation_date if win_closing_date absent
-        qs2 = (
-            Deal.objects
-            .filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
-            .annotate(day=TruncDay('creation_date'))
+    won_deals = Deal.objects.won()
+
+    def revenue_by(date_field):
+        return _daily_frame(
+            won_deals
+            .annotate(day=TruncDay(date_field))
             .values('day')
             .annotate(revenue=Sum('amount'))
             .order_by('day')
+            .values_list('day', 'revenue')
         )
-        rows = list(qs2)
-        if not rows:
-            return None
-    start = rows[0]['day']
-    end = rows[-1]['day']
-    days = _date_range(start, end)
-    rev_map = {r['day'].strftime('%Y-%m-%d'): float(r['revenue'] or 0) for r in rows}
-    labels, values = _fill_series_map(days, rev_map)
-    if len(values) < 7:
+
+    df = revenue_by('win_closing_date')
+    if df.empty:
+        # fallback to creation_date if win_closing_date absent
+        df = revenue_by('creation_date')
+    return df
+
+
+def forecast_daily_revenue(horizon_days: int = 30) -> Optional[SeriesForecast]:
+    df = _daily_revenue_frame()
+    if len(df) < 7:
         return None
-    df = pd.DataFrame({'ds': pd.to_datetime(labels), 'y': values})
-    m = Prophet(seasonality_mode='additive', weekly_seasonality=True, daily_seasonality=False)
-    m.fit(df)
-    future = m.make_future_dataframe(periods=horizon_days, freq='D')
-    fc = m.predict(future)
-    tail = fc.tail(horizon_days)
-    labels_fc = [d.strftime('%Y-%m-%d') for d in tail['ds']]
-    return SeriesForecast(
-        labels=labels_fc,
-        yhat=[float(v) for v in tail['yhat']],
-        yhat_lower=[float(v) for v in tail['yhat_lower']],
-        yhat_upper=[float(v) for v in tail['yhat_upper']],
-        history_labels=labels,
-        history_values=values,
-        meta={'series_key': 'revenue_daily'}
-    )
+    labels = df['ds'].dt.strftime('%Y-%m-%d').tolist()
+    values = df['y'].tolist()
+    flat = _flat_forecast(labels, values, horizon_days, 'revenue_daily')
+    if flat:
+        return flat
+    # Prophet's seasonality does not pay off on a short history or horizon
+    if len(values) < AR1_MAX_HISTORY or horizon_days <= AR1_MAX_HORIZON:
+        return _ar1_forecast(labels, values, horizon_days, 'revenue_daily')
+    if not _ensure_prophet():
+        return None
+    return _prophet_forecast(df, horizon_days, labels, values, 'revenue_daily')
 
 
 
-@dataclass
+@dataclass(slots=True)
 class SeriesForecast:
     labels: List[str]
     yhat: List[float]
@@ -80,78 +82,178 @@ class SeriesForecast:
     history_labels: Optional[List[str]] = None
     history_values: Optional[List[float]] = None
     meta: Optional[Dict] = None
-    labels: List[str]
-    yhat: List[float]
-    yhat_lower: Optional[List[float]] = None
-    yhat_upper: Optional[List[float]] = None
-    history_labels: Optional[List[str]] = None
-    history_values: Optional[List[float]] = None
+
+
+@lru_cache(maxsize=None)
+def _load_prophet():
+    """
+    Import Prophet on first use; it pulls in matplotlib and cmdstanpy,
+    which processes that never fit a forecast should not pay for.
+    """
+    try:
+        # Prophet was renamed to 'prophet' (formerly fbprophet)
+        from prophet import Prophet  # type: ignore
+    except Exception:  # pragma: no cover - allows project to run without prophet
+        return None
+    return Prophet
 
 
 def _ensure_prophet() -> bool:
-    return Prophet is not None
+    return _load_prophet() is not None
 
 
-def _date_range(start: datetime, end: datetime) -> List[datetime]:
-    days = []
-    cur = start
-    while cur.date() <= end.date():
-        days.append(cur)
-        cur += timedelta(days=1)
-    return days
+def _prophet_forecast(df: pd.DataFrame, horizon_days: int, history_labels: List[str],
+                      history_values: List[float], series_key: str,
+                      regressors: Tuple[str, ...] = ()) -> SeriesForecast:
+    """
+    Fit Prophet to a daily `ds`/`y` frame and forecast the next `horizon_days`.
+    Regressor columns of `df` are carried into the future at their last known value.
+    The fitted model is cached under a digest of `df`, so an unchanged history is not refitted.
+    """
+    from prophet.serialize import model_from_json, model_to_json  # type: ignore
 
+    digest = hashlib.blake2b(
+        pd.util.hash_pandas_object(df, index=False).values.tobytes(), digest_size=16
+    ).hexdigest()
+    key = f'prophet:{series_key}:{digest}'
+    model_json = cache.get(key)
+    if model_json is not None:
+        m = model_from_json(model_json)
+    else:
+        m = _load_prophet()(seasonality_mode='additive', weekly_seasonality=True, daily_seasonality=False)
+        for name in regressors:
+            m.add_regressor(name)
+        m.fit(df)
+        cache.set(key, model_to_json(m), PROPHET_MODEL_CACHE_TIMEOUT)
 
-def _fill_series_map(dates: List[datetime], values_map: Dict[str, float]) -> Tuple[List[str], List[float]]:
-    labels = [d.strftime('%Y-%m-%d') for d in dates]
-    values = [float(values_map.get(lbl, 0)) for lbl in labels]
-    return labels, values
+    future = m.make_future_dataframe(periods=horizon_days, freq='D')
+    for name in regressors:
+        future[name] = df[name].iloc[-1] if not df.empty else 0.0
 
+    fc = m.predict(future)
+    tail = fc.tail(horizon_days)
+    return SeriesForecast(
+        labels=[d.strftime('%Y-%m-%d') for d in tail['ds']],
+        yhat=[float(v) for v in tail['yhat']],
+        yhat_lower=[float(v) for v in tail['yhat_lower']],
+        yhat_upper=[float(v) for v in tail['yhat_upper']],
+        history_labels=history_labels,
+        history_values=history_values,
+        meta={'series_key': series_key}
+    )
 
-def _aggregate_daily(model_qs, date_field: str = 'creation_date') -> Tuple[List[str], List[float]]:
-    qs = (
+
+def _ar1_forecast(history_labels: List[str], history_values: List[float],
+                  horizon_days: int, series_key: str) -> SeriesForecast:
+    """
+    Forecast the next `horizon_days` with an AR(1) model around the mean:
+    the last deviation decays by the lag-1 autocorrelation each day, with
+    95% bands from the residual spread accumulated over the horizon.
+    """
+    y = np.asarray(history_values, dtype='float64')
+    mean = y.mean()
+    dev = y - mean
+    denom = float(dev[:-1] @ dev[:-1])
+    phi = float(np.clip(dev[1:] @ dev[:-1] / denom, -0.99, 0.99)) if denom else 0.0
+    sigma = float((dev[1:] - phi * dev[:-1]).std())
+
+    steps = np.arange(1, horizon_days + 1)
+    yhat = mean + phi ** steps * dev[-1]
+    # variance of the h-step error: sigma^2 * (1 + phi^2 + ... + phi^(2(h-1)))
+    band = 1.96 * sigma * np.sqrt(np.cumsum(phi ** (2 * (steps - 1))))
+
+    return SeriesForecast(
+        labels=_future_labels(history_labels[-1], horizon_days),
+        yhat=yhat.tolist(),
+        yhat_lower=(yhat - band).tolist(),
+        yhat_upper=(yhat + band).tolist(),
+        history_labels=history_labels,
+        history_values=history_values,
+        meta={'series_key': series_key}
+    )
+
+
+def _flat_forecast(history_labels: List[str], history_values: List[float],
+                   horizon_days: int, series_key: str) -> Optional[SeriesForecast]:
+    """
+    Forecast the history mean for series too sparse or constant to fit a model on,
+    with 95% bands from their spread. Returns None for any other series.
+    """
+    y = np.asarray(history_values, dtype='float64')
+    std = float(y.std())
+    if np.count_nonzero(y) >= FLAT_MIN_NONZERO_DAYS and std > 1e-9:
+        return None
+    yhat = [float(y.mean())] * horizon_days
+    return SeriesForecast(
+        labels=_future_labels(history_labels[-1], horizon_days),
+        yhat=yhat,
+        yhat_lower=[v - 1.96 * std for v in yhat],
+        yhat_upper=[v + 1.96 * std for v in yhat],
+        history_labels=history_labels,
+        history_values=history_values,
+        meta={'series_key': series_key}
+    )
+
+
+def _future_labels(last_label: str, horizon_days: int) -> List[str]:
+    """Labels of the `horizon_days` days following `last_label`."""
+    last = datetime.strptime(last_label, '%Y-%m-%d')
+    return [(last + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, horizon_days + 1)]
+
+
+def _daily_frame(rows) -> pd.DataFrame:
+    """
+    Load day-ordered `(day, value)` rows into a `ds`/`y` frame spread over
+    every day from the first to the last one, with 0 for the days that
+    have no row. Rows without a day are dropped.
+    """
+    df = pd.DataFrame.from_records(rows, columns=['ds', 'y']).dropna(subset=['ds'])
+    if df.empty:
+        return df
+    # Prophet rejects timezone-aware timestamps
+    ds = (
+        pd.to_datetime(df['ds'], utc=True)
+        .dt.tz_convert(timezone.get_current_timezone())
+        .dt.tz_localize(None)
+        .dt.normalize()
+    )
+    series = pd.Series(df['y'].astype('float64').fillna(0.0).to_numpy(), index=ds)
+    days = pd.date_range(ds.iloc[0], ds.iloc[-1], freq='D')
+    return series.reindex(days, fill_value=0.0).rename_axis('ds').reset_index(name='y')
+
+
+def _aggregate_daily_frame(model_qs, date_field: str = 'creation_date') -> pd.DataFrame:
+    return _daily_frame(
         model_qs
         .annotate(day=TruncDay(date_field))
         .values('day')
         .annotate(c=Count('id'))
         .order_by('day')
+        .values_list('day', 'c')
     )
-    rows = list(qs)
-    if not rows:
+
+
+def _aggregate_daily(model_qs, date_field: str = 'creation_date') -> Tuple[List[str], List[float]]:
+    df = _aggregate_daily_frame(model_qs, date_field)
+    if df.empty:
         return [], []
-    start = rows[0]['day']
-    end = rows[-1]['day']
-    days = _date_range(start, end)
-    values_map = {r['day'].strftime('%Y-%m-%d'): float(r['c'] or 0) for r in rows}
-    labels, values = _fill_series_map(days, values_map)
-    return labels, values
+    return df['ds'].dt.strftime('%Y-%m-%d').tolist(), df['y'].tolist()
 
 
 def forecast_new_leads(horizon_days: int = 30) -> Optional[SeriesForecast]:
     """Prophet forecast for new leads per day."""
-    if not _ensure_prophet():
+    df = _aggregate_daily_frame(Lead.objects.all(), 'creation_date')
+    if len(df) < 7:  # minimal history
         return None
 
-    base_qs = Lead.objects.all()
-    labels, values = _aggregate_daily(base_qs, 'creation_date')
-    if len(values) < 7:  # minimal history
+    labels = df['ds'].dt.strftime('%Y-%m-%d').tolist()
+    values = df['y'].tolist()
+    flat = _flat_forecast(labels, values, horizon_days, 'leads_daily')
+    if flat:
+        return flat
+    if not _ensure_prophet():
         return None
-
-    df = pd.DataFrame({'ds': pd.to_datetime(labels), 'y': values})
-    m = Prophet(seasonality_mode='additive', weekly_seasonality=True, daily_seasonality=False)
-    m.fit(df)
-    future = m.make_future_dataframe(periods=horizon_days, freq='D')
-    fc = m.predict(future)
-    tail = fc.tail(horizon_days)
-    labels_fc = [d.strftime('%Y-%m-%d') for d in tail['ds']]
-    return SeriesForecast(
-        labels=labels_fc,
-        yhat=[float(v) for v in tail['yhat']],
-        yhat_lower=[float(v) for v in tail['yhat_lower']],
-        yhat_upper=[float(v) for v in tail['yhat_upper']],
-        history_labels=labels,
-        history_values=values,
-        meta={'series_key': 'leads_daily'}
-    )
+    return _prophet_forecast(df, horizon_days, labels, values, 'leads_daily')
 
 
 def _reach_series() -> Tuple[List[str], List[float]]:
@@ -160,20 +262,19 @@ def _reach_series() -> Tuple[List[str], List[float]]:
         CampaignRun.objects
         .annotate(day=TruncDay('started_at'))
         .values('day')
-        .annotate(sent_sum=Count('id'))  # fallback if quantities are 0; we will use delivered/sent fields if present
+        .annotate(
+            delivered_sum=Sum(Greatest('delivered', Value(0))),
+            sent_sum=Sum(Greatest('sent', Value(0))),
+            runs=Count('id'),
+        )
         .order_by('day')
     )
-    # Prefer numeric volume from delivered>0 else sent>0 else 1 per run
+    # Prefer delivered volume, else sent volume, else one per run
     labels: List[str] = []
     vals: List[float] = []
     for r in qs:
         labels.append(r['day'].strftime('%Y-%m-%d'))
-        # We do not have aggregation of delivered/sent in values() queryset here; fetch per-day sums with extra query
-        day = r['day']
-        day_runs = CampaignRun.objects.filter(started_at__date=day.date())
-        delivered = sum(max(0, x.delivered) for x in day_runs)
-        sent = sum(max(0, x.sent) for x in day_runs)
-        vals.append(float(delivered or sent or len(day_runs)))
+        vals.append(float(r['delivered_sum'] or r['sent_sum'] or r['runs']))
     return labels, vals
 
 
@@ -182,40 +283,115 @@ def forecast_new_clients_with_reach(horizon_days: int = 30) -> Optional[SeriesFo
     Prophet forecast for new clients (companies created) with marketing reach as exogenous regressor.
     Uses CampaignRun daily delivered/sent as proxy for reach.
     """
-    if not _ensure_prophet():
-        return None
-
     labels_clients, values_clients = _aggregate_daily(Company.objects.all(), 'creation_date')
     if len(values_clients) < 7:
         return None
 
     labels_reach, values_reach = _reach_series()
-    # Align by date; build a unified index
-    all_dates = sorted(set(labels_clients) | set(labels_reach))
-    clients_map = {d: 0.0 for d in all_dates}
-    reach_map = {d: 0.0 for d in all_dates}
-    clients_map.update({d: float(v) for d, v in zip(labels_clients, values_clients)})
-    reach_map.update({d: float(v) for d, v in zip(labels_reach, values_reach)})
-
-    df = pd.DataFrame({'ds': pd.to_datetime(all_dates), 'y': [clients_map[d] for d in all_dates], 'reach': [reach_map[d] for d in all_dates]})
-    m = Prophet(seasonality_mode='additive', weekly_seasonality=True, daily_seasonality=False)
-    m.add_regressor('reach')
-    m.fit(df)
+    # Align by date on the union of both indexes
+    frame = pd.DataFrame({
+        'y': pd.Series(values_clients, index=pd.to_datetime(labels_clients), dtype='float64'),
+        'reach': pd.Series(values_reach, index=pd.to_datetime(labels_reach), dtype='float64'),
+    }).fillna(0.0)
+    all_dates = frame.index.strftime('%Y-%m-%d').tolist()
 
-    future = m.make_future_dataframe(periods=horizon_days, freq='D')
-    # For the regressor, extend with last known reach (or 0)
-    last_reach = df['reach'].iloc[-1] if not df.empty else 0.0
-    future = future.merge(pd.DataFrame({'ds': future['ds'], 'reach': last_reach}), on='ds', how='left')
+    values = frame['y'].tolist()
+    flat = _flat_forecast(all_dates, values, horizon_days, 'clients_daily')
+    if flat:
+        return flat
+    if not _ensure_prophet():
+        return None
+    df = frame.rename_axis('ds').reset_index()
+    return _prophet_forecast(df, horizon_days, all_dates, values, 'clients_daily', regressors=('reach',))
 
-    fc = m.predict(future)
-    tail = fc.tail(horizon_days)
-    labels_fc = [d.strftime('%Y-%m-%d') for d in tail['ds']]
+
+def forecast_points(series_key: str, forecast: SeriesForecast) -> List[ForecastPoint]:
+    """
+    ForecastPoint objects of a forecast. Missing bounds, whole or per
+    point, fall back to the point estimate.
+    """
+    yhat = np.asarray(forecast.yhat, dtype=float)
+    bounds = []
+    for values in (forecast.yhat_lower, forecast.yhat_upper):
+        values = yhat if values is None or not len(values) else np.asarray(values, dtype=float)
+        bounds.append(np.where(np.isnan(values), yhat, values))
+    return [
+        ForecastPoint(
+            series_key=series_key,
+            date=d,
+            yhat=float(y),
+            yhat_lower=float(a),
+            yhat_upper=float(b)
+        )
+        for d, y, a, b in zip(forecast.labels, yhat, *bounds)
+    ]
+
+
+def save_forecast(series_key: str, forecast: SeriesForecast) -> int:
+    """
+    Store a forecast as the upcoming points of its series: upsert its
+    points and drop stored points from today on that it no longer covers.
+    Returns the number of points saved.
+    """
+    points = forecast_points(series_key, forecast)
+    if not points:
+        return 0
+    with transaction.atomic():
+        bulk_upsert(
+            ForecastPoint, points,
+            unique_fields=['series_key', 'date'],
+            update_fields=['yhat', 'yhat_lower', 'yhat_upper', 'updated_at'],
+            batch_size=500
+        )
+        ForecastPoint.objects.filter(
+            series_key=series_key, date__gte=timezone.localdate()
+        ).exclude(date__in=[p.date for p in points]).delete()
+    return len(points)
+
+
+def load_stored_forecast(series_key: str, history_qs=None) -> Optional[SeriesForecast]:
+    """
+    Build a forecast from the ForecastPoint rows persisted by `recompute_forecasts`
+    instead of fitting Prophet. Returns None if there are no upcoming points.
+    The history is `history_qs` counted per creation day, or a ready `ds`/`y`
+    frame.
+    """
+    rows = list(
+        ForecastPoint.objects
+        .filter(series_key=series_key, date__gte=timezone.localdate())
+        .order_by('date')
+        .values_list('date', 'yhat', 'yhat_lower', 'yhat_upper')
+    )
+    if not rows:
+        return None
+    if history_qs is None:
+        history_labels, history_values = [], []
+    else:
+        df = history_qs if isinstance(history_qs, pd.DataFrame) else _aggregate_daily_frame(history_qs)
+        history_labels = df['ds'].dt.strftime('%Y-%m-%d').tolist() if not df.empty else []
+        history_values = df['y'].tolist() if not df.empty else []
     return SeriesForecast(
-        labels=labels_fc,
-        yhat=[float(v) for v in tail['yhat']],
-        yhat_lower=[float(v) for v in tail['yhat_lower']],
-        yhat_upper=[float(v) for v in tail['yhat_upper']],
-        history_labels=all_dates,
-        history_values=[float(clients_map[d]) for d in all_dates],
-        meta={'series_key': 'clients_daily'}
+        labels=[r[0].strftime('%Y-%m-%d') for r in rows],
+        yhat=[r[1] for r in rows],
+        yhat_lower=[r[2] if r[2] is not None else r[1] for r in rows],
+        yhat_upper=[r[3] if r[3] is not None else r[1] for r in rows],
+        history_labels=history_labels,
+        history_values=history_values,
+        meta={'series_key': series_key}
     )
+
+
+def get_forecast(series_key: str) -> Optional[SeriesForecast]:
+    """
+    The forecast of a series as stored by the forecast tasks, with its
+    history, or a fresh fit while nothing is stored yet. Reading the stored
+    points keeps model fits out of the request path.
+    """
+    history, fit = {
+        SERIES_LEADS: (lambda: Lead.objects.all(), forecast_new_leads),
+        SERIES_CLIENTS: (lambda: Company.objects.all(), forecast_new_clients_with_reach),
+        SERIES_REVENUE: (_daily_revenue_frame, forecast_daily_revenue),
+    }[series_key]
+    if not ForecastPoint.objects.filter(series_key=series_key, date__gte=timezone.localdate()).exists():
+        return fit()
+    return load_stored_forecast(series_key, history())
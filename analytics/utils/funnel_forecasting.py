@@ -1,10 +1,18 @@
 from __future__ import annotations
+import re
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 from collections import defaultdict
+from functools import reduce
+from operator import or_
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, CharField, Count, Q, Value, When
 from django.utils import timezone
 from datetime import timedelta
 
+import numpy as np
+
 from crm.models import Deal
 from typing import Tuple
 
@@ -26,6 +34,44 @@ ACTION_ORDER = [
     'call', 'email', 'schedule_meeting', 'send_proposal', 'follow_up', 'close_deal'
 ]
 
+# Deal and client suggestions usually run back to back; both reuse one scan
+STAGE_PROBABILITIES_TIMEOUT = 60
+
+# Keywords of the next_step text, checked in this order
+NEXT_STEP_KEYWORDS = (
+    ('call', ('call', 'звон')),
+    ('email', ('mail', 'пис')),
+    ('schedule_meeting', ('meet', 'встреч')),
+    ('send_proposal', ('propos', 'коммер')),
+    ('follow_up', ('follow', 'напом')),
+)
+NEXT_STEP_ACTIONS = tuple(
+    (action, re.compile('|'.join(map(re.escape, words))))
+    for action, words in NEXT_STEP_KEYWORDS
+)
+
+
+def next_step_action(text: Optional[str]) -> Optional[str]:
+    """Action hinted by the next_step text of a deal, if any."""
+    text = (text or '').lower()
+    for action, pattern in NEXT_STEP_ACTIONS:
+        if pattern.search(text):
+            return action
+    return None
+
+
+def next_step_action_case() -> Case:
+    """SQL counterpart of next_step_action() that also marks won deals as 'close_deal'."""
+    return Case(
+        *(
+            When(reduce(or_, (Q(next_step__icontains=w) for w in words)), then=Value(action))
+            for action, words in NEXT_STEP_KEYWORDS
+        ),
+        When(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True), then=Value('close_deal')),
+        default=Value('follow_up'),
+        output_field=CharField(),
+    )
+
 
 def compute_stage_transition_probabilities(window_days: int = 90) -> Dict[str, Dict[str, float]]:
     """
@@ -34,68 +80,94 @@ def compute_stage_transition_probabilities(window_days: int = 90) -> Dict[str, D
     - deals with next_step text patterns
     - stages with success flags (close_deal)
     This is a heuristic placeholder that can be improved when event history is available.
+    Results are cached for STAGE_PROBABILITIES_TIMEOUT seconds.
     """
+    return cache.get_or_set(
+        f'funnel:stage_probabilities:{window_days}',
+        lambda: _compute_stage_transition_probabilities(window_days),
+        STAGE_PROBABILITIES_TIMEOUT
+    )
+
+
+def _compute_stage_transition_probabilities(window_days: int) -> Dict[str, Dict[str, float]]:
     now = timezone.now()
     start = now - timedelta(days=window_days)
     qs = Deal.objects.filter(creation_date__gte=start)
 
-    stage_counts = defaultdict(int)
     action_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
 
-    for d in qs.select_related('stage'):
-        stage_name = d.stage.name if d.stage else 'Unknown'
-        stage_counts[stage_name] += 1
-        text = (d.next_step or '').lower()
-        action = None
-        if 'call' in text or 'звон' in text:
-            action = 'call'
-        elif 'mail' in text or 'пис' in text or 'email' in text:
-            action = 'email'
-        elif 'meet' in text or 'встреч' in text:
-            action = 'schedule_meeting'
-        elif 'propos' in text or 'коммер' in text:
-            action = 'send_proposal'
-        elif 'follow' in text or 'напом' in text:
-            action = 'follow_up'
-        elif d.stage and (getattr(d.stage, 'success_stage', False) or getattr(d.stage, 'conditional_success_stage', False)):
+    for stage_name, action, deals in _stage_action_counts(qs):
+        stage_name = stage_name if stage_name is not None else 'Unknown'
+        action_counts[stage_name][action] += deals
+    if not action_counts:
+        return {}
+
+    # Normalize all stages at once on a (stages x actions) matrix, in ACTION_ORDER
+    stages = list(action_counts)
+    counts = np.array(
+        [[action_counts[stage][a] for a in ACTION_ORDER] for stage in stages], dtype='float64'
+    )
+    shares = np.round(counts / counts.sum(axis=1, keepdims=True), 4)
+    return {
+        stage: {a: float(p) for a, c, p in zip(ACTION_ORDER, stage_counts, stage_shares) if c}
+        for stage, stage_counts, stage_shares in zip(stages, counts, shares)
+    }
+
+
+def _stage_action_counts(qs):
+    """Yield (stage name, action, number of deals) for the deals of `qs`."""
+    if connection.vendor == 'postgresql':
+        # PostgreSQL folds the case of any script, so the whole count runs in SQL
+        yield from (
+            qs.annotate(action=next_step_action_case())
+            .values_list('stage__name', 'action')
+            .annotate(deals=Count('id'))
+            .order_by()
+        )
+        return
+    # Elsewhere LIKE may fold ASCII only; next steps repeat a lot,
+    # so each distinct text per stage is classified once in Python
+    rows = (
+        qs.values('stage__name', 'stage__success_stage', 'stage__conditional_success_stage', 'next_step')
+        .annotate(deals=Count('id'))
+        .order_by()
+    )
+    for r in rows:
+        action = next_step_action(r['next_step'])
+        if not action and (r['stage__success_stage'] or r['stage__conditional_success_stage']):
             action = 'close_deal'
-        if not action:
-            action = 'follow_up'
-        action_counts[stage_name][action] += 1
-
-    probs: Dict[str, Dict[str, float]] = {}
-    for stage, counts in action_counts.items():
-        total = max(1, stage_counts[stage])
-        probs[stage] = {a: round(c / total, 4) for a, c in counts.items()}
-        # Normalize and order
-        s = sum(probs[stage].values())
-        if s > 0:
-            for a in list(probs[stage].keys()):
-                probs[stage][a] = round(probs[stage][a] / s, 4)
-    return probs
+        yield r['stage__name'], action or 'follow_up', r['deals']
+
+
+def best_stage_actions() -> Dict[str, Tuple[str, float]]:
+    """Highest probability (action, probability) per stage name."""
+    return {
+        stage: max(pmap.items(), key=lambda x: x[1])
+        for stage, pmap in compute_stage_transition_probabilities().items()
+        if pmap
+    }
 
 
 def suggest_next_actions(limit_per_stage: int = 5) -> List[NextAction]:
     """
     Suggest next actions for active deals based on stage probabilities and each deal's next_step text.
     """
-    probs = compute_stage_transition_probabilities()
+    best = best_stage_actions()
     suggestions: List[NextAction] = []
 
     # Sample a few per stage
     per_stage: Dict[str, int] = defaultdict(int)
-    for d in Deal.objects.select_related('stage').order_by('-creation_date')[:500]:
-        stage_name = d.stage.name if d.stage else 'Unknown'
-        pmap = probs.get(stage_name) or {}
-        # choose highest probability action
-        if pmap:
-            action = sorted(pmap.items(), key=lambda x: x[1], reverse=True)[0]
-            suggestions.append(NextAction(deal_id=d.id, suggested_action=action[0], probability=float(action[1])))
+    deals = Deal.objects.order_by('-creation_date').values_list('id', 'stage__name')[:500]
+    for deal_id, stage_name in deals:
+        stage_name = stage_name if stage_name is not None else 'Unknown'
+        action = best.get(stage_name)
+        if action:
+            suggestions.append(NextAction(deal_id=deal_id, suggested_action=action[0], probability=float(action[1])))
             per_stage[stage_name] += 1
             if per_stage[stage_name] >= limit_per_stage:
                 continue
         else:
-            suggestions.append(NextAction(deal_id=d.id, suggested_action='follow_up', probability=0.3))
+            suggestions.append(NextAction(deal_id=deal_id, suggested_action='follow_up', probability=0.3))
     return suggestions
 
 
@@ -104,35 +176,41 @@ def suggest_next_actions_for_clients(limit: int = 200) -> List[ClientNextAction]
     Predict next actions per client (company) by aggregating deals and using stage probabilities + next_step hints.
     Returns up to 'limit' clients with the most recent activity.
     """
-    probs = compute_stage_transition_probabilities()
+    best = best_stage_actions()
     out: List[ClientNextAction] = []
 
-    qs = Deal.objects.select_related('stage','company').exclude(company__isnull=True).order_by('-creation_date')
-    seen = set()
-    for d in qs:
-        cid = d.company_id
-        if not cid or cid in seen:
-            continue
-        seen.add(cid)
-        stage_name = d.stage.name if d.stage else 'Unknown'
-        pmap = probs.get(stage_name) or {}
-        if pmap:
-            action = sorted(pmap.items(), key=lambda x: x[1], reverse=True)[0]
+    for cid, stage_name, next_step in _latest_company_deals(limit):
+        stage_name = stage_name if stage_name is not None else 'Unknown'
+        action = best.get(stage_name)
+        if action:
             out.append(ClientNextAction(company_id=cid, suggested_action=action[0], probability=float(action[1])))
         else:
             # Fallback to next_step text
-            text = (d.next_step or '').lower()
-            if 'call' in text or 'звон' in text:
-                out.append(ClientNextAction(company_id=cid, suggested_action='call', probability=0.4))
-            elif 'mail' in text or 'пис' in text or 'email' in text:
-                out.append(ClientNextAction(company_id=cid, suggested_action='email', probability=0.35))
-            elif 'meet' in text or 'встреч' in text:
-                out.append(ClientNextAction(company_id=cid, suggested_action='schedule_meeting', probability=0.35))
-            elif 'propos' in text or 'коммер' in text:
-                out.append(ClientNextAction(company_id=cid, suggested_action='send_proposal', probability=0.35))
-            else:
-                out.append(ClientNextAction(company_id=cid, suggested_action='follow_up', probability=0.3))
-        if len(out) >= limit:
-            break
+            action = next_step_action(next_step) or 'follow_up'
+            probability = {'call': 0.4, 'follow_up': 0.3}.get(action, 0.35)
+            out.append(ClientNextAction(company_id=cid, suggested_action=action, probability=probability))
     return out
 
+
+def _latest_company_deals(limit: int):
+    """
+    Yield (company id, stage name, next step) of the latest deal of
+    the `limit` companies with the most recent deals.
+    """
+    deals = Deal.objects.exclude(company__isnull=True)
+    fields = ('company_id', 'stage__name', 'next_step')
+    if connection.vendor == 'postgresql':
+        # DISTINCT ON leaves one deal per company in the database
+        latest = deals.order_by('company_id', '-creation_date').distinct('company_id').values('id')
+        yield from deals.filter(id__in=latest).order_by('-creation_date').values_list(*fields)[:limit]
+        return
+    seen = set()
+    # Stream deals; the loop usually stops long before the end of the table
+    for row in deals.order_by('-creation_date').values_list(*fields).iterator(chunk_size=2000):
+        if row[0] in seen:
+            continue
+        seen.add(row[0])
+        yield row
+        if len(seen) >= limit:
+            return
+
@@ -2,6 +2,8 @@ from abc import ABC
 from decimal import Decimal
 from dateutil.relativedelta import relativedelta
 from typing import Tuple
+from django.db import connections
+from django.db import router
 from django.db.models import Aggregate
 from django.db.models import CharField
 from django.db.models.functions import Trunc
@@ -139,3 +141,18 @@ def get_item_list(queryset: QuerySet, date) -> list:
             item_list.insert(i, {'period': date, 'total': 0})
         date = date + relativedelta(months=1)
     return item_list
+
+
+def bulk_upsert(model, objs: list, unique_fields: list, update_fields: list, **kwargs) -> list:
+    """
+    Insert objs, updating update_fields of rows that clash on
+    unique_fields. Backends without conflict targets (MySQL's ON DUPLICATE
+    KEY UPDATE) take any unique constraint, so unique_fields is only passed
+    where it is supported.
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = unique_fields
+    return model.objects.bulk_create(
+        objs, update_conflicts=True, update_fields=update_fields, **kwargs
+    )
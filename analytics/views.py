@@ -1,22 +1,36 @@
 """
 Analytics Dashboard Views - Custom Built-in Dashboard
 """
+import asyncio
+import hashlib
+import heapq
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db import connections
+from django.middleware.csrf import get_token
 from django.shortcuts import render
 from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render
 from django.http import JsonResponse
-from django.db.models import Count, Sum, Q
-from django.db.models.functions import TruncMonth, TruncDay, ExtractHour, ExtractWeekDay
+from django.db.models import Count, Max, Sum, Q
+from django.db.models.functions import TruncDay, ExtractHour, ExtractWeekDay
 from datetime import timedelta
 from django.utils import timezone
+from django.utils.translation import gettext as _
 from decimal import Decimal
 
 from crm.models import Deal, Lead, Contact, Request
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, User
 from common.models import Department
-from analytics.utils.bi_helpers import get_cohort_data, get_forecast_data
-from analytics.utils.forecasting import forecast_new_leads, forecast_new_clients_with_reach, forecast_daily_revenue
-from analytics.utils.funnel_forecasting import suggest_next_actions
+from analytics.utils.bi_helpers import get_cohort_data, get_daily_activity, get_forecast_data
+from analytics.models import ForecastPoint
+from analytics.utils.dashboard_cache import DASHBOARD_CACHE_PREFIX, get_dashboard_cache_version, make_dashboard_cache_key
+from analytics.utils.forecasting import get_forecast, SERIES_CLIENTS, SERIES_LEADS, SERIES_REVENUE
+from analytics.utils.funnel_forecasting import suggest_next_actions, suggest_next_actions_for_clients
 from analytics.dash_plugins.crm_analytics_plugins import (
     SalesOverviewPlugin,
     RevenueChartPlugin,
@@ -31,105 +45,124 @@ from analytics.dash_plugins.crm_analytics_plugins import (
 from django.contrib.auth.models import User
 from common.models import Department
 
-
-@staff_member_required
-def analytics_dashboard(request):
-    """Main analytics dashboard view (Matplotlib-rendered images)"""
-    from analytics.utils.mpl import to_img, plot_forecast
-    import matplotlib
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    import numpy as np
-
-    period = request.GET.get('period', '30d')
-    owner = request.GET.get('owner')
-    department = request.GET.get('department')
-
-    # Restrict dropdowns by user permissions
-    if request.user.is_superuser:
-        dept_qs = Department.objects.all()
-        owner_qs = User.objects.all()
-    else:
-        dept_qs = Department.objects.filter(id__in=request.user.groups.values('id'))
-        owner_qs = User.objects.filter(groups__in=dept_qs).distinct()
-
-    data = get_dashboard_data(period=period, owner_id=owner, department_id=department)
-
-    # Build images
+DASHBOARD_DATA_TIMEOUT = 300
+USER_SCOPE_TIMEOUT = 600
+MAX_WORKERS = 8
+WON_DEALS_Q = Q(is_won=True)
+
+
+def run_concurrently(*funcs):
+    """
+    Call blocking, independent functions in worker threads and
+    return their results in the order given.
+    """
+    def closing_connections(func):
+        def wrapper():
+            try:
+                return func()
+            finally:
+                # worker threads open their own DB connections
+                connections.close_all()
+        return wrapper
+
+    # Worker connections can't see rows written by an open transaction
+    # of the caller, so inside one everything runs in this thread
+    if any(conn.in_atomic_block for conn in connections.all(initialized_only=True)):
+        return [func() for func in funcs]
+
+    async def gather():
+        # each running worker holds a DB connection
+        workers = asyncio.Semaphore(MAX_WORKERS)
+
+        async def run(func):
+            async with workers:
+                return await sync_to_async(closing_connections(func), thread_sensitive=False)()
+        return await asyncio.gather(*(run(func) for func in funcs))
+    return async_to_sync(gather)()
+
+
+def get_dashboard_images(data: dict) -> dict:
+    """
+    Dashboard charts drawn server side as SVG data URIs, for clients that
+    do not run the Chart.js charts of the dashboard page.
+    """
+    from analytics.utils.mpl import cached_chart, plot_forecast
+
+    # Charts whose data did not change come from the cache
     revenue_chart_img = None
     rc = data.get('revenue_chart') or {}
     if rc.get('labels') and rc.get('data'):
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.plot(rc['labels'], rc['data'], label='Revenue', color='#10b981', marker='o')
-        ax.legend(loc='lower center', ncol=2)
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_title('Revenue by month (12m)')
-        revenue_chart_img = to_img(fig)
+        def draw(ax):
+            ax.plot(rc['labels'], rc['data'], label='Revenue', color='#10b981', marker='o')
+            ax.legend(loc='lower center', ncol=2)
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.set_title('Revenue by month (12m)')
+        revenue_chart_img = cached_chart(('revenue_chart', rc), draw)
 
     daily_trend_img = None
     dt = data.get('daily_trend') or {}
     if dt.get('labels') and (dt.get('leads') or dt.get('deals')):
-        fig, ax = plt.subplots(figsize=(6,3))
-        if dt.get('leads'):
-            ax.plot(dt['labels'], dt['leads'], label='Leads', color='#3b82f6')
-        if dt.get('deals'):
-            ax.plot(dt['labels'], dt['deals'], label='Deals', color='#ef4444')
-        ax.legend(loc='lower center', ncol=2)
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_title('Daily trend')
-        daily_trend_img = to_img(fig)
+        def draw(ax):
+            if dt.get('leads'):
+                ax.plot(dt['labels'], dt['leads'], label='Leads', color='#3b82f6')
+            if dt.get('deals'):
+                ax.plot(dt['labels'], dt['deals'], label='Deals', color='#ef4444')
+            ax.legend(loc='lower center', ncol=2)
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.set_title('Daily trend')
+        daily_trend_img = cached_chart(('daily_trend', dt), draw)
 
     stage_distribution_img = None
     sd = data.get('stage_distribution') or []
     if sd:
         labels = [x.get('stage__name') or '—' for x in sd]
         values = [x.get('count') or 0 for x in sd]
-        fig, ax = plt.subplots(figsize=(5,5))
-        ax.pie(values, labels=labels, autopct='%1.0f%%', startangle=140)
-        ax.set_title('Stage distribution')
-        stage_distribution_img = to_img(fig)
+        def draw(ax):
+            ax.pie(values, labels=labels, autopct='%1.0f%%', startangle=140)
+            ax.set_title('Stage distribution')
+        stage_distribution_img = cached_chart(('stage_distribution', labels, values), draw, (5, 5))
 
     lead_sources_img = None
     ls = (data.get('lead_sources') or {}).get('sources') or []
     if ls:
         labels = [x.get('lead_source__name') or '—' for x in ls]
         values = [x.get('count') or 0 for x in ls]
-        fig, ax = plt.subplots(figsize=(5,5))
-        ax.pie(values, labels=labels, autopct='%1.0f%%', startangle=140)
-        ax.set_title('Lead sources')
-        lead_sources_img = to_img(fig)
+        def draw(ax):
+            ax.pie(values, labels=labels, autopct='%1.0f%%', startangle=140)
+            ax.set_title('Lead sources')
+        lead_sources_img = cached_chart(('lead_sources', labels, values), draw, (5, 5))
 
     requests_trend_img = None
     rt = data.get('requests_trend') or {}
     if rt.get('labels') and rt.get('data'):
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.plot(rt['labels'], rt['data'], label='Requests', color='#6366f1')
-        ax.legend(loc='lower center', ncol=2)
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_title('Requests trend')
-        requests_trend_img = to_img(fig)
+        def draw(ax):
+            ax.plot(rt['labels'], rt['data'], label='Requests', color='#6366f1')
+            ax.legend(loc='lower center', ncol=2)
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.set_title('Requests trend')
+        requests_trend_img = cached_chart(('requests_trend', rt), draw)
 
     funnel_img = None
     fn = (data.get('sales_funnel') or {}).get('stages') or []
     if fn:
         labels = [s.get('stage__name') or s.get('name') or '—' for s in fn]
         counts = [s.get('count') or 0 for s in fn]
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.bar(labels, counts, color='#3b82f6')
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_title('Sales funnel (deal count)')
-        funnel_img = to_img(fig)
+        def draw(ax):
+            ax.bar(labels, counts, color='#3b82f6')
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.set_title('Sales funnel (deal count)')
+        funnel_img = cached_chart(('funnel', labels, counts), draw)
 
     department_breakdown_img = None
     db = data.get('department_breakdown') or []
     if db:
         labels = [x.get('department__name') or '—' for x in db]
         values = [float(x.get('total_revenue') or 0) for x in db]
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.bar(labels, values, color='#14b8a6')
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_title('Department revenue (current month)')
-        department_breakdown_img = to_img(fig)
+        def draw(ax):
+            ax.bar(labels, values, color='#14b8a6')
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.set_title('Department revenue (current month)')
+        department_breakdown_img = cached_chart(('department_breakdown', labels, values), draw)
 
     owner_workload_img = None
     ow = data.get('owner_workload') or []
@@ -137,37 +170,37 @@ def analytics_dashboard(request):
         labels = [x.get('name') or '—' for x in ow]
         created = [x.get('created') or 0 for x in ow]
         won = [x.get('won') or 0 for x in ow]
-        idx = np.arange(len(labels)); width = 0.35
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.bar(idx - width/2, created, width, label='Created', color='#60a5fa')
-        ax.bar(idx + width/2, won, width, label='Won', color='#10b981')
-        ax.set_xticks(idx)
-        ax.set_xticklabels(labels, rotation=45, ha='right')
-        ax.legend(loc='lower center', ncol=2)
-        ax.set_title('Owner workload (current month)')
-        owner_workload_img = to_img(fig)
+        def draw(ax):
+            idx = np.arange(len(labels)); width = 0.35
+            ax.bar(idx - width/2, created, width, label='Created', color='#60a5fa')
+            ax.bar(idx + width/2, won, width, label='Won', color='#10b981')
+            ax.set_xticks(idx)
+            ax.set_xticklabels(labels, rotation=45, ha='right')
+            ax.legend(loc='lower center', ncol=2)
+            ax.set_title('Owner workload (current month)')
+        owner_workload_img = cached_chart(('owner_workload', labels, created, won), draw)
 
     owner_breakdown_img = None
     ob = data.get('owner_breakdown') or []
     if ob:
         labels = ['{} {}'.format(x.get('owner__first_name') or '', x.get('owner__last_name') or '').strip() or '—' for x in ob]
         values = [float(x.get('total_revenue') or 0) for x in ob]
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.bar(labels, values, color='#14b8a6')
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_title('Owner revenue (current month)')
-        owner_breakdown_img = to_img(fig)
+        def draw(ax):
+            ax.bar(labels, values, color='#14b8a6')
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.set_title('Owner revenue (current month)')
+        owner_breakdown_img = cached_chart(('owner_breakdown', labels, values), draw)
 
     # Forecast images (optionally duplicated on admin dashboard)
     revenue_forecast_img = None
     rf = data.get('forecast') or {}
     if rf.get('labels') and rf.get('data'):
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.plot(rf['labels'], rf['data'], label='Revenue forecast', color='#10b981', linestyle='--', marker='o')
-        ax.legend(loc='lower center', ncol=2)
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_title('Revenue forecast (3 months)')
-        revenue_forecast_img = to_img(fig)
+        def draw(ax):
+            ax.plot(rf['labels'], rf['data'], label='Revenue forecast', color='#10b981', linestyle='--', marker='o')
+            ax.legend(loc='lower center', ncol=2)
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.set_title('Revenue forecast (3 months)')
+        revenue_forecast_img = cached_chart(('revenue_forecast', rf['labels'], rf['data']), draw)
 
     lead_forecast_img = None
     lf = data.get('lead_forecast') or {}
@@ -181,14 +214,7 @@ def analytics_dashboard(request):
         h = cf.get('history') or {}
         client_forecast_img = plot_forecast(h.get('labels'), h.get('values'), cf.get('labels'), cf.get('yhat'), cf.get('yhat_lower'), cf.get('yhat_upper'), '#0ea5e9', 'New clients forecast (30d)')
 
-    context = {
-        'page_title': 'Analytics Dashboard',
-        'owners': list(owner_qs.values('id','first_name','last_name').order_by('first_name','last_name')),
-        'departments': list(dept_qs.values('id','name').order_by('name')),
-        'period': period,
-        'owner': owner,
-        'department': department,
-        # Image context
+    return {
         'revenue_chart_img': revenue_chart_img,
         'daily_trend_img': daily_trend_img,
         'stage_distribution_img': stage_distribution_img,
@@ -201,7 +227,21 @@ def analytics_dashboard(request):
         'revenue_forecast_img': revenue_forecast_img,
         'lead_forecast_img': lead_forecast_img,
         'client_forecast_img': client_forecast_img,
-        # Non-image data still used by tables/heatmap
+    }
+
+
+@staff_member_required
+def analytics_dashboard(request):
+    """
+    Main analytics dashboard view. The page draws its charts with Chart.js
+    from the dashboard data; `?render=images` adds server-rendered images.
+    """
+    filters, data = get_dashboard_context(request)
+    images = get_dashboard_images(data) if request.GET.get('render') == 'images' else {}
+    context = {
+        'page_title': 'Analytics Dashboard',
+        **filters,
+        **images,
         'dashboard_data': data,
     }
     return render(request, 'analytics/dashboard_admin.html', context)
@@ -213,78 +253,163 @@ def dashboard_api(request):
     period = request.GET.get('period', '30d')
     owner = request.GET.get('owner')
     department = request.GET.get('department')
-    return JsonResponse(get_dashboard_data(period=period, owner_id=owner, department_id=department))
+    return JsonResponse(get_cached_dashboard_data(period=period, owner_id=owner, department_id=department))
 
 @staff_member_required
 def analytics_forecasts(request):
-    period = request.GET.get('period', '30d')
-    owner = request.GET.get('owner')
-    department = request.GET.get('department')
     # Reuse same lists for filters as main dashboard
-    if request.user.is_superuser:
-        dept_qs = Department.objects.all()
-        owner_qs = User.objects.all()
-    else:
-        dept_qs = Department.objects.filter(id__in=request.user.groups.values('id'))
-        owner_qs = User.objects.filter(groups__in=dept_qs).distinct()
-    # Build payload focused on forecasts
-    data = get_dashboard_data(period=period, owner_id=owner, department_id=department)
+    filters = get_dashboard_filters(request)
     context = {
         'page_title': 'Forecasts Dashboard',
-        'forecasts_data': {
-            'forecast': data.get('forecast'),
-            'lead_forecast': data.get('lead_forecast'),
-            'client_forecast': data.get('client_forecast'),
-            'funnel_next_actions': data.get('funnel_next_actions'),
-            'client_next_actions': data.get('client_next_actions'),
-        },
-        'owners': list(owner_qs.values('id','first_name','last_name').order_by('first_name','last_name')),
-        'departments': list(dept_qs.values('id','name').order_by('name')),
-        'period': period,
-        'owner': owner,
-        'department': department,
+        'forecasts_data': get_cached_forecasts_data(owner_id=filters['owner'], department_id=filters['department']),
+        **filters,
     }
     return render(request, 'analytics/forecasts_dashboard.html', context)
 
 
 @staff_member_required
 def forecasts_api(request):
-    period = request.GET.get('period', '30d')
     owner = request.GET.get('owner')
     department = request.GET.get('department')
-    data = get_dashboard_data(period=period, owner_id=owner, department_id=department)
-    return JsonResponse({
-        'forecast': data.get('forecast'),
-        'lead_forecast': data.get('lead_forecast'),
-        'client_forecast': data.get('client_forecast'),
-        'funnel_next_actions': data.get('funnel_next_actions'),
-        'client_next_actions': data.get('client_next_actions'),
-    })
+    return JsonResponse(get_cached_forecasts_data(owner_id=owner, department_id=department))
+
+
+def get_group_choices(user, group_ids=None):
+    """
+    Owner and department choices of a user who is not a superuser: the
+    members of the user's groups and those groups that are departments.
+    Both come from one query over the groups joined to their members.
+    """
+    # Resolve the user's groups once instead of nesting them as subqueries
+    if group_ids is None:
+        group_ids = list(user.groups.values_list('id', flat=True))
+    rows = Group.objects.filter(id__in=group_ids).values(
+        'id', 'name', 'department', 'user__id', 'user__first_name', 'user__last_name'
+    )
+    owners = {}
+    departments = {}
+    for row in rows:
+        if row['department'] is not None:
+            departments[row['id']] = {'id': row['id'], 'name': row['name']}
+        # an owner can belong to several of these groups
+        if row['user__id'] is not None:
+            owners[row['user__id']] = {
+                'id': row['user__id'],
+                'first_name': row['user__first_name'],
+                'last_name': row['user__last_name'],
+            }
+    return (
+        sorted(owners.values(), key=lambda o: (o['first_name'], o['last_name'])),
+        sorted(departments.values(), key=lambda d: d['name']),
+    )
 
 
-def get_dashboard_data(period='30d', owner_id=None, department_id=None):
-    """Get all dashboard data with optional filters"""
-    # Date ranges
-    now = timezone.now()
-    period_map = {
-        '7d': timedelta(days=7),
-        '30d': timedelta(days=30),
-        '90d': timedelta(days=90),
-        '12m': timedelta(days=365),
-    }
-    window = period_map.get(period, timedelta(days=30))
-    current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    last_30_days = now - window
-    
-    # Previous month
-    if now.month == 1:
-        prev_month_start = now.replace(year=now.year-1, month=12, day=1)
-        prev_month_end = current_month_start - timedelta(days=1)
+def get_user_scope(user):
+    """
+    Owner and department choices of a user: all of them for a superuser,
+    else those of get_group_choices(). Cached per user and set of groups
+    for USER_SCOPE_TIMEOUT seconds, so joining or leaving a group shows
+    at once while other changes show within that time.
+    """
+    # Restrict dropdowns by user permissions
+    if user.is_superuser:
+        key = f'{DASHBOARD_CACHE_PREFIX}:scope:all'
+
+        def choices():
+            return (
+                list(User.objects.values('id','first_name','last_name').order_by('first_name','last_name')),
+                list(Department.objects.values('id','name').order_by('name')),
+            )
     else:
-        prev_month_start = now.replace(month=now.month-1, day=1)
-        prev_month_end = current_month_start - timedelta(days=1)
-    
-    # Base filters with safe parsing of IDs (handle 'all' or invalid values)
+        group_ids = sorted(user.groups.values_list('id', flat=True))
+        groups_digest = hashlib.blake2b(repr(group_ids).encode(), digest_size=8).hexdigest()
+        key = f'{DASHBOARD_CACHE_PREFIX}:scope:{user.pk}:{groups_digest}'
+
+        def choices():
+            return get_group_choices(user, group_ids)
+    return cache.get_or_set(key, choices, USER_SCOPE_TIMEOUT)
+
+
+def get_dashboard_filters(request) -> dict:
+    """
+    The filter context of a request: the selected period, owner and
+    department plus the owner and department choices.
+    """
+    owners, departments = get_user_scope(request.user)
+    return {
+        'owners': owners,
+        'departments': departments,
+        'period': request.GET.get('period', '30d'),
+        'owner': request.GET.get('owner'),
+        'department': request.GET.get('department'),
+    }
+
+
+def get_dashboard_context(request):
+    """
+    Return the filter context (see get_dashboard_filters) and the dashboard
+    data for a request. Computed once and kept on the request, so several
+    dashboards rendered for the same request share it.
+    """
+    ctx = getattr(request, '_dashboard_ctx', None)
+    if ctx is None:
+        filters = get_dashboard_filters(request)
+        data = get_cached_dashboard_data(
+            period=filters['period'], owner_id=filters['owner'], department_id=filters['department']
+        )
+        ctx = request._dashboard_ctx = (filters, data)
+    return ctx
+
+
+def get_dashboard_etag(request) -> str:
+    """
+    ETag of a dashboard page. It changes with the dashboard cache version
+    (bumped on Deal and Lead changes), stored forecasts, the day, the expiry
+    window of the cached dashboard data, and the user, CSRF token, language
+    and URL the page is rendered for.
+    """
+    # make sure the CSRF secret the page will embed exists before hashing it
+    get_token(request)
+    parts = (
+        get_dashboard_cache_version(),
+        ForecastPoint.objects.aggregate(m=Max('updated_at'))['m'],
+        timezone.localdate(),
+        int(time.time() // DASHBOARD_DATA_TIMEOUT),
+        request.user.pk,
+        request.META.get('CSRF_COOKIE'),
+        getattr(request, 'LANGUAGE_CODE', None),
+        request.get_full_path(),
+    )
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def get_cached_dashboard_data(period='30d', owner_id=None, department_id=None):
+    """
+    get_dashboard_data() cached per filter combination and day.
+    Entries expire after DASHBOARD_DATA_TIMEOUT seconds or as soon as
+    a deal, lead or request changes (see analytics.signals).
+    """
+    key = make_dashboard_cache_key('data', period, owner_id, department_id, timezone.localdate())
+    return cache.get_or_set(
+        key,
+        lambda: get_dashboard_data(period=period, owner_id=owner_id, department_id=department_id),
+        DASHBOARD_DATA_TIMEOUT
+    )
+
+
+def get_cached_forecasts_data(owner_id=None, department_id=None):
+    """get_forecasts_data() cached like get_cached_dashboard_data()."""
+    key = make_dashboard_cache_key('forecasts', owner_id, department_id, timezone.localdate())
+    return cache.get_or_set(
+        key,
+        lambda: get_forecasts_data(owner_id=owner_id, department_id=department_id),
+        DASHBOARD_DATA_TIMEOUT
+    )
+
+
+def get_owner_filter(owner_id=None, department_id=None) -> dict:
+    """Deal/Lead/Request filter for the selected owner and department."""
+    # Safe parsing of IDs (handle 'all' or invalid values)
     def _to_int_or_none(val):
         if val in (None, '', 'all'):
             return None
@@ -301,18 +426,268 @@ def get_dashboard_data(period='30d', owner_id=None, department_id=None):
         owner_filter['owner_id'] = owner_id_int
     if department_id_int is not None:
         owner_filter['department_id'] = department_id_int
+    return owner_filter
+
+
+def _join_name(*parts) -> str:
+    return ' '.join(filter(None, parts))
+
+
+def get_recent_activity(owner_filter: dict) -> dict:
+    """Latest deals, leads and requests matching the owner filter."""
+    # Flat rows straight from the cursor, with only the columns shown below
+    contact_name = ('contact__first_name', 'contact__middle_name', 'contact__last_name')
+    owner_name = ('owner_id', 'owner__first_name', 'owner__last_name')
+    recent_deals = (
+        Deal.objects.filter(**owner_filter).order_by('-creation_date')
+        .values('id', 'name', 'amount', 'creation_date', 'contact_id', 'company__full_name',
+                'stage__name', *owner_name, *contact_name)[:10]
+    )
+    recent_leads = (
+        Lead.objects.filter(**owner_filter).order_by('-creation_date')
+        .values('id', 'first_name', 'middle_name', 'last_name', 'company_name', 'email', 'phone',
+                'disqualified', 'was_in_touch', 'creation_date', 'lead_source__name', *owner_name)[:10]
+    )
+    recent_requests = (
+        Request.objects.filter(**owner_filter).order_by('-creation_date')
+        .values('id', 'request_for', 'description', 'creation_date', 'contact_id',
+                *owner_name, *contact_name)[:10]
+    )
+
+    def owner(row):
+        if row['owner_id'] is None:
+            return None
+        return f"{row['owner__first_name']} {row['owner__last_name']}"
 
-    # Current period metrics
-    current_deals = Deal.objects.filter(creation_date__gte=current_month_start, **owner_filter)
-    current_won_deals = current_deals.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
-    current_revenue = current_won_deals.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-    current_leads = Lead.objects.filter(creation_date__gte=current_month_start, **owner_filter).count()
+    def contact(row):
+        if row['contact_id'] is None:
+            return None
+        return _join_name(*(row[f] for f in contact_name))
+
+    def lead_name(row):
+        name = _join_name(row['first_name'], row['middle_name'], row['last_name'])
+        if row['disqualified']:
+            name = f"({_('Disqualified')}) {name}"
+        return name
+
+    return {
+        'deals': [
+            {
+                'id': deal['id'],
+                'name': deal['name'] or f"Deal #{deal['id']}",
+                'amount': float(deal['amount'] or 0),
+                'contact': contact(deal),
+                'company': deal['company__full_name'],
+                'owner': owner(deal),
+                'stage': deal['stage__name'] or 'New',
+                'creation_date': deal['creation_date'].isoformat(),
+            }
+            for deal in recent_deals
+        ],
+        'leads': [
+            {
+                'id': lead['id'],
+                'name': lead_name(lead) or f"Lead #{lead['id']}",
+                'company': lead['company_name'],
+                'email': lead['email'],
+                'phone': lead['phone'],
+                'owner': owner(lead),
+                'source': lead['lead_source__name'],
+                'disqualified': lead['disqualified'],
+                'was_in_touch': lead['was_in_touch'],
+                'creation_date': lead['creation_date'].isoformat(),
+            }
+            for lead in recent_leads
+        ],
+        'requests': [
+            {
+                'id': request['id'],
+                'subject': request['request_for'] or request['description'] or f"Request #{request['id']}",
+                'contact': contact(request),
+                'owner': owner(request),
+                'creation_date': request['creation_date'].isoformat(),
+            }
+            for request in recent_requests
+        ],
+    }
+
+
+def _series_forecast_data(f):
+    if f is None:
+        return None
+    return {
+        'labels': f.labels, 'yhat': f.yhat, 'yhat_lower': f.yhat_lower, 'yhat_upper': f.yhat_upper,
+        'history': {'labels': f.history_labels, 'values': f.history_values}
+    }
+
+
+def _next_actions_data() -> dict:
+    return {
+        'funnel_next_actions': [
+            {'deal_id': x.deal_id, 'suggested_action': x.suggested_action, 'probability': x.probability}
+            for x in suggest_next_actions()
+        ],
+        'client_next_actions': [
+            {'company_id': x.company_id, 'suggested_action': x.suggested_action, 'probability': x.probability}
+            for x in suggest_next_actions_for_clients()
+        ],
+    }
+
+
+def get_forecasts_data(owner_id=None, department_id=None) -> dict:
+    """
+    The forecast part of the dashboard data alone, for the forecasts
+    dashboard, without the queries behind the other dashboard blocks.
+    """
+    owner_filter = get_owner_filter(owner_id, department_id)
+    forecast, lead_forecast, client_forecast = run_concurrently(
+        lambda: get_forecast_data(owner_filter),
+        lambda: get_forecast(SERIES_LEADS),
+        lambda: get_forecast(SERIES_CLIENTS),
+    )
+    return {
+        'forecast': forecast,
+        'lead_forecast': _series_forecast_data(lead_forecast),
+        'client_forecast': _series_forecast_data(client_forecast),
+        **_next_actions_data(),
+    }
+
+
+def get_dashboard_data(period='30d', owner_id=None, department_id=None):
+    """Get all dashboard data with optional filters"""
+    # Date ranges
+    now = timezone.now()
+    period_map = {
+        '7d': timedelta(days=7),
+        '30d': timedelta(days=30),
+        '90d': timedelta(days=90),
+        '12m': timedelta(days=365),
+    }
+    window = period_map.get(period, timedelta(days=30))
+    # Period bounds are local midnights, so filters compare the indexed
+    # creation_date itself rather than its date
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    current_month_start = today_start.replace(day=1)
+    last_30_days = timezone.localtime(now - window).replace(hour=0, minute=0, second=0, microsecond=0)
     
-    # Previous period metrics
-    prev_deals = Deal.objects.filter(creation_date__date__range=[prev_month_start, prev_month_end], **owner_filter)
-    prev_won_deals = prev_deals.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
-    prev_revenue = prev_won_deals.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-    prev_leads = Lead.objects.filter(creation_date__date__range=[prev_month_start, prev_month_end], **owner_filter).count()
+    # Previous month
+    prev_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+    
+    # Base filters
+    owner_filter = get_owner_filter(owner_id, department_id)
+
+    # Current and previous period metrics, one pass over each table
+    current_period = Q(creation_date__gte=current_month_start)
+    prev_period = Q(creation_date__gte=prev_month_start, creation_date__lt=current_month_start)
+    window_filter = {'creation_date__gte': last_30_days, **owner_filter}
+    month_deals = Deal.objects.filter(creation_date__gte=current_month_start, **owner_filter)
+    # Past days come from the daily rollups, rebuilt per day on deal and lead changes
+    year_ago = now - timedelta(days=365)
+
+    # Activity heatmap (weekday x hour) combined for Deals + Leads + Requests,
+    # counted per model and fetched in one UNION ALL round trip
+    def activity_counts(model):
+        return (
+            model.objects.filter(**window_filter)
+            .annotate(wd=ExtractWeekDay('creation_date'), hr=ExtractHour('creation_date'))
+            .values('wd', 'hr').annotate(c=Count('id')).order_by()
+            .values_list('wd', 'hr', 'c')
+        )
+
+    # The queries are independent of each other, and so are the Prophet
+    # fits that dominate the response time, so all of them run side by
+    # side instead of one after another
+    (
+        kpi_deals, kpi_leads, overview, leads_overview, daily_activity,
+        stage_distribution, requests_daily, activity_rows,
+        owners, lead_sources, lead_totals, funnel_data, department_breakdown, cohorts,
+        forecast, lead_forecast, revenue_daily_forecast, client_forecast,
+    ) = run_concurrently(
+        lambda: Deal.objects.filter(current_period | prev_period, **owner_filter).aggregate(
+            current_won=Count('id', filter=current_period & WON_DEALS_Q),
+            current_revenue=Sum('amount', filter=current_period & WON_DEALS_Q),
+            prev_won=Count('id', filter=prev_period & WON_DEALS_Q),
+            prev_revenue=Sum('amount', filter=prev_period & WON_DEALS_Q),
+        ),
+        lambda: Lead.objects.filter(current_period | prev_period, **owner_filter).aggregate(
+            current=Count('id', filter=current_period),
+            prev=Count('id', filter=prev_period),
+        ),
+        # Last 30 days overview
+        lambda: Deal.objects.filter(**window_filter).aggregate(
+            total=Count('id'),
+            won=Count('id', filter=WON_DEALS_Q),
+            lost=Count('id', filter=Q(closing_reason__isnull=False, closing_reason__success_reason=False)),
+            revenue=Sum('amount', filter=WON_DEALS_Q),
+        ),
+        lambda: Lead.objects.filter(**window_filter).aggregate(
+            total=Count('id'),
+            converted=Count('id', filter=Q(contact__isnull=False)),
+        ),
+        lambda: get_daily_activity(min(year_ago, last_30_days).date(), owner_filter),
+        # Stage distribution (current month)
+        lambda: list(
+            month_deals
+            .values('stage__name')
+            .annotate(count=Count('id'), value=Sum('amount'))
+            .order_by('-count')
+        ),
+        # Requests volume (last period window)
+        lambda: list(
+            Request.objects.filter(**window_filter)
+            .annotate(day=TruncDay('creation_date'))
+            .values('day')
+            .annotate(c=Count('id'))
+            .order_by('day')
+        ),
+        lambda: list(
+            activity_counts(Deal).union(activity_counts(Lead), activity_counts(Request), all=True)
+        ),
+        # Created and won deals per owner (current month) for the workload,
+        # top performers and the owner breakdown
+        lambda: list(
+            month_deals
+            .values('owner_id', 'owner__first_name', 'owner__last_name')
+            .annotate(
+                created=Count('id'),
+                deals_count=Count('id', filter=WON_DEALS_Q),
+                total_revenue=Sum('amount', filter=WON_DEALS_Q),
+            )
+            .order_by()
+        ),
+        # Lead sources
+        lambda: list(Lead.objects.filter(**owner_filter).values('lead_source__name').annotate(
+            count=Count('id'),
+            converted=Count('id', filter=Q(contact__isnull=False))
+        ).order_by('-count')[:10]),
+        # over all sources, not just the ten listed
+        lambda: Lead.objects.filter(**owner_filter).aggregate(
+            total=Count('id'),
+            converted=Count('id', filter=Q(contact__isnull=False)),
+        ),
+        # Sales funnel
+        lambda: list(Deal.objects.filter(**owner_filter).values('stage__name').annotate(
+            count=Count('id'),
+            total_value=Sum('amount')
+        ).order_by('stage__index_number')),
+        lambda: list(
+            month_deals.won()
+            .values('department__name','department_id')
+            .annotate(deals_count=Count('id'), total_revenue=Sum('amount'))
+            .order_by('-total_revenue')[:10]
+        ),
+        lambda: get_cohort_data(owner_filter),
+        lambda: get_forecast_data(owner_filter),
+        # fitted by the forecast tasks; see analytics.tasks
+        lambda: get_forecast(SERIES_LEADS),
+        lambda: get_forecast(SERIES_REVENUE),
+        lambda: get_forecast(SERIES_CLIENTS),
+    )
+
+    current_revenue = kpi_deals['current_revenue'] or Decimal('0')
+    prev_revenue = kpi_deals['prev_revenue'] or Decimal('0')
+    current_leads = kpi_leads['current']
+    prev_leads = kpi_leads['prev']
     
     # Calculate changes
     def calculate_change(current, previous):
@@ -320,158 +695,77 @@ def get_dashboard_data(period='30d', owner_id=None, department_id=None):
             return 100 if current > 0 else 0
         return ((current - previous) / previous) * 100
     
-    # Last 30 days overview
-    deals_30_days = Deal.objects.filter(creation_date__date__gte=last_30_days, **owner_filter)
-    total_deals = deals_30_days.count()
-    won_deals = deals_30_days.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True)).count()
-    lost_deals = deals_30_days.filter(closing_reason__isnull=False, closing_reason__success_reason=False).count()
-    total_revenue_30 = deals_30_days.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True)).aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
+    total_deals = overview['total']
+    won_deals = overview['won']
+    lost_deals = overview['lost']
+    total_revenue_30 = overview['revenue'] or Decimal('0')
     
     # Conversion rates
     win_rate = (won_deals / total_deals * 100) if total_deals > 0 else 0
-    leads_30_days_qs = Lead.objects.filter(creation_date__date__gte=last_30_days, **owner_filter)
-    leads_30_days = leads_30_days_qs.count()
-    converted_leads = leads_30_days_qs.filter(contact__isnull=False).count()
+    leads_30_days = leads_overview['total']
+    converted_leads = leads_overview['converted']
     lead_conversion_rate = (converted_leads / leads_30_days * 100) if leads_30_days > 0 else 0
 
     # Daily trend for last period window (leads vs deals)
-    def _fill_daily_series(values_dict, days):
-        return [values_dict.get(d.strftime('%Y-%m-%d'), 0) for d in days]
-    days_range = [ (last_30_days + timedelta(days=i)).date() for i in range((now.date() - last_30_days.date()).days + 1) ]
-    day_labels = [ d.strftime('%Y-%m-%d') for d in days_range ]
-    deals_daily = (deals_30_days
-        .annotate(day=TruncDay('creation_date'))
-        .values('day')
-        .annotate(c=Count('id'))
-        .order_by('day'))
-    leads_daily = (leads_30_days_qs
-        .annotate(day=TruncDay('creation_date'))
-        .values('day')
-        .annotate(c=Count('id'))
-        .order_by('day'))
-    deals_map = { x['day'].strftime('%Y-%m-%d'): x['c'] for x in deals_daily }
-    leads_map = { x['day'].strftime('%Y-%m-%d'): x['c'] for x in leads_daily }
+    def _fill_daily_series(day_counts, days):
+        # (date, count) pairs as one count per day, 0 for missing days
+        series = pd.Series(dict(day_counts), dtype='int64')
+        series.index = pd.to_datetime(series.index)
+        return series.reindex(days, fill_value=0).tolist()
+    days_range = pd.date_range(last_30_days.date(), today_start.date(), freq='D')
+    day_labels = days_range.strftime('%Y-%m-%d').tolist()
     daily_trend = {
         'labels': day_labels,
-        'deals': _fill_daily_series(deals_map, days_range),
-        'leads': _fill_daily_series(leads_map, days_range),
+        'deals': _fill_daily_series(((d, x['deals']) for d, x in daily_activity.items()), days_range),
+        'leads': _fill_daily_series(((d, x['leads']) for d, x in daily_activity.items()), days_range),
     }
+    requests_trend = _fill_daily_series(((x['day'].date(), x['c']) for x in requests_daily), days_range)
 
-    # Stage distribution (current month)
-    stage_distribution = list(
-        Deal.objects.filter(creation_date__gte=current_month_start, **owner_filter)
-        .values('stage__name')
-        .annotate(count=Count('id'), value=Sum('amount'))
-        .order_by('-count')
-    )
-
-    # Requests volume (last period window)
-    requests_daily_qs = Request.objects.filter(creation_date__date__gte=last_30_days, **owner_filter)
-    requests_daily = (requests_daily_qs
-        .annotate(day=TruncDay('creation_date'))
-        .values('day')
-        .annotate(c=Count('id'))
-        .order_by('day'))
-    requests_map = { x['day'].strftime('%Y-%m-%d'): x['c'] for x in requests_daily }
-    requests_trend = _fill_daily_series(requests_map, days_range)
-
-    # Activity heatmap (weekday x hour) combined for Deals + Leads + Requests
-    def activity_matrix(qs, label):
-        return list(
-            qs.annotate(wd=ExtractWeekDay('creation_date'), hr=ExtractHour('creation_date'))
-              .values('wd','hr').annotate(c=Count('id')).order_by('wd','hr')
-        )
-    deals_act = activity_matrix(Deal.objects.filter(creation_date__date__gte=last_30_days, **owner_filter), 'deals')
-    leads_act = activity_matrix(Lead.objects.filter(creation_date__date__gte=last_30_days, **owner_filter), 'leads')
-    requests_act = activity_matrix(Request.objects.filter(creation_date__date__gte=last_30_days, **owner_filter), 'requests')
-
-    # Django ExtractWeekDay: 1=Sunday..7=Saturday; we'll map to 0..6 Mon..Sun
-    def to_index(wd):
-        # convert Sun..Sat (1..7) to Mon..Sun (0..6)
-        return (wd + 5) % 7
-    heatmap = [[0 for _ in range(24)] for _ in range(7)]
-    for row in deals_act + leads_act + requests_act:
-        wd = to_index(row['wd'] or 1)
-        hr = row['hr'] or 0
-        if 0 <= wd < 7 and 0 <= hr < 24:
-            heatmap[wd][hr] += row['c']
+    wd, hr, counts = np.array(activity_rows, dtype=np.int64).reshape(-1, 3).T
+    heatmap = np.zeros((7, 24), dtype=np.int64)
+    # Django ExtractWeekDay: 1=Sunday..7=Saturday; rows are Mon..Sun (0..6)
+    np.add.at(heatmap, ((wd + 5) % 7, hr), counts)
     activity_heatmap = {
         'weekdays': ['Mon','Tue','Wed','Thu','Fri','Sat','Sun'],
         'hours': [f"{h:02d}:00" for h in range(24)],
-        'matrix': heatmap,
+        'matrix': heatmap.tolist(),
     }
 
-    # Owner workload vs performance (current month)
-    owners_created = list(
-        Deal.objects.filter(creation_date__gte=current_month_start, **owner_filter)
-        .values('owner_id','owner__first_name','owner__last_name')
-        .annotate(created=Count('id'))
-    )
-    owners_won = list(
-        Deal.objects.filter(creation_date__gte=current_month_start, **owner_filter)
-        .filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True))
-        .values('owner_id')
-        .annotate(won=Count('id'))
-    )
-    won_map = { x['owner_id']: x['won'] for x in owners_won }
-    owner_workload = [
-        {
+    # Owner workload vs performance (current month), and the owners with
+    # won deals for the top performers, in one pass over the owner rows
+    owner_workload = []
+    owners_won = []
+    for o in owners:
+        first_name, last_name = o['owner__first_name'], o['owner__last_name']
+        owner_workload.append({
             'owner_id': o['owner_id'],
-            'name': ' '.join(filter(None,[o['owner__first_name'], o['owner__last_name']])) or '—',
+            'name': _join_name(first_name, last_name) or '—',
             'created': o['created'],
-            'won': won_map.get(o['owner_id'], 0)
-        } for o in owners_created
-    ]
+            'won': o['deals_count'],
+        })
+        if o['deals_count']:
+            owners_won.append({
+                'owner_id': o['owner_id'],
+                'owner__first_name': first_name,
+                'owner__last_name': last_name,
+                'deals_count': o['deals_count'],
+                'total_revenue': o['total_revenue'],
+            })
     
     # Monthly revenue chart (last 12 months)
-    year_ago = now - timedelta(days=365)
-    monthly_revenue = Deal.objects.filter(
-        creation_date__date__gte=year_ago,
-        **owner_filter
-    ).filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True)
-    ).annotate(
-        month=TruncMonth('creation_date')
-    ).values('month').annotate(
-        revenue=Sum('amount')
-    ).order_by('month')
-    
-    # Lead sources
-    lead_sources = Lead.objects.filter(**owner_filter).values('lead_source__name').annotate(
-        count=Count('id'),
-        converted=Count('id', filter=Q(contact__isnull=False))
-    ).order_by('-count')[:10]
-    
-    # Sales funnel
-    funnel_data = Deal.objects.filter(**owner_filter).values('stage__name').annotate(
-        count=Count('id'),
-        total_value=Sum('amount')
-    ).order_by('stage__index_number')
+    revenue_by_month = {}
+    for day, x in sorted(daily_activity.items()):
+        if day >= year_ago.date() and x['won_deals']:
+            month = day.replace(day=1)
+            revenue_by_month[month] = revenue_by_month.get(month, 0) + (x['won_revenue'] or 0)
+    monthly_revenue = [{'month': month, 'revenue': revenue} for month, revenue in revenue_by_month.items()]
     
     # Top performers (current month)
-    top_by_deals = Deal.objects.filter(
-        Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True),
-        creation_date__gte=current_month_start,
-        **owner_filter
-    ).values('owner__first_name', 'owner__last_name').annotate(
-        deals_count=Count('id'),
-        total_revenue=Sum('amount')
-    ).order_by('-deals_count')[:5]
+    top_by_deals = heapq.nlargest(5, owners_won, key=lambda x: x['deals_count'])
+    owners_by_revenue = heapq.nlargest(10, owners_won, key=lambda x: x['total_revenue'] or 0)
+    top_by_revenue = owners_by_revenue[:5]
     
-    top_by_revenue = Deal.objects.filter(
-        Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True),
-        creation_date__gte=current_month_start,
-        **owner_filter
-    ).values('owner__first_name', 'owner__last_name').annotate(
-        deals_count=Count('id'),
-        total_revenue=Sum('amount')
-    ).order_by('-total_revenue')[:5]
-    
-    # Recent activity
-    recent_deals = Deal.objects.select_related('owner', 'contact', 'company').filter(**owner_filter).order_by('-creation_date')[:10]
-    recent_leads = Lead.objects.select_related('owner', 'lead_source').filter(**owner_filter).order_by('-creation_date')[:10]
-    recent_requests = Request.objects.select_related('owner', 'contact').filter(**owner_filter).order_by('-creation_date')[:10]
-    
-    return {
+    data = {
         'filters': {
             'period': period,
             'owner_id': owner_id,
@@ -491,101 +785,47 @@ def get_dashboard_data(period='30d', owner_id=None, department_id=None):
         },
         'kpi_metrics': {
             'current_revenue': float(current_revenue),
-            'current_deals': current_won_deals.count(),
+            'current_deals': kpi_deals['current_won'],
             'current_leads': current_leads,
             'revenue_change': round(calculate_change(float(current_revenue), float(prev_revenue)), 1),
-            'deals_change': round(calculate_change(current_won_deals.count(), prev_won_deals.count()), 1),
+            'deals_change': round(calculate_change(kpi_deals['current_won'], kpi_deals['prev_won']), 1),
             'leads_change': round(calculate_change(current_leads, prev_leads), 1),
             'current_month': current_month_start.strftime('%B %Y'),
             'previous_month': prev_month_start.strftime('%B %Y'),
         },
         'daily_trend': daily_trend,
         'stage_distribution': stage_distribution,
-        'requests_trend': requests_trend,
         'owner_workload': owner_workload,
         'revenue_chart': {
             'labels': [item['month'].strftime('%b %Y') for item in monthly_revenue],
             'data': [float(item['revenue'] or 0) for item in monthly_revenue],
         },
         'lead_sources': {
-            'sources': list(lead_sources),
-            'total_leads': sum(item['count'] for item in lead_sources),
-            'total_converted': sum(item['converted'] for item in lead_sources),
+            'sources': lead_sources,
+            'total_leads': lead_totals['total'],
+            'total_converted': lead_totals['converted'],
         },
         'sales_funnel': {
-            'stages': list(funnel_data),
-            'total_deals': Deal.objects.filter(**owner_filter).count(),
-            'total_value': float(Deal.objects.filter(**owner_filter).aggregate(Sum('amount'))['amount__sum'] or 0),
+            'stages': funnel_data,
+            # every deal falls in one of the stage rows
+            'total_deals': sum(item['count'] for item in funnel_data),
+            'total_value': float(sum(item['total_value'] or 0 for item in funnel_data)),
         },
         'requests_trend': {'labels': day_labels, 'data': requests_trend},
         'activity_heatmap': activity_heatmap,
         'top_performers': {
-            'by_deals': list(top_by_deals),
-            'by_revenue': list(top_by_revenue),
+            'by_deals': top_by_deals,
+            'by_revenue': top_by_revenue,
             'month_name': current_month_start.strftime('%B %Y'),
         },
-        'owner_breakdown': list(Deal.objects.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True), creation_date__gte=current_month_start, **owner_filter).values('owner__first_name','owner__last_name','owner_id').annotate(deals_count=Count('id'), total_revenue=Sum('amount')).order_by('-total_revenue')[:10]),
-        'department_breakdown': list(Deal.objects.filter(Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True), creation_date__gte=current_month_start, **owner_filter).values('department__name','department_id').annotate(deals_count=Count('id'), total_revenue=Sum('amount')).order_by('-total_revenue')[:10]),
-        'cohorts': get_cohort_data(owner_filter),
-        'forecast': get_forecast_data(owner_filter),
-        'lead_forecast': (lambda f: None if f is None else {
-            'labels': f.labels, 'yhat': f.yhat, 'yhat_lower': f.yhat_lower, 'yhat_upper': f.yhat_upper,
-            'history': {'labels': f.history_labels, 'values': f.history_values}
-        })(forecast_new_leads()),
-        'revenue_daily_forecast': (lambda f: None if f is None else {
-            'labels': f.labels, 'yhat': f.yhat, 'yhat_lower': f.yhat_lower, 'yhat_upper': f.yhat_upper,
-            'history': {'labels': f.history_labels, 'values': f.history_values}
-        })(forecast_daily_revenue()),
-        'client_forecast': (lambda f: None if f is None else {
-            'labels': f.labels, 'yhat': f.yhat, 'yhat_lower': f.yhat_lower, 'yhat_upper': f.yhat_upper,
-            'history': {'labels': f.history_labels, 'values': f.history_values}
-        })(forecast_new_clients_with_reach()),
-        'funnel_next_actions': [
-            {'deal_id': x.deal_id, 'suggested_action': x.suggested_action, 'probability': x.probability}
-            for x in suggest_next_actions()
-        ],
-        'client_next_actions': [
-            {'company_id': x.company_id, 'suggested_action': x.suggested_action, 'probability': x.probability}
-            for x in (lambda: __import__('analytics.utils.funnel_forecasting', fromlist=['suggest_next_actions_for_clients']).suggest_next_actions_for_clients())()
-        ],
-        'recent_activity': {
-            'deals': [
-                {
-                    'id': deal.id,
-                    'name': deal.name or f'Deal #{deal.id}',
-                    'amount': float(deal.amount or 0),
-                    'contact': deal.contact.full_name if deal.contact else None,
-                    'company': deal.company.full_name if deal.company else None,
-                    'owner': f'{deal.owner.first_name} {deal.owner.last_name}',
-                    'stage': deal.stage.name if deal.stage else 'New',
-                    'creation_date': deal.creation_date.isoformat(),
-                }
-                for deal in recent_deals
-            ],
-            'leads': [
-                {
-                    'id': lead.id,
-                    'name': lead.full_name or f'Lead #{lead.id}',
-                    'company': lead.company_name,
-                    'email': lead.email,
-                    'phone': lead.phone,
-                    'owner': f'{lead.owner.first_name} {lead.owner.last_name}' if lead.owner else None,
-                    'source': lead.lead_source.name if lead.lead_source else None,
-                    'disqualified': lead.disqualified,
-                    'was_in_touch': lead.was_in_touch,
-                    'creation_date': lead.creation_date.isoformat(),
-                }
-                for lead in recent_leads
-            ],
-            'requests': [
-                {
-                    'id': request.id,
-                    'subject': (getattr(request, 'request_for', '') or getattr(request, 'description', '') or f'Request #{request.id}'),
-                    'contact': request.contact.full_name if request.contact else None,
-                    'owner': f'{request.owner.first_name} {request.owner.last_name}' if request.owner else None,
-                    'creation_date': request.creation_date.isoformat(),
-                }
-                for request in recent_requests
-            ],
-        },
-    }
\ No newline at end of file
+        'owner_breakdown': owners_by_revenue,
+        'department_breakdown': department_breakdown,
+        'cohorts': cohorts,
+        'forecast': forecast,
+        'lead_forecast': _series_forecast_data(lead_forecast),
+        'revenue_daily_forecast': _series_forecast_data(revenue_daily_forecast),
+        'client_forecast': _series_forecast_data(client_forecast),
+        **_next_actions_data(),
+        'recent_activity': get_recent_activity(owner_filter),
+    }
+    return data
\ No newline at end of file
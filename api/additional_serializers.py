@@ -7,10 +7,12 @@ from marketing.models import Campaign, MessageTemplate, Segment
 from voip.models import Connection, IncomingCall
 from help.models import Page, Paragraph
 
+from api.serializer_base import CachedFieldsModelSerializer
+
 
 # Massmail serializers
 
-class EmailAccountSerializer(serializers.ModelSerializer):
+class EmailAccountSerializer(CachedFieldsModelSerializer):
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
     
     class Meta:
@@ -24,7 +26,7 @@ class EmailAccountSerializer(serializers.ModelSerializer):
         }
 
 
-class SignatureSerializer(serializers.ModelSerializer):
+class SignatureSerializer(CachedFieldsModelSerializer):
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
     
     class Meta:
@@ -32,7 +34,7 @@ class SignatureSerializer(serializers.ModelSerializer):
         fields = ['id', 'owner', 'owner_name', 'name', 'content']
 
 
-class EmlMessageSerializer(serializers.ModelSerializer):
+class EmlMessageSerializer(CachedFieldsModelSerializer):
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
     
     class Meta:
@@ -41,7 +43,7 @@ class EmlMessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['creation_date', 'update_date']
 
 
-class MailingOutSerializer(serializers.ModelSerializer):
+class MailingOutSerializer(CachedFieldsModelSerializer):
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
     message_name = serializers.CharField(source='message.name', read_only=True)
     
@@ -56,21 +58,21 @@ class MailingOutSerializer(serializers.ModelSerializer):
 
 # Marketing serializers
 
-class MessageTemplateSerializer(serializers.ModelSerializer):
+class MessageTemplateSerializer(CachedFieldsModelSerializer):
     class Meta:
         model = MessageTemplate
         fields = ['id', 'name', 'channel', 'locale', 'subject', 'body', 'version', 'updated_at']
         read_only_fields = ['version', 'updated_at']
 
 
-class SegmentSerializer(serializers.ModelSerializer):
+class SegmentSerializer(CachedFieldsModelSerializer):
     class Meta:
         model = Segment
         fields = ['id', 'name', 'description', 'rules', 'size_cache', 'updated_at']
         read_only_fields = ['size_cache', 'updated_at']
 
 
-class CampaignSerializer(serializers.ModelSerializer):
+class CampaignSerializer(CachedFieldsModelSerializer):
     segment_name = serializers.CharField(source='segment.name', read_only=True)
     template_name = serializers.CharField(source='template.name', read_only=True)
     
@@ -83,7 +85,7 @@ class CampaignSerializer(serializers.ModelSerializer):
 
 # VoIP serializers
 
-class ConnectionSerializer(serializers.ModelSerializer):
+class ConnectionSerializer(CachedFieldsModelSerializer):
     owner_name = serializers.CharField(source='owner.username', read_only=True)
     
     class Meta:
@@ -91,7 +93,7 @@ class ConnectionSerializer(serializers.ModelSerializer):
         fields = ['id', 'provider', 'type', 'number', 'owner', 'owner_name', 'callerid', 'active']
 
 
-class IncomingCallSerializer(serializers.ModelSerializer):
+class IncomingCallSerializer(CachedFieldsModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     
     class Meta:
@@ -103,13 +105,13 @@ class IncomingCallSerializer(serializers.ModelSerializer):
 
 # Help serializers
 
-class ParagraphSerializer(serializers.ModelSerializer):
+class ParagraphSerializer(CachedFieldsModelSerializer):
     class Meta:
         model = Paragraph
         fields = ['id', 'title', 'content', 'index_number', 'language_code']
 
 
-class PageSerializer(serializers.ModelSerializer):
+class PageSerializer(CachedFieldsModelSerializer):
     paragraphs = ParagraphSerializer(many=True, read_only=True, source='paragraph_set')
     
     class Meta:
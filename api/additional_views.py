@@ -5,13 +5,14 @@ from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 
 from massmail.models import EmlMessage, EmailAccount, Signature, MailingOut
 from marketing.models import Campaign, MessageTemplate, Segment
 from voip.models import Connection, IncomingCall
 from help.models import Page, Paragraph
 
+from .view_base import AutoRelatedMixin, FilterParamsMixin
 from .additional_serializers import (
     EmlMessageSerializer, EmailAccountSerializer, SignatureSerializer, MailingOutSerializer,
     CampaignSerializer, MessageTemplateSerializer, SegmentSerializer,
@@ -23,7 +24,7 @@ from .additional_serializers import (
 # Massmail ViewSets
 
 @extend_schema(tags=['Massmail'])
-class EmailAccountViewSet(viewsets.ModelViewSet):
+class EmailAccountViewSet(FilterParamsMixin, viewsets.ModelViewSet):
     serializer_class = EmailAccountSerializer
     queryset = EmailAccount.objects.select_related('owner').all()
     permission_classes = [IsAuthenticated]
@@ -52,31 +53,31 @@ class SignatureViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=['Massmail'])
-class EmlMessageViewSet(viewsets.ModelViewSet):
+class EmlMessageViewSet(FilterParamsMixin, AutoRelatedMixin, viewsets.ModelViewSet):
     serializer_class = EmlMessageSerializer
-    queryset = EmlMessage.objects.select_related('owner').all().order_by('-creation_date')
+    queryset = EmlMessage.objects.all().order_by('-creation_date')
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ['name', 'subject', 'content']
     filterset_fields = ['owner']
     
     def get_queryset(self):
-        qs = self.queryset
+        qs = super().get_queryset()
         if not self.request.user.is_superuser:
             qs = qs.filter(owner=self.request.user)
         return qs
 
 
 @extend_schema(tags=['Massmail'])
-class MailingOutViewSet(viewsets.ReadOnlyModelViewSet):
+class MailingOutViewSet(FilterParamsMixin, AutoRelatedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = MailingOutSerializer
-    queryset = MailingOut.objects.select_related('owner', 'message').all().order_by('-sending_date')
+    queryset = MailingOut.objects.all().order_by('-sending_date')
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['owner', 'status']
     
     def get_queryset(self):
-        qs = self.queryset
+        qs = super().get_queryset()
         if not self.request.user.is_superuser:
             qs = qs.filter(owner=self.request.user)
         return qs
@@ -85,7 +86,7 @@ class MailingOutViewSet(viewsets.ReadOnlyModelViewSet):
 # Marketing ViewSets
 
 @extend_schema(tags=['Marketing'])
-class MessageTemplateViewSet(viewsets.ModelViewSet):
+class MessageTemplateViewSet(FilterParamsMixin, viewsets.ModelViewSet):
     serializer_class = MessageTemplateSerializer
     queryset = MessageTemplate.objects.all()
     permission_classes = [IsAuthenticated]
@@ -104,7 +105,7 @@ class SegmentViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=['Marketing'])
-class CampaignViewSet(viewsets.ModelViewSet):
+class CampaignViewSet(FilterParamsMixin, viewsets.ModelViewSet):
     serializer_class = CampaignSerializer
     queryset = Campaign.objects.select_related('segment', 'template').all().order_by('-created_at')
     permission_classes = [IsAuthenticated]
@@ -116,7 +117,7 @@ class CampaignViewSet(viewsets.ModelViewSet):
 # VoIP ViewSets
 
 @extend_schema(tags=['VoIP'])
-class ConnectionViewSet(viewsets.ModelViewSet):
+class ConnectionViewSet(FilterParamsMixin, AutoRelatedMixin, viewsets.ModelViewSet):
     serializer_class = ConnectionSerializer
     queryset = Connection.objects.all()
     permission_classes = [IsAdminUser]
@@ -125,16 +126,16 @@ class ConnectionViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=['VoIP'])
-class IncomingCallViewSet(viewsets.ReadOnlyModelViewSet):
+class IncomingCallViewSet(FilterParamsMixin, AutoRelatedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = IncomingCallSerializer
-    queryset = IncomingCall.objects.select_related('user').all().order_by('-created_at')
+    queryset = IncomingCall.objects.all().order_by('-created_at')
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     search_fields = ['caller_id', 'client_name']
     filterset_fields = ['user', 'client_type', 'is_consumed']
     
     def get_queryset(self):
-        qs = self.queryset
+        qs = super().get_queryset()
         if not self.request.user.is_superuser:
             qs = qs.filter(user=self.request.user)
         return qs
@@ -143,9 +144,16 @@ class IncomingCallViewSet(viewsets.ReadOnlyModelViewSet):
 # Help ViewSets
 
 @extend_schema(tags=['Help'])
-class PageViewSet(viewsets.ReadOnlyModelViewSet):
+class PageViewSet(FilterParamsMixin, AutoRelatedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = PageSerializer
-    queryset = Page.objects.prefetch_related('paragraph_set').all()
+    # paragraphs come in index order (Paragraph.Meta.ordering) with only
+    # the columns ParagraphSerializer shows
+    queryset = Page.objects.prefetch_related(Prefetch(
+        'paragraph_set',
+        queryset=Paragraph.objects.only(
+            'id', 'title', 'content', 'index_number', 'language_code', 'document_id'
+        ),
+    )).all()
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ['title', 'slug']
@@ -153,7 +161,7 @@ class PageViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 @extend_schema(tags=['Help'])
-class ParagraphViewSet(viewsets.ReadOnlyModelViewSet):
+class ParagraphViewSet(FilterParamsMixin, AutoRelatedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ParagraphSerializer
     queryset = Paragraph.objects.all().order_by('index_number')
     permission_classes = [IsAuthenticated]
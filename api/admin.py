@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.core.cache import cache
 from django.db.models import Count, Q
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
@@ -7,6 +8,9 @@ from django.utils.safestring import mark_safe
 
 from .models import AuthenticationLog, UserSession
 
+AUTH_STATS_CACHE_KEY = 'authlog_stats'
+AUTH_STATS_TIMEOUT = 30
+
 
 @admin.register(AuthenticationLog)
 class AuthenticationLogAdmin(admin.ModelAdmin):
@@ -80,48 +84,48 @@ class AuthenticationLogAdmin(admin.ModelAdmin):
     def changelist_view(self, request, extra_context=None):
         """Add statistics to the changelist view"""
         extra_context = extra_context or {}
-        
-        # Get statistics
+        # The statistics cover the whole log whatever the changelist
+        # filters, so one cached copy serves every page view
+        extra_context.update(
+            cache.get_or_set(AUTH_STATS_CACHE_KEY, lambda: self.get_auth_stats(request), AUTH_STATS_TIMEOUT)
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def get_auth_stats(self, request):
+        """Auth type and success counts, top endpoints and top users."""
         queryset = self.get_queryset(request)
-        
-        total_count = queryset.count()
-        jwt_count = queryset.filter(auth_type='jwt').count()
-        legacy_count = queryset.filter(auth_type='legacy').count()
-        session_count = queryset.filter(auth_type='session').count()
-        
-        success_count = queryset.filter(success=True).count()
-        failure_count = queryset.filter(success=False).count()
-        
+
+        # One pass over the log for all the counts
+        counts = queryset.aggregate(
+            total_count=Count('id'),
+            jwt_count=Count('id', filter=Q(auth_type='jwt')),
+            legacy_count=Count('id', filter=Q(auth_type='legacy')),
+            session_count=Count('id', filter=Q(auth_type='session')),
+            success_count=Count('id', filter=Q(success=True)),
+            failure_count=Count('id', filter=Q(success=False)),
+        )
+        total_count = counts['total_count']
+
         # Calculate percentages
-        jwt_percentage = (jwt_count / total_count * 100) if total_count > 0 else 0
-        legacy_percentage = (legacy_count / total_count * 100) if total_count > 0 else 0
-        success_rate = (success_count / total_count * 100) if total_count > 0 else 0
-        
-        extra_context['auth_stats'] = {
-            'total_count': total_count,
-            'jwt_count': jwt_count,
-            'jwt_percentage': round(jwt_percentage, 1),
-            'legacy_count': legacy_count,
-            'legacy_percentage': round(legacy_percentage, 1),
-            'session_count': session_count,
-            'success_count': success_count,
-            'failure_count': failure_count,
-            'success_rate': round(success_rate, 1),
+        def percentage(count):
+            return round(count / total_count * 100, 1) if total_count > 0 else 0
+
+        return {
+            'auth_stats': {
+                **counts,
+                'jwt_percentage': percentage(counts['jwt_count']),
+                'legacy_percentage': percentage(counts['legacy_count']),
+                'success_rate': percentage(counts['success_count']),
+            },
+            # Top endpoints
+            'top_endpoints': list(queryset.values('endpoint', 'auth_type').annotate(
+                count=Count('id')
+            ).order_by('-count')[:10]),
+            # Top users
+            'top_users': list(queryset.values('username', 'auth_type').annotate(
+                count=Count('id')
+            ).order_by('-count')[:10]),
         }
-        
-        # Top endpoints
-        top_endpoints = queryset.values('endpoint', 'auth_type').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10]
-        extra_context['top_endpoints'] = top_endpoints
-        
-        # Top users
-        top_users = queryset.values('username', 'auth_type').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10]
-        extra_context['top_users'] = top_users
-        
-        return super().changelist_view(request, extra_context=extra_context)
 
 
 @admin.register(UserSession)
@@ -5,20 +5,32 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
+from django.core.cache import cache
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
 from datetime import timedelta
 
+from analytics.utils.dashboard_cache import make_dashboard_cache_key
+from analytics.utils.forecasting import SERIES_CLIENTS, SERIES_LEADS, SERIES_REVENUE
 from crm.models import Deal, Lead, Company, Contact
 
+OVERVIEW_TIMEOUT = 60
+
 
 @extend_schema(tags=['Analytics'])
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def analytics_overview(request):
-    """Get overview analytics for dashboard"""
-    user = request.user
-    
+    """
+    Get overview analytics for dashboard. Cached per user and period until
+    a deal, lead or request changes, or for OVERVIEW_TIMEOUT seconds.
+    """
+    days = int(request.query_params.get('days', 30))
+    key = make_dashboard_cache_key('overview', request.user.pk, days)
+    return Response(cache.get_or_set(key, lambda: _get_overview(request.user, days), OVERVIEW_TIMEOUT))
+
+
+def _get_overview(user, days: int) -> dict:
     # Filter by user permissions
     if user.is_superuser:
         deals = Deal.objects.all()
@@ -33,46 +45,84 @@ def analytics_overview(request):
         contacts = Contact.objects.filter(Q(owner=user) | Q(department__in=departments))
     
     # Date range
-    days = int(request.query_params.get('days', 30))
     date_from = timezone.now() - timedelta(days=days)
     
-    return Response({
+    # One conditional aggregate per model instead of a count per figure
+    new_since = Q(creation_date__gte=date_from)
+    deals_agg = deals.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(active=True)),
+        total_amount=Sum('amount'),
+    )
+    leads_agg = leads.aggregate(
+        total=Count('id'),
+        new=Count('id', filter=new_since),
+        qualified=Count('id', filter=Q(was_in_touch__isnull=False)),
+    )
+    companies_agg = companies.aggregate(total=Count('id'), new=Count('id', filter=new_since))
+    contacts_agg = contacts.aggregate(total=Count('id'), new=Count('id', filter=new_since))
+
+    return {
         'period_days': days,
-        'deals': {
-            'total': deals.count(),
-            'active': deals.filter(active=True).count(),
-            'total_amount': deals.aggregate(total=Sum('amount'))['total'] or 0,
-        },
-        'leads': {
-            'total': leads.count(),
-            'new': leads.filter(creation_date__gte=date_from).count(),
-            'qualified': leads.filter(was_in_touch__isnull=False).count(),
-        },
-        'companies': {
-            'total': companies.count(),
-            'new': companies.filter(creation_date__gte=date_from).count(),
-        },
-        'contacts': {
-            'total': contacts.count(),
-            'new': contacts.filter(creation_date__gte=date_from).count(),
-        },
-    })
+        'deals': {**deals_agg, 'total_amount': deals_agg['total_amount'] or 0},
+        'leads': leads_agg,
+        'companies': companies_agg,
+        'contacts': contacts_agg,
+    }
 
 
 # ============================================================================
 # PREDICTION & FORECASTING API ENDPOINTS
 # ============================================================================
 
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 
 from analytics.models import ForecastPoint, NextActionForecast, ClientNextActionForecast
 from analytics.tasks import (
     predict_revenue_task, predict_leads_task, predict_clients_task,
-    predict_next_actions_task, predict_client_actions_task, predict_all_task
+    predict_next_actions_task, predict_client_actions_task, predict_all_task,
+    start_predict_all
 )
 
 
+def _forecast_page(request, series_key, bands=False):
+    """
+    Stored points of a forecast series in date order, `days` of them per
+    page. Pages are keyed on the date rather than offset: passing the
+    `next_cursor` of a page as `after_date` returns the following page.
+    """
+    days = int(request.query_params.get('days', 30))
+    points = ForecastPoint.objects.filter(series_key=series_key)
+    after_date = request.query_params.get('after_date')
+    if after_date:
+        try:
+            after_date = parse_date(after_date)
+        except ValueError:
+            after_date = None
+        if after_date is None:
+            return Response({'error': 'after_date must be a YYYY-MM-DD date'}, status=400)
+        points = points.filter(date__gt=after_date)
+    fields = ('date', 'yhat', 'yhat_lower', 'yhat_upper') if bands else ('date', 'yhat')
+    rows = list(points.order_by('date').values_list(*fields)[:days])
+    data = []
+    for day, yhat, *band in rows:
+        point = {'date': day.isoformat(), 'predicted': round(yhat, 2)}
+        if bands:
+            lower, upper = band
+            point['lower'] = round(lower, 2) if lower is not None else None
+            point['upper'] = round(upper, 2) if upper is not None else None
+        data.append(point)
+    return Response({
+        'series': series_key,
+        'count': len(data),
+        'forecasts': data,
+        # a short page is the last one
+        'next_cursor': data[-1]['date'] if data and len(data) == days else None,
+    })
+
+
 @extend_schema(tags=['Analytics & Predictions'])
 class PredictionViewSet(viewsets.ViewSet):
     """API endpoints for predictions and forecasting"""
@@ -92,12 +142,7 @@ class PredictionViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='revenue/forecast')
     def get_revenue_forecast(self, request):
         """Get revenue forecast data"""
-        days = int(request.query_params.get('days', 30))
-        forecasts = ForecastPoint.objects.filter(series_key='daily_revenue').order_by('date')[:days]
-        data = [{'date': f.date.isoformat(), 'predicted': round(f.yhat, 2),
-                 'lower': round(f.yhat_lower, 2) if f.yhat_lower else None,
-                 'upper': round(f.yhat_upper, 2) if f.yhat_upper else None} for f in forecasts]
-        return Response({'series': 'daily_revenue', 'count': len(data), 'forecasts': data})
+        return _forecast_page(request, SERIES_REVENUE, bands=True)
     
     @action(detail=False, methods=['post'], url_path='leads/predict')
     def predict_leads(self, request):
@@ -112,10 +157,7 @@ class PredictionViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='leads/forecast')
     def get_leads_forecast(self, request):
         """Get leads forecast data"""
-        days = int(request.query_params.get('days', 30))
-        forecasts = ForecastPoint.objects.filter(series_key='new_leads').order_by('date')[:days]
-        data = [{'date': f.date.isoformat(), 'predicted': round(f.yhat, 2)} for f in forecasts]
-        return Response({'series': 'new_leads', 'count': len(data), 'forecasts': data})
+        return _forecast_page(request, SERIES_LEADS)
     
     @action(detail=False, methods=['post'], url_path='clients/predict')
     def predict_clients(self, request):
@@ -130,10 +172,7 @@ class PredictionViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='clients/forecast')
     def get_clients_forecast(self, request):
         """Get clients forecast data"""
-        days = int(request.query_params.get('days', 30))
-        forecasts = ForecastPoint.objects.filter(series_key='new_clients').order_by('date')[:days]
-        data = [{'date': f.date.isoformat(), 'predicted': round(f.yhat, 2)} for f in forecasts]
-        return Response({'series': 'new_clients', 'count': len(data), 'forecasts': data})
+        return _forecast_page(request, SERIES_CLIENTS)
     
     @action(detail=False, methods=['post'], url_path='next-actions/predict')
     def predict_next_actions(self, request):
@@ -153,8 +192,11 @@ class PredictionViewSet(viewsets.ViewSet):
         queryset = NextActionForecast.objects.all()
         if deal_id:
             queryset = queryset.filter(deal_id=deal_id)
-        queryset = queryset.order_by('-probability')[:limit]
-        data = [{'deal_id': f.deal_id, 'action': f.suggested_action, 'probability': f.probability} for f in queryset]
+        queryset = queryset.order_by('-probability').values_list('deal_id', 'suggested_action', 'probability')[:limit]
+        data = [
+            {'deal_id': deal_id, 'action': action, 'probability': probability}
+            for deal_id, action, probability in queryset
+        ]
         return Response({'count': len(data), 'predictions': data})
     
     @action(detail=False, methods=['post'], url_path='next-actions/clients/predict')
@@ -175,8 +217,11 @@ class PredictionViewSet(viewsets.ViewSet):
         queryset = ClientNextActionForecast.objects.all()
         if company_id:
             queryset = queryset.filter(company_id=company_id)
-        queryset = queryset.order_by('-probability')[:limit]
-        data = [{'company_id': f.company_id, 'action': f.suggested_action, 'probability': f.probability} for f in queryset]
+        queryset = queryset.order_by('-probability').values_list('company_id', 'suggested_action', 'probability')[:limit]
+        data = [
+            {'company_id': company_id, 'action': action, 'probability': probability}
+            for company_id, action, probability in queryset
+        ]
         return Response({'count': len(data), 'predictions': data})
     
     @action(detail=False, methods=['post'], url_path='predict-all')
@@ -185,7 +230,8 @@ class PredictionViewSet(viewsets.ViewSet):
         horizon_days = int(request.data.get('horizon_days', 30))
         run_async = request.data.get('async', True)
         if run_async:
-            task = predict_all_task.delay(horizon_days)
+            # task_id is the chord callback: its result is the summary of all predictions
+            task = start_predict_all(horizon_days)
             return Response({'status': 'started', 'task_id': task.id, 'horizon_days': horizon_days})
         return Response(predict_all_task(horizon_days))
     
@@ -194,9 +240,9 @@ class PredictionViewSet(viewsets.ViewSet):
         """Get overall prediction status"""
         return Response({
             'forecasts': {
-                'revenue': {'count': ForecastPoint.objects.filter(series_key='daily_revenue').count()},
-                'leads': {'count': ForecastPoint.objects.filter(series_key='new_leads').count()},
-                'clients': {'count': ForecastPoint.objects.filter(series_key='new_clients').count()}
+                'revenue': {'count': ForecastPoint.objects.filter(series_key=SERIES_REVENUE).count()},
+                'leads': {'count': ForecastPoint.objects.filter(series_key=SERIES_LEADS).count()},
+                'clients': {'count': ForecastPoint.objects.filter(series_key=SERIES_CLIENTS).count()}
             },
             'action_predictions': {
                 'deals': {'count': NextActionForecast.objects.count()},
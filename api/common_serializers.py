@@ -4,12 +4,13 @@ Serializers for Common/Settings models API endpoints
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
+from api.serializer_base import CachedFieldsModelSerializer
 from common.models import Department, Reminder, UserProfile
 
 User = get_user_model()
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(CachedFieldsModelSerializer):
     """Serializer for Department (groups) model"""
     member_count = serializers.SerializerMethodField()
     
@@ -18,10 +19,13 @@ class DepartmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'member_count']
     
     def get_member_count(self, obj):
-        return obj.user_set.count()
+        member_count = getattr(obj, 'member_count', None)
+        if member_count is None:
+            member_count = obj.user_set.count()
+        return member_count
 
 
-class ReminderSerializer(serializers.ModelSerializer):
+class ReminderSerializer(CachedFieldsModelSerializer):
     """Serializer for Reminder model"""
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
     
@@ -35,7 +39,7 @@ class ReminderSerializer(serializers.ModelSerializer):
         read_only_fields = ['creation_date']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(CachedFieldsModelSerializer):
     """Serializer for UserProfile model"""
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.CharField(source='user.email', read_only=True)
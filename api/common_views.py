@@ -7,7 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
-from django.db.models import Q
+from django.db.models import Count, Q
 
 from common.models import Department, Reminder, UserProfile
 
@@ -20,7 +20,8 @@ from .common_serializers import (
 class DepartmentViewSet(viewsets.ReadOnlyModelViewSet):
     """Read-only API for departments/groups"""
     serializer_class = DepartmentSerializer
-    queryset = Department.objects.all().order_by('name')
+    # member counts for the serializer in the same query
+    queryset = Department.objects.annotate(member_count=Count('user')).order_by('name')
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
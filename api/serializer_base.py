@@ -0,0 +1,22 @@
+"""
+Base serializer classes for Django CRM API
+"""
+import copy
+
+from rest_framework import serializers
+
+
+class CachedFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that builds its fields from the model once per class.
+    Every instance gets its own deep copies of them, just as DRF copies
+    the declared fields, but without introspecting the model again.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = type(self)
+        fields = self._fields_cache.get(cls)
+        if fields is None:
+            fields = self._fields_cache[cls] = super().get_fields()
+        return copy.deepcopy(fields)
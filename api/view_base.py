@@ -0,0 +1,134 @@
+"""
+Base viewset classes for Django CRM API
+"""
+from django_filters.rest_framework import DjangoFilterBackend
+
+
+def _get_field(model, name):
+    for field in model._meta.get_fields():
+        if name == field.name:
+            return field
+        if field.is_relation and field.auto_created and name == field.get_accessor_name():
+            return field
+
+
+def _read_fields(serializer):
+    return [field for field in serializer.fields.values() if not field.write_only]
+
+
+def get_related_lookups(model, serializer):
+    """
+    Return (select_related, prefetch_related) lookups for the relations
+    the serializer's read fields reach through their sources,
+    e.g. source='owner.username' selects 'owner'.
+    """
+    select, prefetch = set(), set()
+    for field in _read_fields(serializer):
+        if field.source == '*':
+            continue
+        path, current = [], model
+        for part in field.source.split('.'):
+            relation = _get_field(current, part)
+            if relation is None or not relation.is_relation:
+                break
+            path.append(part)
+            if relation.many_to_many or relation.one_to_many:
+                prefetch.add('__'.join(path))
+                path = []
+                break
+            current = relation.related_model
+        if path:
+            select.add('__'.join(path))
+    return sorted(select), sorted(prefetch)
+
+
+def get_only_fields(model, serializer):
+    """
+    Return the columns the serializer's read fields use, for .only(),
+    or None if one of them reads an attribute of the model itself that
+    isn't a column. A related model whose attribute isn't a column
+    (e.g. owner.get_full_name) is loaded whole.
+    """
+    only = {model._meta.pk.name}
+    for field in _read_fields(serializer):
+        if field.source == '*':
+            return None
+        path, current = [], model
+        for part in field.source.split('.'):
+            model_field = _get_field(current, part)
+            if model_field is None:
+                if not path:
+                    return None
+                break
+            if model_field.many_to_many or model_field.one_to_many:
+                path = []
+                break
+            path.append(part)
+            if not model_field.is_relation:
+                break
+            current = model_field.related_model
+        if path:
+            only.add('__'.join(path))
+    return sorted(only)
+
+
+class AutoRelatedMixin:
+    """
+    Add select_related/prefetch_related for the relations the serializer
+    shows, so the queryset doesn't need a hand-kept list of them.
+    Lookups already applied to the queryset are kept. Lists also load
+    only the columns the serializer shows.
+    """
+    _related_lookups_cache = {}
+
+    def get_related_lookups(self):
+        serializer_class = self.get_serializer_class()
+        model = self.queryset.model
+        key = (model, serializer_class)
+        lookups = self._related_lookups_cache.get(key)
+        if lookups is None:
+            serializer = serializer_class()
+            lookups = self._related_lookups_cache[key] = (
+                *get_related_lookups(model, serializer),
+                get_only_fields(model, serializer),
+            )
+        return lookups
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        select, prefetch, only = self.get_related_lookups()
+        if select:
+            qs = qs.select_related(*select)
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
+        if only and self.action == 'list':
+            qs = qs.only(*only)
+        return qs
+
+
+class FilterParamsMixin:
+    """
+    Run DjangoFilterBackend only when the request has one of the
+    viewset's filter params; unfiltered lists skip building the
+    FilterSet. Other filter backends run as usual.
+    """
+
+    def get_filter_names(self):
+        filterset_class = getattr(self, 'filterset_class', None)
+        if filterset_class is not None:
+            return list(filterset_class.base_filters)
+        return list(getattr(self, 'filterset_fields', None) or ())
+
+    def has_filter_params(self):
+        names = self.get_filter_names()
+        return any(
+            key == name or key.startswith(name + '__')
+            for key in self.request.query_params for name in names
+        )
+
+    def filter_queryset(self, queryset):
+        for backend in list(self.filter_backends):
+            if issubclass(backend, DjangoFilterBackend) and not self.has_filter_params():
+                continue
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
@@ -1153,8 +1153,13 @@ def dashboard_analytics(request):
 
     # Task metrics
     today = timezone.now().date()
-    active_tasks = tasks_qs.filter(active=True).count()
-    overdue_tasks = tasks_qs.filter(active=True, due_date__lt=today).count()
+    # Scope joins can repeat a task, hence distinct
+    tasks = tasks_qs.aggregate(
+        active_count=Count('id', filter=Q(active=True), distinct=True),
+        overdue_count=Count('id', filter=Q(active=True, due_date__lt=today), distinct=True),
+    )
+    active_tasks = tasks['active_count']
+    overdue_tasks = tasks['overdue_count']
 
     # Compose simple series for revenue/deals/leads if needed (placeholder)
     # The frontend tolerates absence; we return minimal structure.
@@ -1211,7 +1216,8 @@ def dashboard_activity(request):
         companies_qs = Company.objects.filter(Q(owner=user) | Q(department__in=departments))
     
     # Get user's recent deals (last 3) - only created/updated by current user
-    recent_deals = deals_qs.filter(owner=user).select_related('owner').order_by('-update_date')[:3]
+    recent_deals = (deals_qs.filter(owner=user).only('name', 'update_date', 'creation_date')
+                    .order_by('-update_date')[:3])
     for deal in recent_deals:
         activities.append({
             'type': 'deal_updated',
@@ -1222,7 +1228,8 @@ def dashboard_activity(request):
         })
     
     # Get user's recent tasks (last 3) - only owned by current user
-    recent_tasks = tasks_qs.filter(owner=user).select_related('owner', 'stage').order_by('-update_date')[:3]
+    recent_tasks = (tasks_qs.filter(owner=user).only('name', 'active', 'update_date', 'creation_date')
+                    .order_by('-update_date')[:3])
     for task in recent_tasks:
         is_completed = not task.active
         activities.append({
@@ -1234,7 +1241,8 @@ def dashboard_activity(request):
         })
     
     # Get user's recent contacts (last 2) - only created by current user
-    recent_contacts = contacts_qs.filter(owner=user).select_related('owner').order_by('-creation_date')[:2]
+    recent_contacts = (contacts_qs.filter(owner=user).only('first_name', 'last_name', 'creation_date')
+                       .order_by('-creation_date')[:2])
     for contact in recent_contacts:
         full_name = f"{contact.first_name} {contact.last_name}".strip() or "Unnamed Contact"
         activities.append({
@@ -1246,7 +1254,8 @@ def dashboard_activity(request):
         })
     
     # Get user's recent companies (last 2) - only created by current user
-    recent_companies = companies_qs.filter(owner=user).select_related('owner').order_by('-creation_date')[:2]
+    recent_companies = (companies_qs.filter(owner=user).only('full_name', 'creation_date')
+                        .order_by('-creation_date')[:2])
     for company in recent_companies:
         activities.append({
             'type': 'company_created',
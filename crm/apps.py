@@ -14,6 +14,7 @@ class CrmConfig(AppConfig):
     default_auto_field = 'django.db.models.AutoField'
     
     def ready(self):
+        from crm import signals  # NOQA
         from crm.utils.create_email_request import CreateEmailInquiry
         from crm.utils.import_emails import ImportEmails
         from crm.utils.manage_imaps import CrmImapManager
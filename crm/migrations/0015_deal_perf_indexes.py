@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0014_alter_company_phone_e164_alter_contact_mobile_e164_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['creation_date', 'stage'], name='deal_cd_stage_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['creation_date', 'contact'], name='lead_cd_contact_idx'),
+        ),
+    ]
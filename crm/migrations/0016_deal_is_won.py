@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:29
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def set_is_won(apps, schema_editor):
+    Deal = apps.get_model('crm', 'Deal')
+    Deal.objects.filter(
+        Q(stage__success_stage=True) | Q(stage__conditional_success_stage=True)
+    ).update(is_won=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0015_deal_perf_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deal',
+            name='is_won',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Won'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(condition=models.Q(('is_won', True)), fields=['creation_date'], name='deal_won_cd_idx'),
+        ),
+        migrations.RunPython(set_is_won, migrations.RunPython.noop),
+    ]
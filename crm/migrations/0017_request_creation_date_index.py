@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0016_deal_is_won'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['creation_date'], name='request_cd_idx'),
+        ),
+    ]
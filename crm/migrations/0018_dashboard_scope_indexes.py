@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0017_request_creation_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['owner', 'creation_date'], name='deal_owner_cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['department', 'creation_date'], name='deal_dept_cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['owner', 'creation_date'], name='lead_owner_cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['department', 'creation_date'], name='lead_dept_cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['owner', 'creation_date'], name='request_owner_cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['department', 'creation_date'], name='request_dept_cd_idx'),
+        ),
+    ]
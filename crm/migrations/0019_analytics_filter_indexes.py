@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:04
+
+from django.db import migrations, models
+
+from common.utils.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('crm', '0018_dashboard_scope_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='deal',
+            index=models.Index(fields=['owner', 'active'], name='deal_owner_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(condition=models.Q(('was_in_touch__isnull', False)), fields=['was_in_touch'], name='lead_in_touch_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
+from django.db.models import Q
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.utils.safestring import mark_safe
@@ -8,10 +9,30 @@ from django.utils.safestring import mark_safe
 from common.models import Base1
 
 
+class DealQuerySet(models.QuerySet):
+
+    def won(self):
+        """Deals at a success or conditional success stage."""
+        return self.filter(is_won=True)
+
+
 class Deal(Base1):
     class Meta:
         verbose_name = _("Deal")
         verbose_name_plural = _("Deals")
+        indexes = [
+            models.Index(fields=['creation_date', 'stage'], name='deal_cd_stage_idx'),
+            # dashboard periods scoped to an owner or a department
+            models.Index(fields=['owner', 'creation_date'], name='deal_owner_cd_idx'),
+            models.Index(fields=['department', 'creation_date'], name='deal_dept_cd_idx'),
+            # active deals of an owner (API filters, analytics overview)
+            models.Index(fields=['owner', 'active'], name='deal_owner_active_idx'),
+            models.Index(
+                fields=['creation_date'],
+                condition=Q(is_won=True),
+                name='deal_won_cd_idx'
+            ),
+        ]
 
     name = models.CharField(
         max_length=250, null=False, blank=False,
@@ -51,6 +72,14 @@ class Deal(Base1):
         verbose_name=_("Dates of the stages"),
         help_text=_("Dates of passing the stages")
     )
+    # Denormalized from the stage flags so that analytics
+    # can count won deals without joining the stage table.
+    is_won = models.BooleanField(
+        default=False,
+        db_index=True,
+        editable=False,
+        verbose_name=_("Won"),
+    )
     closing_date = models.DateField(
         blank=True,
         null=True,
@@ -185,6 +214,15 @@ class Deal(Base1):
     )
     files = GenericRelation('common.TheFile')
 
+    objects = DealQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.is_won = bool(self.stage and self.stage.is_won)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'stage' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'is_won'}
+        super().save(*args, **kwargs)
+
     def change_stage_data(self, date):
         data = f'{date} - {self.stage}\n'
         self.stages_dates = self.stages_dates + data
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 
@@ -11,6 +12,18 @@ class Lead(BaseCounterparty, BaseContact, Base1):
     class Meta:
         verbose_name = _("Lead")
         verbose_name_plural = _("Leads")
+        indexes = [
+            models.Index(fields=['creation_date', 'contact'], name='lead_cd_contact_idx'),
+            # dashboard periods scoped to an owner or a department
+            models.Index(fields=['owner', 'creation_date'], name='lead_owner_cd_idx'),
+            models.Index(fields=['department', 'creation_date'], name='lead_dept_cd_idx'),
+            # leads that were contacted; the rest never need this index
+            models.Index(
+                fields=['was_in_touch'],
+                condition=Q(was_in_touch__isnull=False),
+                name='lead_in_touch_idx'
+            ),
+        ]
 
     disqualified = models.BooleanField(
         default=False,
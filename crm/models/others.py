@@ -59,6 +59,15 @@ class Stage(StageBase):
         help_text=_("Have the goods been shipped at this stage already?")
     )
 
+    @property
+    def is_won(self):
+        return self.success_stage or self.conditional_success_stage
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # keep the denormalized Deal.is_won in step with the stage flags
+        self.deal_set.exclude(is_won=self.is_won).update(is_won=self.is_won)
+
 
 class LeadSource(Base):
     class Meta:
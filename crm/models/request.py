@@ -18,6 +18,12 @@ class Request(Base1):
     class Meta:
         verbose_name = _("Request")
         verbose_name_plural = _("Requests")
+        indexes = [
+            models.Index(fields=['creation_date'], name='request_cd_idx'),
+            # dashboard periods scoped to an owner or a department
+            models.Index(fields=['owner', 'creation_date'], name='request_owner_cd_idx'),
+            models.Index(fields=['department', 'creation_date'], name='request_dept_cd_idx'),
+        ]
 
     request_for = models.CharField(
         max_length=250, null=False, blank=False,
@@ -0,0 +1,11 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from crm.models import Stage
+
+
+@receiver(pre_delete, sender=Stage)
+def stage_deletion_handler(sender, instance, **kwargs):
+    # deals lose their stage (SET_NULL) and with it the won status;
+    # a receiver also covers queryset deletes, which skip Stage.delete()
+    instance.deal_set.filter(is_won=True).update(is_won=False)
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:00
+
+from django.db import migrations, models
+
+from common.utils.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('massmail', '0002_alter_emlmessage_content_alter_signature_content'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='emlmessage',
+            index=models.Index(fields=['owner', '-creation_date'], name='emlmessage_owner_cd_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='mailingout',
+            index=models.Index(fields=['owner', '-sending_date'], name='mailingout_owner_sd_idx'),
+        ),
+    ]
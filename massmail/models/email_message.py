@@ -14,6 +14,10 @@ class EmlMessage(BaseEml):
     class Meta:
         verbose_name = _("Email Message")
         verbose_name_plural = _("Email Messages")
+        indexes = [
+            # the API lists a user's messages newest first
+            models.Index(fields=['owner', '-creation_date'], name='emlmessage_owner_cd_idx'),
+        ]
 
     content = models.TextField(
         help_text=content_help_text
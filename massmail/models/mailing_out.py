@@ -11,6 +11,10 @@ class MailingOut(Base1):
     class Meta:
         verbose_name = _('Mailing Out')
         verbose_name_plural = _('Mailing Outs')
+        indexes = [
+            # the API lists a user's mailings by sending date, latest first
+            models.Index(fields=['owner', '-sending_date'], name='mailingout_owner_sd_idx'),
+        ]
 
     ACTIVE = 'A'
     ACTIVE_BUT_ERROR = 'E'
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from common.utils.helpers import USER_MODEL
+from common.utils.helpers import get_department_id
+from common.utils.helpers import get_now
+from crm.models import Deal
+from crm.models import Stage
+from crm.utils.ticketproc import new_ticket
+from tests.base_test_classes import BaseTestCase
+
+
+class AnalyticsTestCase(BaseTestCase):
+    """Deals of one manager's department for the analytics tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.owner = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        cls.department_id = get_department_id(cls.owner)
+        stages = Stage.objects.filter(department_id=cls.department_id)
+        cls.default_stage = stages.get(default=True)
+        cls.success_stage = stages.filter(success_stage=True).first()
+
+    @classmethod
+    def create_deal(cls, stage, amount, days_ago=0, **kwargs):
+        deal = Deal.objects.create(
+            name='Test deal',
+            ticket=new_ticket(),
+            next_step='call',
+            next_step_date=get_now().date() + timedelta(days=1),
+            stage=stage,
+            amount=amount,
+            owner=cls.owner,
+            department_id=cls.department_id,
+            **kwargs
+        )
+        if days_ago:
+            # a queryset update, so no signal sees the backdated deal
+            deal.creation_date = timezone.now() - timedelta(days=days_ago)
+            Deal.objects.filter(id=deal.id).update(creation_date=deal.creation_date)
+        return deal
@@ -0,0 +1,212 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.test import tag
+from django.utils import timezone
+
+from analytics.dash_plugins.crm_analytics_plugins import ForecastsPlugin
+from analytics.dash_plugins.crm_analytics_plugins import KPIMetricsPlugin
+from analytics.dash_plugins.crm_analytics_plugins import LeadSourcesPlugin
+from analytics.dash_plugins.crm_analytics_plugins import RecentActivityPlugin
+from analytics.dash_plugins.crm_analytics_plugins import RevenueChartPlugin
+from analytics.dash_plugins.crm_analytics_plugins import SalesFunnelPlugin
+from analytics.dash_plugins.crm_analytics_plugins import SalesOverviewPlugin
+from analytics.dash_plugins.crm_analytics_plugins import TopPerformersPlugin
+from analytics.dash_plugins.crm_analytics_plugins import datetime_range
+from analytics.models import ForecastPoint
+from analytics.models import DailyActivityRollup
+from analytics.utils.forecasting import SERIES_LEADS
+from common.utils.helpers import get_now
+from crm.models import Company
+from crm.models import Contact
+from crm.models import Deal
+from crm.models import Lead
+from crm.models import LeadSource
+from crm.models import Request
+from crm.models import Stage
+from crm.models.others import ClosingReason
+from tests.analytics.base import AnalyticsTestCase
+
+# python manage.py test tests.analytics.test_dash_plugins --keepdb
+
+PLUGINS_MODULE = 'analytics.dash_plugins.crm_analytics_plugins'
+
+
+@tag('TestCase')
+class TestDashPlugins(AnalyticsTestCase):
+    """Test CRM analytics dashboard plugins"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.lost_reason = ClosingReason.objects.filter(
+            department_id=cls.department_id,
+            success_reason=False
+        ).first()
+        cls.request = RequestFactory().get('/')
+        cls.request.user = cls.owner
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+        cache.clear()
+
+    def process(self, plugin_class):
+        with patch(f'{PLUGINS_MODULE}.render_to_string') as render:
+            plugin_class.__new__(plugin_class)._process(self.request)
+        return render.call_args[0][1]
+
+    def test_sales_overview(self):
+        self.create_deal(self.default_stage, 100)
+        self.create_deal(self.success_stage, 200)
+        self.create_deal(self.success_stage, 300)
+        self.create_deal(self.default_stage, 50, closing_reason=self.lost_reason)
+        Lead.objects.create(first_name='Lead 1', owner=self.owner)
+        Lead.objects.create(first_name='Lead 2', owner=self.owner)
+
+        context = self.process(SalesOverviewPlugin)
+        self.assertEqual(context['total_deals'], 4)
+        self.assertEqual(context['won_deals'], 2)
+        self.assertEqual(context['lost_deals'], 1)
+        self.assertEqual(context['total_revenue'], Decimal('500'))
+        self.assertEqual(context['win_rate'], 50.0)
+        self.assertEqual(context['leads_count'], 2)
+        self.assertEqual(context['converted_leads'], 0)
+
+    def test_kpi_metrics(self):
+        self.create_deal(self.default_stage, 100)
+        self.create_deal(self.success_stage, 200)
+        self.create_deal(self.success_stage, 300)
+
+        old_deal = self.create_deal(self.success_stage, 250)
+        old_lead = Lead.objects.create(first_name='Lead', owner=self.owner)
+        # the last day of the previous month belongs to it
+        last_month = timezone.localtime().replace(day=1, hour=0, minute=0, second=0) - timedelta(hours=1)
+        Deal.objects.filter(id=old_deal.id).update(creation_date=last_month)
+        Lead.objects.filter(id=old_lead.id).update(creation_date=last_month)
+
+        with self.assertNumQueries(2):
+            context = self.process(KPIMetricsPlugin)
+        self.assertEqual(context['current_deals'], 2)
+        self.assertEqual(context['current_revenue'], Decimal('500'))
+        self.assertEqual((context['deals_change'], context['revenue_change']), (100, 100))
+        self.assertEqual((context['current_leads'], context['leads_change']), (0, -100))
+
+    def test_recent_activity_renders_without_per_row_queries(self):
+        company = Company.objects.create(full_name='Company', owner=self.owner)
+        contact = Contact.objects.create(first_name='Contact', last_name='Person', company=company, owner=self.owner)
+        source = LeadSource.objects.create(name='Source', department_id=self.department_id)
+        self.create_deal(self.default_stage, 100, contact=contact)
+        Lead.objects.create(first_name='Lead', owner=self.owner, lead_source=source)
+        Request.objects.create(request_for='Request', owner=self.owner, contact=contact)
+
+        with self.assertNumQueries(3):
+            html = RecentActivityPlugin.__new__(RecentActivityPlugin)._process(self.request)
+        self.assertEqual(html.count('Contact Person'), 2)
+        self.assertIn(self.default_stage.name, html)
+        self.assertIn('Source', html)
+
+    def test_sales_overview_excludes_deals_before_range(self):
+        deal = self.create_deal(self.success_stage, 200)
+        start_dt, _ = datetime_range(timezone.localdate() - timedelta(days=30), timezone.localdate())
+        Deal.objects.filter(id=deal.id).update(creation_date=start_dt - timedelta(seconds=1))
+        self.create_deal(self.success_stage, 300)
+
+        context = self.process(SalesOverviewPlugin)
+        self.assertEqual(context['total_deals'], 1)
+        self.assertEqual(context['total_revenue'], Decimal('300'))
+
+    def test_lead_sources_totals_cover_all_sources(self):
+        Lead.objects.all().delete()
+        for i in range(11):
+            source = LeadSource.objects.create(name=f'Source {i}', department_id=self.department_id)
+            Lead.objects.create(first_name=f'Lead {i}', owner=self.owner, lead_source=source)
+
+        context = self.process(LeadSourcesPlugin)
+        self.assertEqual(len(context['sources_data']), 10)
+        self.assertEqual(context['total_leads'], 11)
+
+    def test_sales_funnel(self):
+        self.create_deal(self.default_stage, 100)
+        self.create_deal(self.default_stage, 300)
+        self.create_deal(self.success_stage, 600)
+
+        with self.assertNumQueries(1):
+            context = self.process(SalesFunnelPlugin)
+        self.assertEqual(context['total_deals'], 3)
+        self.assertEqual(context['total_value'], Decimal('1000'))
+        stages = {stage['name']: stage for stage in context['funnel_stages']}
+        self.assertEqual(stages[self.default_stage.name]['count_percentage'], 66.7)
+        self.assertEqual(stages[self.success_stage.name]['value_percentage'], 60.0)
+
+    def test_revenue_chart_reads_daily_activity(self):
+        self.create_deal(self.success_stage, 200)
+        with patch(f'{PLUGINS_MODULE}.RevenueChartPlugin._plot') as plot:
+            self.process(RevenueChartPlugin)
+        self.assertEqual(plot.call_args[0][1], [200.0])
+
+        # past days come from the daily rollups, today is counted live
+        DailyActivityRollup.objects.create(
+            day=timezone.localdate() - timedelta(days=1), won_deals=1, won_revenue=500
+        )
+        with patch(f'{PLUGINS_MODULE}.RevenueChartPlugin._plot') as plot:
+            self.process(RevenueChartPlugin)
+        self.assertEqual(sum(plot.call_args[0][1]), 700.0)
+
+    def test_top_performers(self):
+        self.create_deal(self.success_stage, 200)
+        self.create_deal(self.success_stage, 300)
+        self.create_deal(self.default_stage, 1000)
+
+        with self.assertNumQueries(1):
+            context = self.process(TopPerformersPlugin)
+        self.assertEqual(len(context['top_by_deals']), 1)
+        self.assertEqual(context['top_by_deals'][0]['deals_count'], 2)
+        self.assertEqual(context['top_by_revenue'][0]['total_revenue'], Decimal('500'))
+
+    def test_deal_is_won_follows_stage(self):
+        deal = self.create_deal(self.default_stage, 100)
+        self.assertFalse(deal.is_won)
+        deal.stage = self.success_stage
+        deal.save(update_fields=['stage'])
+        deal.refresh_from_db()
+        self.assertTrue(deal.is_won)
+
+        self.success_stage.success_stage = False
+        self.success_stage.save()
+        deal.refresh_from_db()
+        self.assertFalse(deal.is_won)
+
+    def test_deal_is_not_won_after_its_stage_is_deleted(self):
+        deal = self.create_deal(self.success_stage, 100)
+        self.assertTrue(deal.is_won)
+        Stage.objects.filter(id=self.success_stage.id).delete()
+        deal.refresh_from_db()
+        self.assertIsNone(deal.stage)
+        self.assertFalse(deal.is_won)
+
+    def test_cached_process_invalidated_on_deal_save(self):
+        plugin = SalesOverviewPlugin.__new__(SalesOverviewPlugin)
+        with self.assertNumQueries(2):
+            html = plugin.process(self.request)
+        with self.assertNumQueries(0):
+            self.assertEqual(plugin.process(self.request), html)
+
+        self.create_deal(self.success_stage, 200)
+        self.assertNotEqual(plugin.process(self.request), html)
+
+    def test_forecasts_use_stored_points(self):
+        today = get_now().date()
+        ForecastPoint.objects.bulk_create(
+            ForecastPoint(series_key=SERIES_LEADS, date=today + timedelta(days=i), yhat=i)
+            for i in range(5)
+        )
+        with patch('analytics.utils.forecasting.forecast_new_leads') as forecast_new_leads, \
+                patch('analytics.utils.forecasting.forecast_new_clients_with_reach', return_value=None), \
+                patch(f'{PLUGINS_MODULE}.suggest_next_actions', return_value=[]):
+            context = self.process(ForecastsPlugin)
+        forecast_new_leads.assert_not_called()
+        self.assertTrue(context['lead_img'].startswith('data:image/'))
+        self.assertIsNone(context['client_img'])
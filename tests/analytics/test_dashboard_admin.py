@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import tag
+from django.urls import reverse
+from django.utils import timezone
+
+from analytics.models import ForecastPoint
+from common.utils.helpers import USER_MODEL
+from crm.models import Lead
+from tests.base_test_classes import BaseTestCase
+
+# python manage.py test tests.analytics.test_dashboard_admin --keepdb
+
+VIEWS_MODULE = 'analytics.views'
+
+
+@tag('TestCase')
+class TestDashboardAdmin(BaseTestCase):
+    """Test conditional responses of the analytics dashboard admins"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = USER_MODEL.objects.filter(is_superuser=True).first()
+        cls.url = reverse('site:analytics_forecastsstat_changelist')
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get(self, etag=None):
+        headers = {'if_none_match': etag} if etag else {}
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value={}) as get_data:
+            response = self.client.get(self.url, headers=headers)
+        return response, get_data
+
+    def test_unchanged_page_is_not_rendered_again(self):
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('no-store', response['Cache-Control'])
+
+        response, get_data = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+        get_data.assert_not_called()
+
+    def test_page_is_rendered_after_data_changes(self):
+        etag = self.get()[0]['ETag']
+        Lead.objects.create(first_name='Lead', owner=self.user)
+        self.assertEqual(self.get(etag)[0].status_code, 200)
+
+        etag = self.get()[0]['ETag']
+        ForecastPoint.objects.create(series_key='leads', date=timezone.localdate(), yhat=1)
+        self.assertEqual(self.get(etag)[0].status_code, 200)
+
+    def test_dashboard_admins_render(self):
+        for model_name in ('bistat', 'dailyrevenuestat', 'forecastsstat'):
+            with self.subTest(model_name=model_name), \
+                    patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value={}):
+                response = self.client.get(reverse(f'site:analytics_{model_name}_changelist'))
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header('ETag'))
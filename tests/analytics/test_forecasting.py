@@ -0,0 +1,205 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+
+import pandas as pd
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import tag
+from django.utils import timezone
+
+from analytics.models import ForecastPoint
+from analytics.utils.forecasting import SERIES_REVENUE
+from analytics.utils.forecasting import _ar1_forecast
+from analytics.utils.forecasting import _daily_frame
+from analytics.utils.forecasting import _flat_forecast
+from analytics.utils.forecasting import _prophet_forecast
+from analytics.utils.forecasting import _reach_series
+from analytics.utils.forecasting import get_forecast
+from marketing.models import Campaign
+from marketing.models import CampaignRun
+
+try:
+    from prophet import Prophet
+except ImportError:  # pragma: no cover
+    Prophet = None
+
+# python manage.py test tests.analytics.test_forecasting --keepdb
+
+
+@tag('TestCase')
+class TestReachSeries(TestCase):
+    """Test the daily marketing reach used as a regressor for new clients"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def test_reach_is_aggregated_per_day_in_one_query(self):
+        campaign = Campaign.objects.create(name='Campaign')
+        today = timezone.now()
+        yesterday = today - timedelta(days=1)
+        two_days_ago = today - timedelta(days=2)
+        runs = [
+            (today, 5, 3), (today, 5, -1),  # delivered is preferred, negatives count as 0
+            (yesterday, 4, 0), (yesterday, -2, 0),  # else sent
+            (two_days_ago, 0, 0), (two_days_ago, 0, 0),  # else one per run
+        ]
+        for started_at, sent, delivered in runs:
+            run = CampaignRun.objects.create(campaign=campaign, sent=sent, delivered=delivered)
+            CampaignRun.objects.filter(id=run.id).update(started_at=started_at)
+
+        with self.assertNumQueries(1):
+            labels, values = _reach_series()
+        self.assertEqual(
+            labels,
+            [timezone.localtime(d).strftime('%Y-%m-%d') for d in (two_days_ago, yesterday, today)]
+        )
+        self.assertEqual(values, [2.0, 4.0, 3.0])
+
+
+@tag('TestCase')
+class TestGetForecast(TestCase):
+    """Test serving the forecasts stored by the forecast tasks"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def test_stored_points_are_served_without_a_fit(self):
+        today = timezone.localdate()
+        ForecastPoint.objects.bulk_create(
+            ForecastPoint(series_key=SERIES_REVENUE, date=today + timedelta(days=i), yhat=i)
+            for i in range(-1, 3)
+        )
+        with patch('analytics.utils.forecasting.forecast_daily_revenue') as fit:
+            forecast = get_forecast(SERIES_REVENUE)
+        fit.assert_not_called()
+        self.assertEqual(forecast.labels[0], today.strftime('%Y-%m-%d'))
+        self.assertEqual(forecast.yhat, [0.0, 1.0, 2.0])
+
+    def test_series_is_fitted_while_nothing_is_stored(self):
+        with patch('analytics.utils.forecasting.forecast_daily_revenue', return_value=None) as fit:
+            self.assertIsNone(get_forecast(SERIES_REVENUE))
+        fit.assert_called_once_with()
+
+
+@tag('TestCase')
+class TestDailyFrame(SimpleTestCase):
+    """Test spreading per-day aggregates over a gap-free daily frame"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def test_missing_days_are_filled_with_zero(self):
+        start = timezone.make_aware(timezone.datetime(2026, 3, 28))
+        rows = [
+            (None, 7),
+            (start, 2),
+            (start + timedelta(days=2), None),
+            (start + timedelta(days=4), Decimal('5.5')),
+        ]
+        df = _daily_frame(rows)
+        self.assertEqual(
+            df['ds'].dt.strftime('%Y-%m-%d').tolist(),
+            ['2026-03-28', '2026-03-29', '2026-03-30', '2026-03-31', '2026-04-01']
+        )
+        self.assertIsNone(df['ds'].dt.tz)
+        self.assertEqual(df['y'].tolist(), [2.0, 0.0, 0.0, 0.0, 5.5])
+
+    def test_no_rows_give_an_empty_frame(self):
+        self.assertTrue(_daily_frame([(None, 1)]).empty)
+
+
+@tag('TestCase')
+class TestAr1Forecast(SimpleTestCase):
+    """Test the AR(1) model used for short daily revenue forecasts"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+        self.labels = [d.strftime('%Y-%m-%d') for d in pd.date_range('2026-01-01', periods=10)]
+
+    def test_constant_series_stays_flat(self):
+        forecast = _ar1_forecast(self.labels, [5.0] * 10, 3, 'revenue_daily')
+        self.assertEqual(forecast.labels, ['2026-01-11', '2026-01-12', '2026-01-13'])
+        self.assertEqual(forecast.yhat, [5.0, 5.0, 5.0])
+        self.assertEqual(forecast.yhat_lower, forecast.yhat_upper)
+
+    def test_deviation_decays_towards_mean_with_widening_bands(self):
+        values = [0.0, 10.0] * 5
+        forecast = _ar1_forecast(self.labels, values, 4, 'revenue_daily')
+        # the series alternates around its mean, so the forecast does too
+        self.assertLess(forecast.yhat[0], 5.0)
+        self.assertGreater(forecast.yhat[1], 5.0)
+        self.assertLess(abs(forecast.yhat[3] - 5.0), abs(forecast.yhat[0] - 5.0))
+        widths = [hi - lo for lo, hi in zip(forecast.yhat_lower, forecast.yhat_upper)]
+        self.assertEqual(widths, sorted(widths))
+
+
+@tag('TestCase')
+class TestFlatForecast(SimpleTestCase):
+    """Test skipping the model fit for sparse or constant series"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+        self.labels = [d.strftime('%Y-%m-%d') for d in pd.date_range('2026-01-01', periods=20)]
+
+    def test_sparse_series_gets_mean_forecast(self):
+        values = [0.0] * 16 + [5.0] * 4
+        forecast = _flat_forecast(self.labels, values, 2, 'leads_daily')
+        self.assertEqual(forecast.labels, ['2026-01-21', '2026-01-22'])
+        self.assertEqual(forecast.yhat, [1.0, 1.0])
+        self.assertAlmostEqual(forecast.yhat_upper[0] - forecast.yhat[0], 1.96 * 2.0)
+        self.assertEqual(forecast.meta, {'series_key': 'leads_daily'})
+
+    def test_constant_series_gets_flat_forecast(self):
+        forecast = _flat_forecast(self.labels, [3.0] * 20, 3, 'revenue_daily')
+        self.assertEqual(forecast.yhat, [3.0, 3.0, 3.0])
+        self.assertEqual(forecast.yhat_lower, forecast.yhat_upper)
+
+    def test_varying_series_is_left_to_the_model(self):
+        values = [float(i % 7) for i in range(20)]
+        self.assertIsNone(_flat_forecast(self.labels, values, 3, 'revenue_daily'))
+
+
+@tag('TestCase')
+@skipIf(Prophet is None, 'prophet is not installed')
+class TestProphetForecast(SimpleTestCase):
+    """Test the Prophet pipeline shared by the daily series forecasts"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+        self.labels = [d.strftime('%Y-%m-%d') for d in pd.date_range('2026-01-01', periods=28)]
+        self.values = [float(i % 7) for i in range(28)]
+        cache.clear()
+
+    def test_forecast_covers_horizon_after_history(self):
+        df = pd.DataFrame({'ds': pd.to_datetime(self.labels), 'y': self.values})
+        forecast = _prophet_forecast(df, 5, self.labels, self.values, 'leads_daily')
+        self.assertEqual(forecast.labels[0], '2026-01-29')
+        self.assertEqual(len(forecast.yhat), 5)
+        self.assertEqual(len(forecast.yhat_upper), 5)
+        self.assertEqual(forecast.history_values, self.values)
+        self.assertEqual(forecast.meta, {'series_key': 'leads_daily'})
+
+    def test_fitted_model_is_reused_for_unchanged_history(self):
+        df = pd.DataFrame({'ds': pd.to_datetime(self.labels), 'y': self.values})
+        with patch.object(Prophet, 'fit', autospec=True, side_effect=Prophet.fit) as fit:
+            forecast = _prophet_forecast(df, 5, self.labels, self.values, 'leads_daily')
+            again = _prophet_forecast(df.copy(), 5, self.labels, self.values, 'leads_daily')
+            self.assertEqual(fit.call_count, 1)
+            self.assertEqual(again.yhat, forecast.yhat)
+
+            df.loc[27, 'y'] = 10.0
+            _prophet_forecast(df, 5, self.labels, self.values, 'leads_daily')
+            self.assertEqual(fit.call_count, 2)
+
+    def test_regressor_is_extended_into_the_future(self):
+        df = pd.DataFrame({
+            'ds': pd.to_datetime(self.labels), 'y': self.values, 'reach': self.values
+        })
+        forecast = _prophet_forecast(
+            df, 3, self.labels, self.values, 'clients_daily', regressors=('reach',)
+        )
+        self.assertEqual(len(forecast.yhat), 3)
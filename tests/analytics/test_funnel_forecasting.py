@@ -0,0 +1,146 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test import tag
+
+from analytics.utils.funnel_forecasting import _compute_stage_transition_probabilities
+from analytics.utils.funnel_forecasting import compute_stage_transition_probabilities
+from analytics.utils.funnel_forecasting import next_step_action
+from analytics.utils.funnel_forecasting import suggest_next_actions
+from analytics.utils.funnel_forecasting import suggest_next_actions_for_clients
+from common.utils.helpers import USER_MODEL
+from common.utils.helpers import get_department_id
+from common.utils.helpers import get_now
+from crm.models import Company
+from crm.models import Deal
+from crm.models import Stage
+from crm.utils.ticketproc import new_ticket
+from tests.base_test_classes import BaseTestCase
+
+# python manage.py test tests.analytics.test_funnel_forecasting --keepdb
+
+MODULE = 'analytics.utils.funnel_forecasting'
+
+
+@tag('TestCase')
+class TestNextStepAction(SimpleTestCase):
+    """Test reading the action hinted by the next_step text"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def test_keywords_are_checked_in_order(self):
+        self.assertEqual(next_step_action('Send an email, then call'), 'call')
+        self.assertEqual(next_step_action('Звонок клиенту'), 'call')
+        self.assertEqual(next_step_action('Встреча в офисе'), 'schedule_meeting')
+        self.assertEqual(next_step_action('Prepare the proposal'), 'send_proposal')
+        self.assertIsNone(next_step_action('Wait'))
+        self.assertIsNone(next_step_action(None))
+
+
+@tag('TestCase')
+class TestStageTransitionProbabilities(BaseTestCase):
+    """Test the stage probabilities behind the next action suggestions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        owner = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        department_id = get_department_id(owner)
+        cls.stage = Stage.objects.get(department_id=department_id, default=True)
+        company = Company.objects.create(full_name='Company', owner=owner)
+        cls.deal = Deal.objects.create(
+            name='Test deal',
+            ticket=new_ticket(),
+            next_step='Call the client',
+            next_step_date=get_now().date() + timedelta(days=1),
+            stage=cls.stage,
+            owner=owner,
+            department_id=department_id,
+            company=company,
+        )
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+        cache.clear()
+
+    def test_probabilities_follow_next_step_text(self):
+        probs = compute_stage_transition_probabilities()
+        self.assertEqual(probs[self.stage.name], {'call': 1.0})
+
+    def test_probabilities_count_every_deal(self):
+        for next_step in ('Call back', 'Write an email', 'Write an email'):
+            Deal.objects.create(
+                name='Test deal',
+                ticket=new_ticket(),
+                next_step=next_step,
+                next_step_date=self.deal.next_step_date,
+                stage=self.stage,
+                owner=self.deal.owner,
+                department_id=self.deal.department_id,
+            )
+        probs = compute_stage_transition_probabilities()
+        self.assertEqual(probs[self.stage.name], {'call': 0.5, 'email': 0.5})
+
+    def test_sql_classification_matches_python(self):
+        won_stage = Stage.objects.filter(department_id=self.deal.department_id, success_stage=True).first()
+        for stage, next_step in ((self.stage, 'Send a proposal'), (won_stage, 'Sign'), (None, 'Wait')):
+            Deal.objects.create(
+                name='Test deal',
+                ticket=new_ticket(),
+                next_step=next_step,
+                next_step_date=self.deal.next_step_date,
+                stage=stage,
+                owner=self.deal.owner,
+                department_id=self.deal.department_id,
+            )
+        probs = _compute_stage_transition_probabilities(90)
+        with patch.object(connection, 'vendor', 'postgresql'), self.assertNumQueries(1):
+            self.assertEqual(_compute_stage_transition_probabilities(90), probs)
+        self.assertEqual(probs[won_stage.name], {'close_deal': 1.0})
+        self.assertEqual(probs['Unknown'], {'follow_up': 1.0})
+
+    def test_suggestions_read_deals_in_one_query(self):
+        compute_stage_transition_probabilities()
+        with self.assertNumQueries(1):
+            actions = suggest_next_actions()
+        action = next(a for a in actions if a.deal_id == self.deal.id)
+        self.assertEqual((action.suggested_action, action.probability), ('call', 1.0))
+        with self.assertNumQueries(1):
+            client_actions = suggest_next_actions_for_clients()
+        self.assertEqual(client_actions[0].company_id, self.deal.company_id)
+
+    def test_client_suggestions_cover_most_recent_companies_once(self):
+        other = Company.objects.create(full_name='Other company', owner=self.deal.owner)
+        for company, next_step in ((other, 'Write an email'), (self.deal.company, 'Meet')):
+            Deal.objects.create(
+                name='Test deal',
+                ticket=new_ticket(),
+                next_step=next_step,
+                next_step_date=self.deal.next_step_date,
+                stage=None,
+                owner=self.deal.owner,
+                department_id=self.deal.department_id,
+                company=company,
+            )
+        actions = suggest_next_actions_for_clients()
+        self.assertEqual([a.company_id for a in actions], [self.deal.company_id, other.id])
+        self.assertEqual(len(suggest_next_actions_for_clients(limit=1)), 1)
+
+    def test_suggestions_share_one_deal_scan(self):
+        with patch(
+                f'{MODULE}._compute_stage_transition_probabilities',
+                wraps=_compute_stage_transition_probabilities
+        ) as compute:
+            deal_actions = suggest_next_actions()
+            client_actions = suggest_next_actions_for_clients()
+            self.assertEqual(compute.call_count, 1)
+
+            compute_stage_transition_probabilities(window_days=30)
+            self.assertEqual(compute.call_count, 2)
+
+        self.assertIn(self.deal.id, [a.deal_id for a in deal_actions])
+        self.assertEqual(client_actions[0].suggested_action, 'call')
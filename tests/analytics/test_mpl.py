@@ -0,0 +1,78 @@
+import threading
+from base64 import b64decode
+from unittest.mock import Mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import tag
+
+from analytics.utils.mpl import MAX_X_TICKS
+from analytics.utils.mpl import SVG_RC_PARAMS
+from analytics.utils.mpl import cached_chart
+from analytics.utils.mpl import new_figure
+from analytics.utils.mpl import pooled_figure
+from analytics.utils.mpl import to_img
+
+# python manage.py test tests.analytics.test_mpl --keepdb
+
+
+@tag('TestCase')
+class TestToImg(SimpleTestCase):
+    """Test rendering dashboard charts to data URIs"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def test_chart_is_rendered_as_svg(self):
+        fig, ax = new_figure()
+        ax.bar(['a', 'b'], [1, 2])
+        self.assertTrue(to_img(fig).startswith('data:image/svg+xml;base64,'))
+        self.assertEqual(len(ax.get_xticks()), 2)
+
+    def test_svg_settings_do_not_leak_into_global_rc_params(self):
+        import matplotlib
+
+        before = {key: matplotlib.rcParams[key] for key in SVG_RC_PARAMS}
+        fig, ax = new_figure()
+        ax.set_title('Revenue')
+        img = to_img(fig)
+        self.assertIn(b'Revenue</text>', b64decode(img.partition(',')[2]))
+        self.assertEqual({key: matplotlib.rcParams[key] for key in SVG_RC_PARAMS}, before)
+
+    def test_long_category_axis_is_thinned(self):
+        fig, ax = new_figure()
+        labels = [f'2026-01-{d:02d}' for d in range(1, 32)]
+        ax.plot(labels, range(31))
+        to_img(fig)
+        self.assertLessEqual(len(ax.get_xticks()), MAX_X_TICKS + 1)
+
+    def test_pooled_figure_is_reused_per_thread_and_size(self):
+        fig, ax = pooled_figure()
+        ax.plot([f'2026-01-{d:02d}' for d in range(1, 32)], range(31))
+        to_img(fig)
+
+        again, ax = pooled_figure()
+        self.assertIs(again, fig)
+        self.assertFalse(ax.lines)
+        ax.bar(['a', 'b'], [1, 2])
+        to_img(fig)
+        self.assertEqual(len(ax.get_xticks()), 2)
+        self.assertIsNot(pooled_figure((5, 5))[0], fig)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(pooled_figure()[0]))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], fig)
+
+    def test_cached_chart_is_drawn_again_only_for_new_data(self):
+        cache.clear()
+        draw = Mock(side_effect=lambda ax: ax.bar(['a', 'b'], [1, 2]))
+        img = cached_chart(('funnel', [1, 2]), draw)
+        self.assertTrue(img.startswith('data:image/svg+xml;base64,'))
+        self.assertEqual(cached_chart(('funnel', [1, 2]), draw), img)
+        self.assertEqual(draw.call_count, 1)
+
+        cached_chart(('funnel', [1, 3]), draw)
+        cached_chart(('funnel', [1, 2]), draw, (5, 5))
+        self.assertEqual(draw.call_count, 3)
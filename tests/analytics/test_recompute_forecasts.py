@@ -0,0 +1,88 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test import tag
+from django.utils import timezone
+
+from analytics.models import ForecastPoint
+from analytics.models import NextActionForecast
+from analytics.utils.forecasting import SERIES_LEADS
+from analytics.utils.forecasting import SeriesForecast
+from analytics.utils.funnel_forecasting import NextAction
+
+# python manage.py test tests.analytics.test_recompute_forecasts --keepdb
+
+COMMAND_MODULE = 'analytics.management.commands.recompute_forecasts'
+
+
+@tag('TestCase')
+class TestRecomputeForecasts(TestCase):
+    """Test the recompute_forecasts management command"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def call_command(self, leads=None, next_actions=()):
+        with patch(f'{COMMAND_MODULE}.forecast_new_leads', return_value=leads), \
+                patch(f'{COMMAND_MODULE}.forecast_new_clients_with_reach', return_value=None), \
+                patch(f'{COMMAND_MODULE}.forecast_daily_revenue', return_value=None), \
+                patch(f'{COMMAND_MODULE}.suggest_next_actions', return_value=list(next_actions)), \
+                patch(f'{COMMAND_MODULE}.suggest_next_actions_for_clients', return_value=[]):
+            call_command('recompute_forecasts', horizon=3, stdout=open('/dev/null', 'w'))
+
+    def test_series_points_are_upserted(self):
+        today = timezone.localdate()
+        past = today - timedelta(days=1)
+        ForecastPoint.objects.create(series_key=SERIES_LEADS, date=past, yhat=1)
+        labels = [today + timedelta(days=i) for i in range(3)]
+        self.call_command(leads=SeriesForecast(
+            labels=labels,
+            yhat=[1.0, 2.0, 3.0],
+            yhat_lower=[0.5, None, 2.5],
+            yhat_upper=[1.5, 2.5, None],
+        ))
+        points = ForecastPoint.objects.filter(series_key=SERIES_LEADS).order_by('date')
+        self.assertEqual(points.count(), 4)
+        self.assertEqual(points.first().date, past)
+        point = points.get(date=labels[1])
+        self.assertEqual(point.yhat_lower, 2.0)
+        self.assertEqual(point.yhat_upper, 2.5)
+
+        self.call_command(leads=SeriesForecast(
+            labels=labels,
+            yhat=[4.0] * 3,
+            yhat_lower=[4.0] * 3,
+            yhat_upper=[4.0] * 3,
+        ))
+        self.assertEqual(points.count(), 4)
+        self.assertEqual(points.get(date=labels[2]).yhat, 4.0)
+
+    def test_upsert_targets_conflicts_only_where_supported(self):
+        forecast = SeriesForecast(labels=[timezone.localdate()], yhat=[1.0])
+        for supported in (True, False):
+            with patch.object(connection.features, 'supports_update_conflicts_with_target', supported), \
+                    patch.object(ForecastPoint.objects, 'bulk_create') as bulk_create:
+                self.call_command(leads=forecast)
+            kwargs = bulk_create.call_args.kwargs
+            self.assertTrue(kwargs['update_conflicts'])
+            self.assertEqual('unique_fields' in kwargs, supported)
+
+    def test_missing_bounds_fall_back_to_yhat(self):
+        today = timezone.localdate()
+        self.call_command(leads=SeriesForecast(labels=[today], yhat=[2.0]))
+        point = ForecastPoint.objects.get(series_key=SERIES_LEADS, date=today)
+        self.assertEqual((point.yhat_lower, point.yhat_upper), (2.0, 2.0))
+
+    def test_next_actions_are_replaced(self):
+        NextActionForecast.objects.create(deal_id=1, suggested_action='call')
+        self.call_command(next_actions=[
+            NextAction(deal_id=2, suggested_action='email', probability=0.5),
+            NextAction(deal_id=3, suggested_action='call', probability=0.4),
+        ])
+        self.assertQuerySetEqual(
+            NextActionForecast.objects.order_by('deal_id').values_list('deal_id', flat=True),
+            [2, 3]
+        )
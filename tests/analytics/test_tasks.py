@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.test import tag
+from django.utils import timezone
+
+from analytics.models import ClientNextActionForecast
+from analytics.models import ForecastPoint
+from analytics.models import NextActionForecast
+from analytics.tasks import cleanup_old_forecasts_task
+from analytics.tasks import predict_all_task
+from analytics.tasks import predict_next_actions_task
+from analytics.tasks import predict_revenue_task
+from analytics.tasks import start_predict_all
+from analytics.utils.forecasting import SERIES_REVENUE
+from analytics.utils.forecasting import SeriesForecast
+from analytics.utils.funnel_forecasting import NextAction
+
+# python manage.py test tests.analytics.test_tasks --keepdb
+
+
+@tag('TestCase')
+class TestPredictTasks(TestCase):
+    """Test analytics prediction tasks"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def test_predict_revenue_upserts_series_points(self):
+        today = timezone.localdate()
+        ForecastPoint.objects.create(series_key=SERIES_REVENUE, date=today, yhat=1)
+        ForecastPoint.objects.create(series_key=SERIES_REVENUE, date=today + timedelta(days=5), yhat=1)
+        forecast = SeriesForecast(
+            labels=[today + timedelta(days=i) for i in range(3)],
+            yhat=[10.0, 20.0, 30.0],
+        )
+        with patch('analytics.utils.forecasting.forecast_daily_revenue', return_value=forecast):
+            result = predict_revenue_task(3)
+
+        self.assertTrue(result['success'], result)
+        self.assertEqual(result['points_saved'], 3)
+        points = ForecastPoint.objects.filter(series_key=SERIES_REVENUE).order_by('date')
+        self.assertEqual(
+            list(points.values_list('yhat', 'yhat_lower', 'yhat_upper')),
+            [(10.0, 10.0, 10.0), (20.0, 20.0, 20.0), (30.0, 30.0, 30.0)]
+        )
+
+    def test_predict_revenue_fills_missing_bounds_per_point(self):
+        today = timezone.localdate()
+        forecast = SeriesForecast(
+            labels=[today, today + timedelta(days=1)],
+            yhat=[10.0, 20.0],
+            yhat_lower=[5.0, None],
+            yhat_upper=[None, 25.0],
+        )
+        with patch('analytics.utils.forecasting.forecast_daily_revenue', return_value=forecast):
+            result = predict_revenue_task(2)
+
+        self.assertTrue(result['success'], result)
+        points = ForecastPoint.objects.filter(series_key=SERIES_REVENUE).order_by('date')
+        self.assertEqual(
+            list(points.values_list('yhat', 'yhat_lower', 'yhat_upper')),
+            [(10.0, 5.0, 10.0), (20.0, 20.0, 25.0)]
+        )
+
+    def test_predict_next_actions(self):
+        NextActionForecast.objects.create(deal_id=1, suggested_action='call')
+        suggestions = [
+            NextAction(deal_id=2, suggested_action='email', probability=0.5),
+            NextAction(deal_id=3, suggested_action='call', probability=0.4),
+        ]
+        with patch('analytics.utils.funnel_forecasting.suggest_next_actions', return_value=suggestions):
+            result = predict_next_actions_task()
+
+        self.assertEqual(result['forecasts_saved'], 2)
+        self.assertQuerySetEqual(
+            NextActionForecast.objects.order_by('deal_id').values_list('deal_id', flat=True),
+            [2, 3]
+        )
+
+    def test_predict_all_called_directly_summarizes_results(self):
+        ok = {'success': True}
+        with patch('analytics.tasks.predict_revenue_task.run', return_value=ok), \
+                patch('analytics.tasks.predict_leads_task.run', return_value=ok), \
+                patch('analytics.tasks.predict_clients_task.run', side_effect=ValueError('boom')), \
+                patch('analytics.tasks.predict_next_actions_task.run', return_value=ok), \
+                patch('analytics.tasks.predict_client_actions_task.run', return_value=ok):
+            result = predict_all_task(7)
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['summary'], {'successful': 4, 'failed': 1, 'total': 5})
+        self.assertEqual(result['results']['clients'], {'success': False, 'error': 'boom'})
+
+    def test_start_predict_all_returns_summary_callback(self):
+        with patch('analytics.tasks.chord') as chord:
+            result = start_predict_all(7)
+        header, = chord.call_args[0]
+        self.assertEqual(len(header.tasks), 5)
+        callback, = chord.return_value.call_args[0]
+        self.assertEqual(callback.task, 'analytics.summarize_predictions')
+        self.assertEqual(
+            callback.args,
+            (['revenue', 'leads', 'clients', 'next_actions', 'client_actions'],)
+        )
+        self.assertIs(result, chord.return_value.return_value)
+
+    def test_cleanup_old_forecasts_deletes_with_one_statement_per_table(self):
+        today = timezone.localdate()
+        old = ForecastPoint.objects.create(series_key='leads', date=today, yhat=1)
+        ForecastPoint.objects.create(series_key='leads', date=today + timedelta(days=1), yhat=1)
+        ForecastPoint.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=100))
+        NextActionForecast.objects.create(deal_id=1, suggested_action='call')
+        ClientNextActionForecast.objects.create(company_id=1, suggested_action='call')
+
+        with self.assertNumQueries(3):
+            result = cleanup_old_forecasts_task(days_to_keep=90)
+        self.assertEqual(result['deleted']['forecast_points'], 1)
+        self.assertEqual(result['deleted']['total'], 1)
+        self.assertFalse(ForecastPoint.objects.filter(id=old.id).exists())
+
+    def test_cleanup_old_forecasts_without_days_to_keep_purges_all(self):
+        ForecastPoint.objects.create(series_key='leads', date=timezone.localdate(), yhat=1)
+        NextActionForecast.objects.create(deal_id=1, suggested_action='call')
+
+        result = cleanup_old_forecasts_task(days_to_keep=0)
+        self.assertEqual(result['deleted']['total'], 2)
+        self.assertFalse(ForecastPoint.objects.exists())
+        self.assertFalse(NextActionForecast.objects.exists())
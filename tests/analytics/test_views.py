@@ -0,0 +1,323 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analytics.views import analytics_dashboard
+from analytics.views import forecasts_api
+from analytics.views import get_cached_dashboard_data
+from analytics.views import get_dashboard_context
+from analytics.views import get_dashboard_data
+from analytics.views import get_group_choices
+from analytics.views import get_user_scope
+from analytics.views import run_concurrently
+from common.models import Department
+from common.utils.helpers import USER_MODEL
+from common.utils.helpers import get_department_id
+from common.utils.helpers import get_now
+from crm.models import Company
+from crm.models import Contact
+from crm.models import Deal
+from crm.models import Lead
+from crm.models import LeadSource
+from crm.models import Request
+from tests.analytics.base import AnalyticsTestCase
+from tests.base_test_classes import BaseTestCase
+
+# python manage.py test tests.analytics.test_views --keepdb
+
+VIEWS_MODULE = 'analytics.views'
+
+
+@tag('TestCase')
+class TestRunConcurrently(SimpleTestCase):
+    """Test running independent dashboard computations in worker threads"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def test_results_keep_call_order(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def make(value):
+            def func():
+                # fails with BrokenBarrierError unless all three run at once
+                barrier.wait()
+                return value
+            return func
+
+        self.assertEqual(run_concurrently(make(1), make(2), make(3)), [1, 2, 3])
+
+    def test_workers_are_capped(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def func():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+        with patch(f'{VIEWS_MODULE}.MAX_WORKERS', 2):
+            run_concurrently(*[func] * 6)
+        self.assertEqual(max(peak), 2)
+
+
+@tag('TestCase')
+class TestCachedDashboardData(BaseTestCase):
+    """Test caching of get_dashboard_data results"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+        cache.clear()
+
+    def test_cached_per_filters_and_invalidated_on_saves(self):
+        data = {'filters': {}}
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value=data) as get_data:
+            get_cached_dashboard_data('30d', None, None)
+            get_cached_dashboard_data('30d', None, None)
+            self.assertEqual(get_data.call_count, 1)
+
+            get_cached_dashboard_data('7d', None, None)
+            self.assertEqual(get_data.call_count, 2)
+
+            owner = USER_MODEL.objects.first()
+            Lead.objects.create(first_name='Lead', owner=owner)
+            get_cached_dashboard_data('30d', None, None)
+            self.assertEqual(get_data.call_count, 3)
+
+            Request.objects.create(request_for='Request', owner=owner)
+            get_cached_dashboard_data('30d', None, None)
+            self.assertEqual(get_data.call_count, 4)
+
+    def test_forecasts_api_skips_other_dashboard_blocks(self):
+        request = RequestFactory().get('/', {'period': '7d'})
+        request.user = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data') as get_data, \
+                patch(f'{VIEWS_MODULE}.get_forecast_data', return_value=None), \
+                patch(f'{VIEWS_MODULE}.get_forecast', return_value=None) as get_forecast:
+            forecasts_api(request)
+            response = forecasts_api(request)
+        get_data.assert_not_called()
+        self.assertEqual(get_forecast.call_count, 2)
+        self.assertEqual(
+            set(json.loads(response.content)),
+            {'forecast', 'lead_forecast', 'client_forecast', 'funnel_next_actions', 'client_next_actions'}
+        )
+
+    def test_dashboard_context_is_computed_once_per_request(self):
+        request = RequestFactory().get('/', {'period': '7d'})
+        request.user = USER_MODEL.objects.filter(is_superuser=True).first() or USER_MODEL(is_superuser=True)
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value={}) as get_data:
+            filters, data = get_dashboard_context(request)
+            with self.assertNumQueries(0):
+                self.assertEqual(get_dashboard_context(request), (filters, data))
+        get_data.assert_called_once_with(period='7d', owner_id=None, department_id=None)
+        self.assertEqual(filters['period'], '7d')
+
+    def test_dashboard_context_scopes_choices_to_user_departments(self):
+        user = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        request = RequestFactory().get('/')
+        request.user = user
+        group_ids = set(user.groups.values_list('id', flat=True))
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value={}):
+            filters, data = get_dashboard_context(request)
+        self.assertTrue(filters['departments'])
+        self.assertTrue({d['id'] for d in filters['departments']} <= group_ids)
+        owner_ids = [o['id'] for o in filters['owners']]
+        self.assertIn(user.id, owner_ids)
+        self.assertEqual(len(owner_ids), len(set(owner_ids)))
+
+    def test_group_choices_match_group_members_and_departments(self):
+        user = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        groups = user.groups.all()
+        with self.assertNumQueries(2):
+            owners, departments = get_group_choices(user)
+        self.assertEqual(
+            [o['id'] for o in owners],
+            list(
+                USER_MODEL.objects.filter(groups__in=groups).distinct()
+                .order_by('first_name', 'last_name').values_list('id', flat=True)
+            )
+        )
+        self.assertEqual(
+            [d['id'] for d in departments],
+            list(Department.objects.filter(id__in=groups).order_by('name').values_list('id', flat=True))
+        )
+
+    def test_user_scope_cached_per_user_groups(self):
+        user = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        scope = get_user_scope(user)
+        self.assertEqual(scope, get_group_choices(user))
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user_scope(user), scope)
+
+        group = user.groups.exclude(department__isnull=True).first()
+        user.groups.remove(group)
+        self.assertNotIn(group.id, [d['id'] for d in get_user_scope(user)[1]])
+
+    def test_analytics_dashboard_renders_filter_choices(self):
+        request = RequestFactory().get('/', {'period': '7d'})
+        request.user = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value={}), \
+                patch(f'{VIEWS_MODULE}.render') as render:
+            analytics_dashboard(request)
+        context = render.call_args[0][2]
+        self.assertEqual(context['period'], '7d')
+        self.assertTrue(context['owners'])
+        self.assertTrue(context['departments'])
+
+    def test_analytics_dashboard_renders_template(self):
+        user = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        request = RequestFactory().get('/', {'period': '7d'})
+        request.user = user
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value={}):
+            response = analytics_dashboard(request)
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn('<option value="7d" selected>', content)
+        self.assertIn(f'<option value="{user.id}" >', content)
+        department = Department.objects.get(id=get_department_id(user))
+        self.assertIn(f'<option value="{department.id}" >{department.name}</option>', content)
+
+    def test_analytics_dashboard_draws_charts_client_side(self):
+        data = {'revenue_chart': {'labels': ['Jan 2026'], 'data': [Decimal('10.5')]}}
+        user = USER_MODEL.objects.get(username="Andrew.Manager.Global")
+        with patch(f'{VIEWS_MODULE}.get_dashboard_data', return_value=data):
+            request = RequestFactory().get('/')
+            request.user = user
+            content = analytics_dashboard(request).content.decode()
+            self.assertIn('<canvas id="revenueChart">', content)
+            self.assertIn('"revenue_chart": {"labels": ["Jan 2026"], "data": ["10.5"]}', content)
+
+            request = RequestFactory().get('/', {'render': 'images'})
+            request.user = user
+            content = analytics_dashboard(request).content.decode()
+            self.assertIn('<img src="data:image/svg+xml;base64,', content)
+            self.assertNotIn('<canvas id="revenueChart">', content)
+
+
+@tag('TestCase')
+class TestDashboardData(AnalyticsTestCase):
+    """Test the data of the analytics dashboard"""
+
+    def setUp(self):
+        print("Run Test Method:", self._testMethodName)
+
+    def get_dashboard_data(self):
+        cache.clear()  # stage probabilities are cached between calls
+        with patch(f'{VIEWS_MODULE}.get_forecast_data', return_value=None), \
+                patch(f'{VIEWS_MODULE}.get_forecast', return_value=None):
+            return get_dashboard_data(owner_id=self.owner.id)
+
+    def test_queries_run_in_caller_thread_inside_transaction(self):
+        # worker connections could not see this test's rows
+        self.assertEqual(run_concurrently(threading.get_ident), [threading.get_ident()])
+
+    def test_won_deal_metrics(self):
+        self.create_deal(self.default_stage, 100)
+        self.create_deal(self.success_stage, 200)
+        self.create_deal(self.success_stage, 300)
+
+        data = self.get_dashboard_data()
+        overview = data['sales_overview']
+        self.assertEqual((overview['total_deals'], overview['won_deals']), (3, 2))
+        self.assertEqual((overview['total_revenue'], overview['win_rate']), (500.0, 66.7))
+        kpi = data['kpi_metrics']
+        self.assertEqual((kpi['current_deals'], kpi['current_revenue'], kpi['current_leads']), (2, 500.0, 0))
+        self.assertEqual((kpi['deals_change'], kpi['revenue_change'], kpi['leads_change']), (100, 100, 0))
+        self.assertEqual(data['sales_funnel']['total_deals'], 3)
+        self.assertEqual(data['sales_funnel']['total_value'], 600.0)
+        top = data['top_performers']['by_revenue'][0]
+        self.assertEqual((top['deals_count'], top['total_revenue']), (2, Decimal('500')))
+        self.assertEqual(data['top_performers']['by_deals'][0]['deals_count'], 2)
+        self.assertEqual(data['owner_breakdown'][0]['owner_id'], self.owner.id)
+        self.assertEqual(data['owner_workload'][0]['created'], 3)
+        self.assertEqual(data['owner_workload'][0]['won'], 2)
+
+    def test_daily_series_cover_every_day_of_the_window(self):
+        self.create_deal(self.default_stage, 100)
+        Lead.objects.create(first_name='Lead', owner=self.owner)
+        Request.objects.create(request_for='Request', owner=self.owner)
+
+        data = self.get_dashboard_data()
+        labels = data['daily_trend']['labels']
+        self.assertEqual(len(labels), 31)
+        self.assertEqual(labels[-1], timezone.localdate().isoformat())
+        self.assertEqual(data['daily_trend']['deals'], [0] * 30 + [1])
+        self.assertEqual(data['daily_trend']['leads'], [0] * 30 + [1])
+        self.assertEqual(data['requests_trend'], {'labels': labels, 'data': [0] * 30 + [1]})
+
+    def test_activity_heatmap_sums_all_sources(self):
+        self.create_deal(self.default_stage, 100)
+        Lead.objects.create(first_name='Lead', owner=self.owner)
+        Request.objects.create(request_for='Request', owner=self.owner)
+
+        with CaptureQueriesContext(connection) as queries:
+            heatmap = self.get_dashboard_data()['activity_heatmap']
+        unions = [q['sql'] for q in queries if 'UNION ALL' in q['sql']]
+        self.assertEqual(len(unions), 1)
+        now = timezone.localtime()
+        matrix = heatmap['matrix']
+        self.assertEqual((len(matrix), len(matrix[0])), (7, 24))
+        self.assertEqual(matrix[now.weekday()][now.hour], 3)
+        self.assertEqual(sum(map(sum, matrix)), 3)
+
+    def test_kpi_changes_against_previous_month(self):
+        month_start = get_now().replace(day=1, hour=12)
+        last_month = month_start - timedelta(days=10)
+        self.create_deal(self.success_stage, 300)
+        old_deal = self.create_deal(self.success_stage, 100)
+        old_lead = Lead.objects.create(first_name='Lead', owner=self.owner)
+        Deal.objects.filter(id=old_deal.id).update(creation_date=last_month)
+        Lead.objects.filter(id=old_lead.id).update(creation_date=last_month)
+
+        kpi = self.get_dashboard_data()['kpi_metrics']
+        self.assertEqual((kpi['current_deals'], kpi['current_revenue'], kpi['current_leads']), (1, 300.0, 0))
+        self.assertEqual((kpi['deals_change'], kpi['revenue_change'], kpi['leads_change']), (0, 200, -100))
+
+    def test_lead_source_totals_cover_unlisted_sources(self):
+        for i in range(11):
+            source = LeadSource.objects.create(name=f'Source {i}', department_id=self.department_id)
+            Lead.objects.create(first_name='Lead', owner=self.owner, lead_source=source)
+
+        lead_sources = self.get_dashboard_data()['lead_sources']
+        self.assertEqual(len(lead_sources['sources']), 10)
+        self.assertEqual((lead_sources['total_leads'], lead_sources['total_converted']), (11, 0))
+
+    def test_recent_activity_queries_do_not_grow_with_rows(self):
+        company = Company.objects.create(full_name='Company', owner=self.owner)
+        contact = Contact.objects.create(first_name='Contact', company=company, owner=self.owner)
+        source = LeadSource.objects.create(name='Source', department_id=self.department_id)
+
+        def add_rows():
+            self.create_deal(self.default_stage, 100, contact=contact, company=company)
+            Lead.objects.create(first_name='Lead', owner=self.owner, lead_source=source)
+
+        add_rows()
+        with CaptureQueriesContext(connection) as one_row:
+            data = self.get_dashboard_data()
+        add_rows()
+        add_rows()
+        with self.assertNumQueries(len(one_row)):
+            data = self.get_dashboard_data()
+
+        deal = data['recent_activity']['deals'][0]
+        self.assertEqual(deal['stage'], self.default_stage.name)
+        self.assertEqual((deal['contact'], deal['company']), ('Contact', 'Company'))
+        self.assertEqual(deal['owner'], f'{self.owner.first_name} {self.owner.last_name}')
+        lead = data['recent_activity']['leads'][0]
+        self.assertEqual((lead['name'], lead['source']), ('Lead', 'Source'))
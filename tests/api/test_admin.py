@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from api.admin import AuthenticationLogAdmin
+from api.models import AuthenticationLog
+from tests.base_test_classes import BaseTestCase
+
+
+User = get_user_model()
+
+
+class AuthenticationLogAdminTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client.force_login(User.objects.filter(is_superuser=True).first())
+        self.url = reverse("admin:api_authenticationlog_changelist")
+
+    def test_changelist_stats_are_counted_once_and_cached(self):
+        for auth_type, success in (("jwt", True), ("jwt", False), ("legacy", True), ("session", True)):
+            AuthenticationLog.objects.create(
+                username="user", auth_type=auth_type, endpoint="/api/deals/", method="GET", success=success
+            )
+
+        with patch.object(
+                AuthenticationLogAdmin, "get_auth_stats", autospec=True,
+                side_effect=AuthenticationLogAdmin.get_auth_stats
+        ) as get_auth_stats:
+            response = self.client.get(self.url)
+            self.client.get(self.url, {"auth_type": "jwt"})
+        self.assertEqual(get_auth_stats.call_count, 1)
+
+        self.assertEqual(response.status_code, 200)
+        stats = response.context["auth_stats"]
+        self.assertEqual(
+            (stats["total_count"], stats["jwt_count"], stats["legacy_count"], stats["session_count"]),
+            (4, 2, 1, 1),
+        )
+        self.assertEqual((stats["success_count"], stats["failure_count"]), (3, 1))
+        self.assertEqual((stats["jwt_percentage"], stats["success_rate"]), (50.0, 75.0))
+        self.assertEqual(response.context["top_users"][0]["count"], 2)
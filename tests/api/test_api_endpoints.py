@@ -1,15 +1,26 @@
 from datetime import date
+from datetime import timedelta
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.test import APIClient
 
+from analytics.models import ForecastPoint
+from analytics.utils.forecasting import SERIES_REVENUE
 from common.utils.helpers import get_today
 from crm.models import Company, Contact, Deal, Lead
 from crm.models.others import CallLog, Stage
+from help.models import Page, Paragraph
+from massmail.models import MailingOut
 from tasks.models import Project, Task, TaskStage, Tag as TaskTag
 from tests.base_test_classes import BaseTestCase
+from voip.models import IncomingCall
 
 
 User = get_user_model()
@@ -126,7 +137,9 @@ class ApiBehaviorTestCase(BaseTestCase):
         self.assertGreaterEqual(funnel_row["value"], 1)
 
         activity_url = api_url("dashboard-activity")
-        activity_resp = self.client.get(activity_url, {"limit": 10})
+        # one query per object type plus the auth log, none per row
+        with self.assertNumQueries(5):
+            activity_resp = self.client.get(activity_url, {"limit": 10})
         self.assertEqual(activity_resp.status_code, 200, activity_resp.content)
         self.assertTrue(
             any(deal.name in item.get("message", "") for item in activity_resp.data)
@@ -135,6 +148,155 @@ class ApiBehaviorTestCase(BaseTestCase):
             any(task.name in item.get("message", "") for item in activity_resp.data)
         )
 
+    def test_dashboard_analytics_counts_tasks_once(self):
+        url = api_url("dashboard-analytics")
+        before = self.client.get(url).data["tasks"]
+
+        task_stage = TaskStage.objects.filter(default=True).first() or TaskStage.objects.first()
+        for name, due_date in (("Overdue", date(2000, 1, 1)), ("Upcoming", None)):
+            task = Task.objects.create(
+                name=name,
+                next_step="Prepare",
+                next_step_date=get_today(),
+                due_date=due_date,
+                owner=self.user,
+                stage=task_stage,
+            )
+            task.responsible.add(self.user)
+            task.subscribers.add(self.user, self.other_user)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        tasks = response.data["tasks"]
+        self.assertEqual(tasks["active"], before["active"] + 2)
+        self.assertEqual(tasks["overdue"], before["overdue"] + 1)
+
+    def test_analytics_overview_counts_owned_objects(self):
+        cache.clear()
+        url = api_url("analytics-overview")
+        before = self.client.get(url).data
+
+        Lead.objects.create(first_name="Fresh", owner=self.user)
+        Lead.objects.create(first_name="Touched", owner=self.user, was_in_touch=get_today())
+        Lead.objects.create(first_name="Foreign", owner=self.other_user)
+
+        # one aggregate per model
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        leads = response.data["leads"]
+        self.assertEqual(leads["total"], before["leads"]["total"] + 2)
+        self.assertEqual(leads["new"], before["leads"]["new"] + 2)
+        self.assertEqual(leads["qualified"], before["leads"]["qualified"] + 1)
+        self.assertEqual(response.data["deals"], before["deals"])
+
+        # cached until the next deal, lead or request change
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).data, response.data)
+
+    def test_department_list_counts_members_in_one_query(self):
+        url = api_url("department-list")
+        # auth log, page count and the annotated departments
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        departments = _extract_results(response.data)
+        self.assertTrue(departments)
+        for department in departments:
+            self.assertEqual(
+                department["member_count"],
+                User.objects.filter(groups=department["id"]).count(),
+            )
+
+    def test_help_pages_list_paragraphs_in_order(self):
+        page = Page.objects.create(title="Page", language_code="en")
+        for index_number in (2, 1):
+            Paragraph.objects.create(
+                document=page, title=f"Paragraph {index_number}",
+                language_code="en", index_number=index_number,
+            )
+
+        url = api_url("help-page-list")
+        # auth log, page count, pages and their paragraphs
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        page_data = next(p for p in _extract_results(response.data) if p["id"] == page.id)
+        self.assertEqual(
+            [p["title"] for p in page_data["paragraphs"]], ["Paragraph 1", "Paragraph 2"]
+        )
+
+    def test_incoming_calls_list_selects_user(self):
+        for caller_id in ("+100200", "+100300"):
+            IncomingCall.objects.create(user=self.user, caller_id=caller_id)
+
+        url = api_url("incoming-call-list")
+        # auth log, call count and calls with their user
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            {c["user_name"] for c in _extract_results(response.data)},
+            {self.user.get_full_name()},
+        )
+
+    def test_mailings_list_loads_shown_columns_only(self):
+        MailingOut.objects.create(
+            name="Mailing", owner=self.user, recipients_number=3,
+            recipient_ids="1,2,3", content_type=ContentType.objects.get_for_model(Lead),
+        )
+
+        url = api_url("mailing-out-list")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [(m["name"], m["recipients_number"]) for m in _extract_results(response.data)],
+            [("Mailing", 3)],
+        )
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn("recipient_ids", queries[-1]["sql"])
+
+    def test_help_pages_skip_filterset_without_filter_params(self):
+        Page.objects.create(title="English", language_code="en")
+        Page.objects.create(title="Ukrainian", language_code="uk")
+
+        url = api_url("help-page-list")
+        with patch.object(
+                DjangoFilterBackend, "filter_queryset", autospec=True,
+                side_effect=DjangoFilterBackend.filter_queryset
+        ) as filter_queryset:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertFalse(filter_queryset.called)
+
+            response = self.client.get(url, {"language_code": "uk"})
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertEqual(filter_queryset.call_count, 1)
+        titles = [p["title"] for p in _extract_results(response.data)]
+        self.assertIn("Ukrainian", titles)
+        self.assertNotIn("English", titles)
+
+    def test_revenue_forecast_pages_by_date(self):
+        today = get_today()
+        ForecastPoint.objects.create(
+            series_key=SERIES_REVENUE, date=today, yhat=10.123, yhat_lower=0.0, yhat_upper=20.456
+        )
+        ForecastPoint.objects.create(series_key=SERIES_REVENUE, date=today + timedelta(days=1), yhat=5)
+
+        url = api_url("predictions-get-revenue-forecast")
+        response = self.client.get(url, {"days": 1})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["forecasts"], [
+            {"date": today.isoformat(), "predicted": 10.12, "lower": 0.0, "upper": 20.46},
+        ])
+
+        # the next page starts after the last date of this one
+        response = self.client.get(url, {"days": 2, "after_date": response.data["next_cursor"]})
+        self.assertEqual([f["predicted"] for f in response.data["forecasts"]], [5])
+        self.assertIsNone(response.data["next_cursor"])
+        self.assertEqual(self.client.get(url, {"after_date": "tomorrow"}).status_code, 400)
+
     def test_lead_convert_creates_contact_company_and_deal(self):
         lead = Lead.objects.create(
             first_name="Lead",
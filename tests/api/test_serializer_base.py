@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from api.common_serializers import ReminderSerializer
+from api.serializer_base import CachedFieldsModelSerializer
+
+
+class CachedFieldsModelSerializerTestCase(SimpleTestCase):
+    def test_fields_are_built_once_per_class(self):
+        with patch.dict(CachedFieldsModelSerializer._fields_cache, clear=True), patch.object(
+                serializers.ModelSerializer, 'get_fields', autospec=True,
+                side_effect=serializers.ModelSerializer.get_fields
+        ) as get_fields:
+            first = ReminderSerializer()
+            second = ReminderSerializer()
+            self.assertEqual(list(first.fields), list(second.fields))
+        self.assertEqual(get_fields.call_count, 1)
+        self.assertIsNot(first.fields['owner'], second.fields['owner'])
+        self.assertIs(second.fields['owner'].parent, second)
+
+    def test_copies_do_not_share_state(self):
+        ReminderSerializer().fields['subject'].required = False
+        self.assertTrue(ReminderSerializer().fields['subject'].required)
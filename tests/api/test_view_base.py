@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase
+
+from api.additional_serializers import MailingOutSerializer
+from api.additional_serializers import PageSerializer
+from api.view_base import get_only_fields
+from api.view_base import get_related_lookups
+from help.models import Page
+from massmail.models import MailingOut
+
+
+class RelatedLookupsTestCase(SimpleTestCase):
+    def test_dotted_sources_are_selected(self):
+        self.assertEqual(
+            get_related_lookups(MailingOut, MailingOutSerializer()),
+            (['message', 'owner'], []),
+        )
+
+    def test_reverse_relations_are_prefetched(self):
+        self.assertEqual(
+            get_related_lookups(Page, PageSerializer()),
+            ([], ['paragraph_set']),
+        )
+
+    def test_only_shown_columns_are_loaded(self):
+        self.assertEqual(
+            get_only_fields(MailingOut, MailingOutSerializer()),
+            ['creation_date', 'id', 'message', 'name', 'owner',
+             'recipients_number', 'sending_date', 'status'],
+        )
+        self.assertEqual(get_only_fields(Page, PageSerializer()), ['id', 'language_code', 'title'])
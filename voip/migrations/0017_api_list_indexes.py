@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:00
+
+from django.db import migrations, models
+
+from common.utils.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('voip', '0016_webhook_event'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='incomingcall',
+            index=models.Index(fields=['user', '-created_at'], name='incomingcall_user_ca_idx'),
+        ),
+    ]
@@ -348,6 +348,10 @@ class IncomingCall(models.Model):
         ordering = ('-created_at',)
         verbose_name = _("Incoming call")
         verbose_name_plural = _("Incoming calls")
+        indexes = [
+            # the API lists a user's calls newest first
+            models.Index(fields=['user', '-created_at'], name='incomingcall_user_ca_idx'),
+        ]
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -15,9 +15,9 @@ if getattr(settings, 'ANALYTICS_FORECASTS_ENABLED', False) and getattr(settings,
     from celery.schedules import crontab
     app.conf.beat_schedule = getattr(app.conf, 'beat_schedule', {})
     app.conf.beat_schedule.update({
-        'recompute-forecasts-nightly': {
-            'task': 'analytics.tasks.recompute_forecasts_task',
-            'schedule': crontab(hour=1, minute=0),
+        'recompute-forecasts-hourly': {
+            'task': 'analytics.recompute_forecasts',
+            'schedule': crontab(minute=0),
             'args': (getattr(settings, 'ANALYTICS_FORECAST_HORIZON_DAYS', 30),)
         }
     })
@@ -45,4 +45,8 @@ if hasattr(app.conf, 'beat_schedule'):
             'schedule': crontab(hour=3, minute=0, day_of_week=0),  # Sunday 03:00
             'kwargs': {'days_to_keep': 90},
         },
+        'refresh-dashboard-rollups': {
+            'task': 'analytics.refresh_dashboard_rollups',
+            'schedule': crontab(minute='*/15'),  # Every 15 minutes
+        },
     })
@@ -220,6 +220,16 @@ CHANNEL_LAYERS = {
     # }
 }
 
+# Cache shared by all workers when Redis is configured;
+# otherwise Django's per-process local-memory cache is used.
+if os.getenv('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL'),
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -390,7 +400,7 @@ SIMPLE_JWT = {
 # Analytics Forecasts feature
 ANALYTICS_FORECASTS_ENABLED = True
 ANALYTICS_FORECAST_HORIZON_DAYS = 60
-ANALYTICS_FORECASTS_CELERY_ENABLED = False  # set True to enable nightly recompute via Celery beat
+ANALYTICS_FORECASTS_CELERY_ENABLED = False  # set True to enable hourly recompute via Celery beat
 
 # Admin UI theme flags
 ADMIN_CUSTOM_THEME = True